@@ -0,0 +1,52 @@
+"""Reporte de arranque: cuánto tarda cada etapa y cada import.
+
+Parecido a `python -X importtime`, pero dentro de la aplicación y junto con
+las etapas propias (carga de datos, login). Se pide con:
+    python gestion_stock.py --reporte-arranque
+"""
+import builtins
+import sys
+import time
+
+
+class MedidorArranque:
+    """Anota etapas y, si está activo, el tiempo de cada módulo importado por primera vez.
+
+    El tiempo de un módulo incluye el de los que importa a su vez (se muestran
+    indentados debajo), como la columna "cumulative" de -X importtime.
+    """
+
+    def __init__(self, activo):
+        self.activo = activo
+        self.inicio = time.perf_counter()
+        self.etapas = []
+        self.imports = []  # (profundidad, módulo, segundos), en el orden en que terminaron
+        self._profundidad = 0
+        if activo:
+            self._importar_original = builtins.__import__
+            builtins.__import__ = self._importar
+
+    def etapa(self, nombre):
+        if self.activo:
+            self.etapas.append((nombre, time.perf_counter() - self.inicio))
+
+    def reporte(self, cantidad=15):
+        lineas = ["Arranque:"]
+        for nombre, segundos in self.etapas:
+            lineas.append(f"  {segundos * 1000:9.1f} ms  {nombre}")
+        lineas.append(f"Imports más lentos (de {len(self.imports)}):")
+        mas_lentos = sorted(self.imports, key=lambda i: i[2], reverse=True)[:cantidad]
+        for profundidad, modulo, segundos in mas_lentos:
+            lineas.append(f"  {segundos * 1000:9.1f} ms  {'  ' * profundidad}{modulo}")
+        return "\n".join(lineas)
+
+    def _importar(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._importar_original(name, globals, locals, fromlist, level)
+        self._profundidad += 1
+        inicio = time.perf_counter()
+        try:
+            return self._importar_original(name, globals, locals, fromlist, level)
+        finally:
+            self._profundidad -= 1
+            self.imports.append((self._profundidad, name, time.perf_counter() - inicio))
@@ -0,0 +1,72 @@
+"""Compara el análisis de margen por categoría: comprensiones anidadas vs motor vectorizado.
+
+Uso (desde la carpeta del programa):
+    python -m benchmarks.analisis_margenes --productos 100000 --categorias 40
+"""
+import argparse
+import random
+import time
+
+import stock_core.analisis as analisis
+from stock_core import Producto, TablaProductos, analizar_margenes
+
+MARGEN_MINIMO = 20
+
+
+def productos(cantidad, categorias):
+    azar = random.Random(0)
+    for i in range(cantidad):
+        costo = azar.uniform(10, 1000)
+        yield Producto(f"P{i:07d}", f"Producto {i}", f"Categoría {i % categorias}",
+                       costo, costo * azar.uniform(0.8, 2.0), 10)
+
+
+def por_categoria_anterior(productos):
+    """El cálculo de actualizar_analisis antes del motor: recorre todo por cada categoría"""
+    categorias = list(set(p.categoria for p in productos))
+    margenes = [sum(p.margen_ganancia for p in productos if p.categoria == cat)
+                / len([p for p in productos if p.categoria == cat])
+                for cat in categorias]
+    margen_promedio = sum(p.margen_ganancia for p in productos) / len(productos) if productos else 0
+    return margenes, margen_promedio
+
+
+def sin_numpy(datos):
+    buscar_numpy, analisis._numpy = analisis._numpy, lambda: None
+    try:
+        return analizar_margenes(datos, MARGEN_MINIMO)
+    finally:
+        analisis._numpy = buscar_numpy
+
+
+def medir(funcion, datos, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(datos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productos", type=int, default=100000)
+    parser.add_argument("--categorias", type=int, default=40)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    lista = list(productos(args.productos, args.categorias))
+    tabla = TablaProductos(lista)
+    casos = [("anterior (anidado)", por_categoria_anterior, lista)]
+    if analisis._numpy() is not None:
+        casos.append(("numpy, objetos", lambda d: analizar_margenes(d, MARGEN_MINIMO), lista))
+        casos.append(("numpy, tabla", lambda d: analizar_margenes(d, MARGEN_MINIMO), tabla))
+    casos.append(("python, objetos", sin_numpy, lista))
+
+    print(f"{args.productos} productos, {args.categorias} categorías")
+    for nombre, funcion, datos in casos:
+        print(f"{nombre:>20}: {medir(funcion, datos, args.repeticiones) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Mide el autocompletado de la pestaña de ventas sobre un catálogo grande.
+
+Uso (desde la carpeta del programa):
+    python -m benchmarks.autocompletado --productos 100000 --ventas 5000
+"""
+import argparse
+import random
+import time
+
+from stock_core import Autocompletado, Producto
+
+PALABRAS = ["leche", "yerba", "azucar", "arroz", "fideos", "aceite", "harina", "galletitas",
+            "cafe", "te", "jabon", "detergente", "queso", "manteca", "pan", "agua"]
+MARCAS = ["la serenisima", "playadito", "ledesma", "gallo", "lucchetti", "cocinero", "blancaflor",
+          "terrabusi", "cabrales", "taragui", "dove", "magistral", "sancor", "ilolay", "fargo", "villavicencio"]
+
+
+def productos(cantidad):
+    azar = random.Random(0)
+    for i in range(cantidad):
+        nombre = f"{azar.choice(PALABRAS)} {azar.choice(MARCAS)} {azar.randint(1, 2000)}g"
+        yield Producto(f"P{i:07d}", nombre, "General", 10, 20, 100)
+
+
+def medir_consultas(autocompletado, consultas):
+    tiempos = []
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        autocompletado.sugerencias(consulta)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return sum(tiempos) / len(tiempos), tiempos[int(len(tiempos) * 0.99)], tiempos[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productos", type=int, default=100000)
+    parser.add_argument("--ventas", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    lista = list(productos(args.productos))
+    inicio = time.perf_counter()
+    autocompletado = Autocompletado(lista, ventana=args.ventas)
+    print(f"{args.productos} productos, armado: {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+    # Ventas concentradas en pocos productos, como en un negocio real
+    azar = random.Random(1)
+    for _ in range(args.ventas):
+        autocompletado.registrar_venta({"producto": lista[int(azar.paretovariate(1.2)) % len(lista)].nombre})
+
+    consultas = [palabra[:largo] for palabra in PALABRAS + MARCAS for largo in range(1, 5)]
+    consultas += [f"P{azar.randrange(args.productos):07d}"[:largo] for largo in range(2, 9) for _ in range(20)]
+    promedio, p99, maximo = medir_consultas(autocompletado, consultas)
+    print(f"{len(consultas)} consultas: promedio {promedio * 1e6:.0f} µs, "
+          f"p99 {p99 * 1e6:.0f} µs, máximo {maximo * 1e6:.0f} µs")
+
+    nuevo = Producto("NUEVO", "yerba nueva 500g", "General", 10, 20, 100)
+    inicio = time.perf_counter()
+    autocompletado.agregar(nuevo)
+    autocompletado.eliminar(nuevo)
+    print(f"alta + baja: {(time.perf_counter() - inicio) * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    main()
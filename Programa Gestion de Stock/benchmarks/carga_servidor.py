@@ -0,0 +1,116 @@
+"""Prueba de carga del servidor de stock: ventas por segundo con N cajas simultáneas.
+
+Levanta un servidor en una carpeta temporal y, para cada cantidad de
+terminales, corre ese número de procesos que venden tickets sin pausa
+durante `--duracion` segundos. Al final controla que el stock descontado
+coincida con lo vendido y que nada haya quedado negativo.
+
+Uso (desde la carpeta del programa):
+    python -m benchmarks.carga_servidor --terminales 1,2,4,8 --duracion 3
+    python -m benchmarks.carga_servidor --fsync siempre --sqlite
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from stock_core import ClienteStock, Producto
+from stock_core.diario import POLITICAS_FSYNC
+
+STOCK_INICIAL = 10 ** 9
+
+
+def terminal(direccion, productos, lineas, duracion, semilla):
+    """Vende tickets de `lineas` productos al azar hasta agotar el tiempo; devuelve (tickets, unidades)"""
+    cliente = ClienteStock(direccion)
+    azar = random.Random(semilla)
+    tickets = unidades = 0
+    fin = time.perf_counter() + duracion
+    while time.perf_counter() < fin:
+        ticket = [(f"P{azar.randrange(productos):05d}", azar.randint(1, 3)) for _ in range(lineas)]
+        cliente.vender(ticket)
+        tickets += 1
+        unidades += sum(cantidad for _, cantidad in ticket)
+    cliente.cerrar()
+    return tickets, unidades
+
+
+def esperar_servidor(direccion, proceso, limite=10):
+    inicio = time.perf_counter()
+    while True:
+        try:
+            return ClienteStock(direccion)
+        except OSError:
+            if proceso.poll() is not None or time.perf_counter() - inicio > limite:
+                raise RuntimeError("El servidor no arrancó")
+            time.sleep(0.05)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terminales", default="1,2,4,8")
+    parser.add_argument("--duracion", type=float, default=3)
+    parser.add_argument("--productos", type=int, default=1000)
+    parser.add_argument("--lineas", type=int, default=3, help="Líneas por ticket")
+    parser.add_argument("--fsync", choices=POLITICAS_FSYNC, default="nunca")
+    parser.add_argument("--sqlite", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        with open(os.path.join(carpeta, "productos.json"), "w") as f:
+            json.dump([Producto(f"P{i:05d}", f"Producto {i}", "General", 10, 20, STOCK_INICIAL).a_dict()
+                       for i in range(args.productos)], f)
+        archivos = [f"--{nombre}={os.path.join(carpeta, archivo)}" for nombre, archivo in (
+            ("usuarios", "usuarios.json"), ("productos", "productos.json"),
+            ("proveedores", "proveedores.json"), ("ventas", "ventas.json"),
+            ("diario-ventas", "ventas.jsonl"), ("movimientos", "movimientos_stock.jsonl"))]
+        if args.sqlite:
+            from stock_core import PersistenciaJSON, PersistenciaSQLite
+            from stock_core.migrar import migrar_json_a_sqlite
+            base = os.path.join(carpeta, "gestion_stock.db")
+            ruta = lambda archivo: os.path.join(carpeta, archivo)
+            origen = PersistenciaJSON({coleccion: ruta(f"{coleccion}.json") for coleccion in
+                                       ("usuarios", "productos", "proveedores")},
+                                      ruta("ventas.json"), ruta("ventas.jsonl"),
+                                      archivo_movimientos=ruta("movimientos_stock.jsonl"))
+            destino = PersistenciaSQLite(base)
+            migrar_json_a_sqlite(origen, destino)
+            destino.cerrar()
+            archivos.append(f"--sqlite={base}")
+
+        direccion = f"unix:{os.path.join(carpeta, 'servidor.sock')}"
+        proceso = subprocess.Popen([sys.executable, "-m", "stock_core.servidor", "--unix", direccion[5:],
+                                    "--fsync", args.fsync] + archivos, stdout=subprocess.DEVNULL)
+        try:
+            control = esperar_servidor(direccion, proceso)
+            print(f"{args.productos} productos, tickets de {args.lineas} líneas, "
+                  f"{'sqlite' if args.sqlite else 'json, fsync ' + args.fsync}")
+            vendidas = 0
+            with multiprocessing.Pool(max(int(n) for n in args.terminales.split(","))) as pool:
+                for cantidad in (int(n) for n in args.terminales.split(",")):
+                    resultados = pool.starmap(terminal, [
+                        (direccion, args.productos, args.lineas, args.duracion, semilla)
+                        for semilla in range(cantidad)])
+                    tickets = sum(t for t, _ in resultados)
+                    vendidas += sum(u for _, u in resultados)
+                    print(f"{cantidad:3d} terminales: {tickets / args.duracion:8.0f} tickets/s, "
+                          f"{tickets * args.lineas / args.duracion:8.0f} líneas de venta/s")
+            control.cerrar()
+
+            control = ClienteStock(direccion)
+            descontado = sum(STOCK_INICIAL - p.stock for p in control.productos)
+            negativos = sum(1 for p in control.productos if p.stock < 0)
+            control.cerrar()
+            print(f"Unidades vendidas {vendidas}, descontadas {descontado}, stock negativo en {negativos} productos")
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Genera datos sintéticos realistas: catálogo, proveedores e historial de ventas.
+
+Los productos tienen nombres de almacén (producto, marca, presentación),
+costos con distribución lognormal y márgenes de -5% a 90%, así que hay
+productos por debajo del margen mínimo y con stock bajo. Las ventas siguen
+una popularidad sesgada tipo Zipf (el producto de puesto r se vende en
+proporción a 1 / r^sesgo), reparten los días del período en orden de fecha
+y se escriben sin tenerlas todas en memoria: 10 millones entran sin problema.
+
+Uso (desde la carpeta del programa):
+    python -m benchmarks.datos --productos 100000 --ventas 1000000 --destino datos_prueba
+    python -m benchmarks.datos --productos 1000000 --ventas 10000000 --sqlite datos_prueba/gestion_stock.db
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import deque
+from datetime import date, timedelta
+from itertools import accumulate
+
+from stock_core import PersistenciaSQLite, Producto, Proveedor
+from stock_core.historial import ResumenVentas
+
+PRODUCTOS = ["leche", "yerba", "azucar", "arroz", "fideos", "aceite", "harina", "galletitas", "cafe", "te",
+             "jabon", "detergente", "queso", "manteca", "pan", "agua", "gaseosa", "cerveza", "vino", "arvejas",
+             "atun", "mermelada", "dulce de leche", "yogur", "shampoo", "papel higienico", "lavandina", "sal"]
+MARCAS = ["la serenisima", "playadito", "ledesma", "gallo", "lucchetti", "cocinero", "blancaflor", "terrabusi",
+          "cabrales", "taragui", "dove", "magistral", "sancor", "ilolay", "fargo", "villavicencio", "arcor",
+          "molinos", "marolio", "knorr", "quilmes", "coca cola", "manaos", "elegante", "campagnola", "celusal"]
+PRESENTACIONES = ["250g", "500g", "1kg", "2kg", "500ml", "1l", "1.5l", "2.25l", "x6", "x12", "familiar", "light"]
+CATEGORIAS = ["Almacén", "Lácteos", "Bebidas", "Limpieza", "Perfumería", "Panadería", "Congelados",
+              "Fiambrería", "Verdulería", "Kiosco", "Mascotas", "Bazar"]
+CALLES = ["San Martín", "Belgrano", "Rivadavia", "Mitre", "Sarmiento", "Moreno", "9 de Julio", "Urquiza"]
+CANTIDADES = (1, 2, 3, 4, 5, 10)
+PESOS_CANTIDADES = (60, 20, 9, 5, 4, 2)
+
+
+def generar_productos(cantidad, azar):
+    productos = []
+    for i in range(cantidad):
+        costo = round(min(max(azar.lognormvariate(6, 1), 1), 100000), 2)
+        precio = round(costo * (1 + azar.uniform(-0.05, 0.9)), 2)
+        nombre = f"{azar.choice(PRODUCTOS)} {azar.choice(MARCAS)} {azar.choice(PRESENTACIONES)} {i}"
+        productos.append(Producto(f"P{i:07d}", nombre, azar.choice(CATEGORIAS), costo, precio,
+                                  int(azar.expovariate(1 / 50)), azar.choice((0, 2, 5, 10, 20))))
+    return productos
+
+
+def generar_proveedores(cantidad, azar):
+    return [Proveedor(f"Distribuidora {azar.choice(MARCAS).title()} {i}", f"11-{azar.randint(4000, 6999)}-"
+                      f"{azar.randint(1000, 9999)}", f"{azar.choice(CALLES)} {azar.randint(1, 5000)}")
+            for i in range(cantidad)]
+
+
+def generar_ventas(productos, cantidad, azar, sesgo=1.1, desde=date(2024, 1, 1), dias=365):
+    """Recorre `cantidad` ventas en orden de fecha, con la popularidad sesgada"""
+    if not productos or not cantidad:
+        return
+    # Los puestos de popularidad se reparten al azar: los más vendidos no son los primeros códigos
+    por_popularidad = list(productos)
+    azar.shuffle(por_popularidad)
+    acumulados = list(accumulate(1 / (puesto + 1) ** sesgo for puesto in range(len(por_popularidad))))
+    base, resto = divmod(cantidad, dias)
+    for dia in range(dias):
+        del_dia = base + (dia < resto)
+        if not del_dia:
+            continue
+        fecha = (desde + timedelta(days=dia)).isoformat()
+        segundos = sorted(azar.randrange(8 * 3600, 22 * 3600) for _ in range(del_dia))
+        vendidos = azar.choices(por_popularidad, cum_weights=acumulados, k=del_dia)
+        cantidades = azar.choices(CANTIDADES, PESOS_CANTIDADES, k=del_dia)
+        for segundo, producto, unidades in zip(segundos, vendidos, cantidades):
+            hora, minuto = divmod(segundo // 60, 60)
+            yield {
+                "producto": producto.nombre,
+                "cantidad": unidades,
+                "fecha": f"{fecha} {hora:02d}:{minuto:02d}:{segundo % 60:02d}",
+                "total": round(producto.precio * unidades, 2)
+            }
+
+
+def escribir_json(carpeta, productos, proveedores, ventas):
+    """Escribe los archivos JSON de la aplicación. Devuelve cuántas ventas escribió"""
+    os.makedirs(carpeta, exist_ok=True)
+    with open(os.path.join(carpeta, "productos.json"), "w") as f:
+        json.dump([p.a_dict() for p in productos], f)
+    with open(os.path.join(carpeta, "proveedores.json"), "w") as f:
+        json.dump([p.a_dict() for p in proveedores], f)
+
+    # El snapshot de ventas en bloques y su resumen, con el formato de DiarioVentas,
+    # así la aplicación arranca sin recorrerlo
+    resumen = ResumenVentas()
+    ultimas = deque(maxlen=5000)
+    archivo_ventas = os.path.join(carpeta, "ventas.json")
+    with open(archivo_ventas, "w") as f:
+        f.write("[")
+        separador = ""
+        bloque = []
+        for venta in ventas:
+            resumen.agregar(venta)
+            ultimas.append(venta)
+            bloque.append(json.dumps(venta))
+            if len(bloque) >= 10000:
+                f.write(separador + ", ".join(bloque))
+                separador, bloque = ", ", []
+        if bloque:
+            f.write(separador + ", ".join(bloque))
+        f.write("]")
+    with open(os.path.join(carpeta, "ventas.resumen.json"), "w") as f:
+        json.dump(dict(resumen.a_dict(), bytes=os.path.getsize(archivo_ventas), ultimas=list(ultimas)), f)
+    open(os.path.join(carpeta, "ventas.jsonl"), "w").close()
+    return resumen.cantidad
+
+
+def escribir_sqlite(archivo, productos, proveedores, ventas):
+    """Carga los datos en una base SQLite nueva, una transacción por colección. Devuelve cuántas ventas escribió"""
+    base = PersistenciaSQLite(archivo)
+    try:
+        if not base.vacia():
+            raise ValueError(f"La base {archivo} ya tiene datos")
+        base.importar("productos", (p.a_dict() for p in productos))
+        base.importar("proveedores", (p.a_dict() for p in proveedores))
+        return base.importar("ventas", ventas)
+    finally:
+        base.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--productos", type=int, default=10000)
+    parser.add_argument("--ventas", type=int, default=100000)
+    parser.add_argument("--proveedores", type=int, default=50)
+    parser.add_argument("--sesgo", type=float, default=1.1, help="Exponente de la popularidad (0 = uniforme)")
+    parser.add_argument("--desde", type=date.fromisoformat, default=date(2024, 1, 1))
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--destino", default="datos_prueba", help="Carpeta de los archivos JSON")
+    parser.add_argument("--sqlite", help="Escribir en esta base SQLite en lugar de archivos JSON")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    azar = random.Random(args.semilla)
+    productos = generar_productos(args.productos, azar)
+    proveedores = generar_proveedores(args.proveedores, azar)
+    ventas = generar_ventas(productos, args.ventas, azar, args.sesgo, args.desde, args.dias)
+    try:
+        if args.sqlite:
+            escritas = escribir_sqlite(args.sqlite, productos, proveedores, ventas)
+        else:
+            escritas = escribir_json(args.destino, productos, proveedores, ventas)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{len(productos)} productos, {len(proveedores)} proveedores y {escritas} ventas "
+          f"en {args.sqlite or args.destino} ({time.perf_counter() - inicio:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Prueba de estrés de concurrencia: muchos vendedores sobre un mismo producto.
+
+Cada escenario arranca con `--stock` unidades de un solo código y lanza
+vendedores que venden de a 1 a 3 unidades hasta agotarlo. Al final controla
+que lo vendido sea exactamente el stock inicial, que el stock guardado haya
+quedado en cero, que el historial tenga todas esas unidades y que la versión
+del producto haya subido una vez por venta.
+
+Escenarios:
+    hilos-json, hilos-sqlite  hilos que comparten un MotorStock; cada uno pasa
+                              la versión que leyó y reintenta si otro vendió antes
+    procesos-sqlite           procesos con su propio MotorStock sobre la misma base:
+                              copias en memoria viejas que se corrigen por versión
+    servidor                  procesos terminales contra un servidor de stock
+
+Uso (desde la carpeta del programa):
+    python -m benchmarks.estres_concurrencia --vendedores 8 --stock 500
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from benchmarks.carga_servidor import esperar_servidor
+from stock_core import ClienteStock, ConflictoVersion, MotorStock, PersistenciaJSON, PersistenciaSQLite, Producto
+
+CODIGO = "A1"
+ESCENARIOS = ("hilos-json", "hilos-sqlite", "procesos-sqlite", "servidor")
+# Procesos nuevos y no copias por fork: el proceso principal ya tiene hilos (autoguardado, pools)
+PROCESOS = multiprocessing.get_context("spawn")
+
+
+def vender_hasta_agotar(motor, semilla, con_version):
+    """Vende hasta que no queda stock; devuelve (unidades vendidas, conflictos)"""
+    azar = random.Random(semilla)
+    vendidas = conflictos = 0
+    cantidad = azar.randint(1, 3)
+    while True:
+        producto = motor.producto(CODIGO)
+        linea = (CODIGO, cantidad, producto.version) if con_version else (CODIGO, cantidad)
+        try:
+            motor.vender([linea])
+        except ConflictoVersion:
+            conflictos += 1  # Otro vendió entre la lectura y la venta: se vuelve a leer
+            continue
+        except ValueError:
+            if motor.producto(CODIGO).stock == 0:
+                return vendidas, conflictos
+            cantidad = 1  # Quedan menos unidades que las pedidas
+            continue
+        vendidas += cantidad
+        cantidad = azar.randint(1, 3)
+
+
+def vendedor_sqlite(base, semilla):
+    motor = MotorStock(PersistenciaSQLite(base))
+    try:
+        vendidas, conflictos = vender_hasta_agotar(motor, semilla, con_version=False)
+        return vendidas, conflictos + motor.reintentados
+    finally:
+        motor.cerrar()
+
+
+def vendedor_terminal(direccion, semilla):
+    cliente = ClienteStock(direccion)
+    try:
+        return vender_hasta_agotar(cliente, semilla, con_version=False)
+    finally:
+        cliente.cerrar()
+
+
+def persistencia_json(carpeta):
+    ruta = lambda archivo: os.path.join(carpeta, archivo)
+    return PersistenciaJSON({coleccion: ruta(f"{coleccion}.json") for coleccion in
+                             ("usuarios", "productos", "proveedores")},
+                            ruta("ventas.json"), ruta("ventas.jsonl"), fsync="nunca",
+                            archivo_movimientos=ruta("movimientos_stock.jsonl"))
+
+
+def preparar(persistencia, stock):
+    """Motor con un solo producto, ya guardado para que lo vean los otros procesos"""
+    motor = MotorStock(persistencia)
+    motor.agregar_producto(Producto(CODIGO, "Yerba 1kg", "Almacén", 100, 150, stock))
+    motor.guardar()
+    return motor
+
+
+def escenario(nombre, carpeta, vendedores, stock):
+    """Corre un escenario; devuelve (unidades y conflictos por vendedor, motor sobre lo guardado)"""
+    if nombre.startswith("hilos"):
+        if nombre == "hilos-json":
+            motor = preparar(persistencia_json(carpeta), stock)
+        else:
+            motor = preparar(PersistenciaSQLite(os.path.join(carpeta, "stock.db")), stock)
+        with ThreadPoolExecutor(vendedores) as pool:
+            resultados = list(pool.map(lambda semilla: vender_hasta_agotar(motor, semilla, True),
+                                       range(vendedores)))
+        motor.cerrar()
+        if nombre == "hilos-json":
+            return resultados, MotorStock(persistencia_json(carpeta))
+        return resultados, MotorStock(PersistenciaSQLite(os.path.join(carpeta, "stock.db")))
+
+    if nombre == "procesos-sqlite":
+        base = os.path.join(carpeta, "stock.db")
+        preparar(PersistenciaSQLite(base), stock).cerrar()
+        with ProcessPoolExecutor(vendedores, mp_context=PROCESOS) as pool:
+            resultados = list(pool.map(vendedor_sqlite, [base] * vendedores, range(vendedores)))
+        return resultados, MotorStock(PersistenciaSQLite(base))
+
+    preparar(persistencia_json(carpeta), stock).cerrar()
+    direccion = f"unix:{os.path.join(carpeta, 'servidor.sock')}"
+    archivos = [f"--{nombre}={os.path.join(carpeta, archivo)}" for nombre, archivo in (
+        ("usuarios", "usuarios.json"), ("productos", "productos.json"),
+        ("proveedores", "proveedores.json"), ("ventas", "ventas.json"),
+        ("diario-ventas", "ventas.jsonl"), ("movimientos", "movimientos_stock.jsonl"))]
+    proceso = subprocess.Popen([sys.executable, "-m", "stock_core.servidor", "--unix", direccion[5:],
+                                "--fsync", "nunca"] + archivos, stdout=subprocess.DEVNULL)
+    try:
+        esperar_servidor(direccion, proceso).cerrar()
+        with ProcessPoolExecutor(vendedores, mp_context=PROCESOS) as pool:
+            resultados = list(pool.map(vendedor_terminal, [direccion] * vendedores, range(vendedores)))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    return resultados, MotorStock(persistencia_json(carpeta))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--escenarios", default=",".join(ESCENARIOS))
+    parser.add_argument("--vendedores", type=int, default=8)
+    parser.add_argument("--stock", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    fallas = 0
+    for nombre in args.escenarios.split(","):
+        with tempfile.TemporaryDirectory() as carpeta:
+            inicio = time.perf_counter()
+            resultados, control = escenario(nombre, carpeta, args.vendedores, args.stock)
+            segundos = time.perf_counter() - inicio
+            vendidas = sum(v for v, _ in resultados)
+            conflictos = sum(c for _, c in resultados)
+            producto = control.producto(CODIGO)
+            ventas = [venta for venta in control.ventas.todas() if venta["producto"] == producto.nombre]
+            control.cerrar()
+
+        errores = []
+        if vendidas != args.stock:
+            errores.append(f"vendidas {vendidas} de {args.stock}")
+        if producto.stock != 0:
+            errores.append(f"stock final {producto.stock}")
+        if sum(venta["cantidad"] for venta in ventas) != args.stock:
+            errores.append(f"historial con {sum(v['cantidad'] for v in ventas)} unidades")
+        if producto.version != len(ventas):
+            errores.append(f"versión {producto.version} con {len(ventas)} ventas")
+        fallas += bool(errores)
+        print(f"{nombre:16s} {args.vendedores} vendedores: {len(ventas):5d} ventas en {segundos:6.2f} s, "
+              f"{conflictos:5d} conflictos reintentados -> {'; '.join(errores) or 'ok'}")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
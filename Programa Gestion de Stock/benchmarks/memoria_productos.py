@@ -0,0 +1,71 @@
+"""Compara la memoria del catálogo según su representación.
+
+Uso (desde la carpeta del programa):
+    python -m benchmarks.memoria_productos --tamanos 10000,100000,1000000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from stock_core import Producto, TablaProductos
+
+
+class ProductoConDict:
+    """Producto como era antes de __slots__: un __dict__ por instancia"""
+
+    def __init__(self, codigo, nombre, categoria, costo, precio, stock, stock_minimo=5):
+        self.codigo = codigo
+        self.nombre = nombre
+        self.categoria = categoria
+        self.costo = float(costo)
+        self.precio = float(precio)
+        self.stock = int(stock)
+        self.stock_minimo = int(stock_minimo)
+
+
+def registros(cantidad):
+    for i in range(cantidad):
+        yield {
+            "codigo": f"P{i:07d}",
+            "nombre": f"Producto {i}",
+            "categoria": f"Categoría {i % 40}",
+            "costo": 100 + i % 500,
+            "precio": 150 + i % 700,
+            "stock": i % 200,
+            "stock_minimo": 5
+        }
+
+
+def medir(construir, cantidad):
+    """Bytes asignados por `construir` con `cantidad` productos (sin contar los textos de origen)"""
+    datos = list(registros(cantidad))
+    gc.collect()
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    resultado = construir(datos)
+    usado = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del resultado
+    return usado
+
+
+LAYOUTS = {
+    "dict": lambda datos: [ProductoConDict(**r) for r in datos],
+    "slots": lambda datos: [Producto(**r) for r in datos],
+    "tabla": TablaProductos.desde_registros
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", default="10000,100000,1000000")
+    args = parser.parse_args(argv)
+
+    print(f"{'productos':>10} " + " ".join(f"{nombre:>12}" for nombre in LAYOUTS) + "  (MiB)")
+    for cantidad in (int(t) for t in args.tamanos.split(",")):
+        resultados = [medir(construir, cantidad) / 2**20 for construir in LAYOUTS.values()]
+        print(f"{cantidad:>10} " + " ".join(f"{mib:>12.1f}" for mib in resultados))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Suite de benchmarks: las operaciones principales sobre datos sintéticos de varios tamaños.
+
+Para cada tamaño genera los datos (ver benchmarks.datos) en una carpeta
+temporal y mide:
+    cargar_datos           abrir la tienda: catálogo, resumen de ventas, usuarios y alertas
+    guardar_completo       reescribir el catálogo entero
+    guardar_un_producto    guardar el cambio de un solo producto
+    buscar_codigo          un producto por código (por búsqueda)
+    buscar_nombre          un producto por nombre (por búsqueda)
+    registrar_venta        un ticket de una línea, con la política de fsync elegida (por venta)
+    analisis               márgenes por categoría, histograma y extremos, como actualizar_analisis
+    leer_historial         recorrer el historial entero la primera vez
+    indexar_historial      armar el índice del buscador del historial
+    filtrar_historial      búsquedas de texto en el índice (por búsqueda)
+    filtrar_fechas         las ventas de un mes
+
+Los resultados se agregan a un archivo JSON (una corrida por elemento, con
+la versión del código) para poder compararlos entre versiones.
+
+Uso (desde la carpeta del programa):
+    python -m benchmarks.suite --tamanos 1000:10000,100000:1000000
+    python -m benchmarks.suite --tamanos 1000000:10000000 --sqlite --repeticiones 1
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks import datos
+from stock_core import AlertasStock, IndiceVentas, PersistenciaJSON, PersistenciaSQLite, Tienda
+from stock_core.analisis import _numpy
+
+MARGEN_MINIMO = 20
+CONSULTAS_HISTORIAL = ["leche", "serenisima", "2024-06", "light", "te elegante", "x12"]
+
+
+def medir(funcion, repeticiones, operaciones=1):
+    """Corre `funcion` varias veces; tiempos en segundos por operación"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) / operaciones)
+    return {
+        "mediana_s": statistics.median(tiempos),
+        "minimo_s": min(tiempos),
+        "maximo_s": max(tiempos),
+        "repeticiones": repeticiones,
+        "operaciones": operaciones
+    }
+
+
+def abrir(carpeta, sqlite, fsync):
+    if sqlite:
+        return PersistenciaSQLite(os.path.join(carpeta, "gestion_stock.db"))
+    ruta = lambda archivo: os.path.join(carpeta, archivo)
+    return PersistenciaJSON({coleccion: ruta(f"{coleccion}.json") for coleccion in
+                             ("usuarios", "productos", "proveedores")},
+                            ruta("ventas.json"), ruta("ventas.jsonl"), fsync=fsync,
+                            archivo_movimientos=ruta("movimientos_stock.jsonl"))
+
+
+def medir_tamano(carpeta, args, cantidad_productos, cantidad_ventas):
+    azar = random.Random(args.semilla)
+    inicio = time.perf_counter()
+    productos = datos.generar_productos(cantidad_productos, azar)
+    proveedores = datos.generar_proveedores(50, azar)
+    ventas = datos.generar_ventas(productos, cantidad_ventas, azar)
+    if args.sqlite:
+        datos.escribir_sqlite(os.path.join(carpeta, "gestion_stock.db"), productos, proveedores, ventas)
+    else:
+        datos.escribir_json(carpeta, productos, proveedores, ventas)
+    generar = time.perf_counter() - inicio
+    codigos = [p.codigo for p in azar.sample(productos, min(len(productos), args.busquedas))]
+    nombres = [p.nombre for p in azar.sample(productos, min(len(productos), args.busquedas))]
+    del productos
+    resultados = {}
+    repeticiones = args.repeticiones
+
+    def cargar():
+        tienda = Tienda(abrir(carpeta, args.sqlite, args.fsync))
+        AlertasStock(tienda.productos)
+        abiertas.append(tienda)
+
+    abiertas = []
+    resultados["cargar_datos"] = medir(cargar, repeticiones)
+    for tienda in abiertas[1:]:
+        tienda.cerrar()
+    tienda = abiertas[0]
+
+    def guardar_completo():
+        tienda.persistencia.marcar("productos")
+        tienda.guardar()
+
+    def guardar_un_producto():
+        tienda.motor.fijar_stock_minimo(codigos[0], azar.randint(0, 20))
+        tienda.guardar()
+
+    resultados["guardar_completo"] = medir(guardar_completo, repeticiones)
+    resultados["guardar_un_producto"] = medir(guardar_un_producto, repeticiones)
+
+    catalogo = tienda.productos
+    resultados["buscar_codigo"] = medir(lambda: [catalogo.buscar(c) for c in codigos], repeticiones, len(codigos))
+    resultados["buscar_nombre"] = medir(lambda: [catalogo.buscar_por_nombre(n) for n in nombres],
+                                        repeticiones, len(nombres))
+
+    def analisis():
+        resultado = tienda.analizar_margenes(MARGEN_MINIMO)
+        resultado.histograma(20)
+        resultado.extremos(20)
+        resultado.extremos(20, menores=True)
+
+    resultados["analisis"] = medir(analisis, repeticiones)
+
+    # El historial se lee una sola vez por tienda: cada repetición abre una nueva
+    def historial():
+        otra = Tienda(abrir(carpeta, args.sqlite, args.fsync))
+        try:
+            inicio = time.perf_counter()
+            ventas = otra.ventas.todas()
+            tiempos["leer_historial"].append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            indice = IndiceVentas()
+            for venta in ventas:
+                indice.agregar((venta["fecha"], venta["producto"], venta["cantidad"], f"${venta['total']:.2f}"))
+            tiempos["indexar_historial"].append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            for consulta in CONSULTAS_HISTORIAL:
+                indice.buscar(consulta)
+            tiempos["filtrar_historial"].append((time.perf_counter() - inicio) / len(CONSULTAS_HISTORIAL))
+
+            inicio = time.perf_counter()
+            sum(1 for _ in otra.ventas_entre("2024-06", "2024-06~"))
+            tiempos["filtrar_fechas"].append(time.perf_counter() - inicio)
+        finally:
+            otra.cerrar()
+
+    tiempos = {nombre: [] for nombre in ("leer_historial", "indexar_historial", "filtrar_historial",
+                                         "filtrar_fechas")}
+    for _ in range(repeticiones):
+        historial()
+    for nombre, medidos in tiempos.items():
+        resultados[nombre] = {"mediana_s": statistics.median(medidos), "minimo_s": min(medidos),
+                              "maximo_s": max(medidos), "repeticiones": repeticiones,
+                              "operaciones": len(CONSULTAS_HISTORIAL) if nombre == "filtrar_historial" else 1}
+
+    # Al final: agrega ventas y baja el stock de lo que vende
+    for codigo in codigos[:100]:
+        tienda.motor.ajustar_stock(codigo, args.ventas_registradas * repeticiones, "benchmark")
+    lineas = [[(azar.choice(codigos[:100]), 1)] for _ in range(args.ventas_registradas)]
+    resultados["registrar_venta"] = medir(lambda: [tienda.motor.vender(linea) for linea in lineas],
+                                          repeticiones, len(lineas))
+    tienda.cerrar()
+    return {"productos": cantidad_productos, "ventas": cantidad_ventas, "generar_s": generar,
+            "mediciones": resultados}
+
+
+def version_del_codigo():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def mostrar(caso):
+    print(f"{caso['productos']} productos, {caso['ventas']} ventas (generados en {caso['generar_s']:.1f} s)")
+    for nombre, medicion in caso["mediciones"].items():
+        mediana = medicion["mediana_s"]
+        texto = f"{mediana * 1e6:10.1f} µs" if mediana < 1e-3 else f"{mediana * 1e3:10.1f} ms"
+        por = " por operación" if medicion["operaciones"] > 1 else ""
+        print(f"  {nombre:22s}{texto}{por}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanos", default="1000:10000,100000:200000",
+                        help="Pares productos:ventas separados por comas")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--busquedas", type=int, default=10000)
+    parser.add_argument("--ventas-registradas", type=int, default=500)
+    parser.add_argument("--fsync", choices=("siempre", "cada_n", "nunca"), default="siempre")
+    parser.add_argument("--sqlite", action="store_true", help="Medir con SQLite en lugar de archivos JSON")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="resultados_benchmarks.json",
+                        help="Archivo JSON al que se agrega esta corrida")
+    args = parser.parse_args(argv)
+
+    corrida = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "version": version_del_codigo(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesadores": os.cpu_count(),
+        "numpy": _numpy() is not None,
+        "almacenamiento": "sqlite" if args.sqlite else "json",
+        "fsync": args.fsync,
+        "casos": []
+    }
+    for tamano in args.tamanos.split(","):
+        cantidad_productos, cantidad_ventas = (int(n) for n in tamano.split(":"))
+        with tempfile.TemporaryDirectory() as carpeta:
+            caso = medir_tamano(carpeta, args, cantidad_productos, cantidad_ventas)
+        mostrar(caso)
+        corrida["casos"].append(caso)
+
+    try:
+        with open(args.salida) as f:
+            corridas = json.load(f)
+    except FileNotFoundError:
+        corridas = []
+    corridas.append(corrida)
+    with open(args.salida, "w") as f:
+        json.dump(corridas, f, indent=2)
+    print(f"Resultados agregados a {args.salida} ({len(corridas)} corridas)")
+
+
+if __name__ == "__main__":
+    main()
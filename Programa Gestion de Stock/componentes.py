@@ -0,0 +1,374 @@
+import math
+import threading
+import tkinter
+from tkinter import TclError
+
+import customtkinter as ctk
+
+
+class ListaVirtual(ctk.CTkFrame):
+    """Lista desplazable que solo crea las filas visibles.
+
+    Se arma un grupo fijo de filas (las que entran en pantalla) y al
+    desplazarse se reutilizan mostrando otros elementos, así el costo de
+    construir y desplazar no depende de la cantidad de elementos.
+    `crear_fila(contenedor)` arma una fila vacía y `mostrar_fila(fila, elemento)`
+    la completa con un elemento.
+    """
+
+    def __init__(self, master, crear_fila, mostrar_fila, alto_fila=40, **kwargs):
+        super().__init__(master, **kwargs)
+        self.crear_fila = crear_fila
+        self.mostrar_fila = mostrar_fila
+        self.alto_fila = alto_fila
+        self.elementos = []
+        self.inicio = 0
+        self.filas = []
+
+        self.contenedor = ctk.CTkFrame(self, fg_color="transparent")
+        self.contenedor.pack(side="left", fill="both", expand=True)
+        self.contenedor.grid_columnconfigure(0, weight=1)
+        self.contenedor.grid_propagate(False)  # Las filas no agrandan el contenedor
+        self.barra = ctk.CTkScrollbar(self, command=self._desplazar)
+        self.barra.pack(side="right", fill="y")
+
+        self.contenedor.bind("<Configure>", self._redimensionar)
+        self._enganchar_rueda(self)
+
+    def establecer(self, elementos):
+        """Reemplaza los elementos mostrados (una secuencia indexable)"""
+        self.elementos = elementos
+        self.inicio = min(self.inicio, self._inicio_maximo())
+        self._refrescar()
+
+    def refrescar_elemento(self, elemento):
+        """Vuelve a dibujar la fila de un elemento, si está a la vista"""
+        fila = self.fila_de(elemento)
+        if fila is not None:
+            self.mostrar_fila(fila, elemento)
+
+    def fila_de(self, elemento):
+        """Fila que muestra un elemento, o None si no está a la vista"""
+        for indice, fila in enumerate(self.filas):
+            posicion = self.inicio + indice
+            if posicion < len(self.elementos) and self.elementos[posicion] is elemento:
+                return fila
+        return None
+
+    def _inicio_maximo(self):
+        return max(0, len(self.elementos) - len(self.filas))
+
+    def _redimensionar(self, event):
+        visibles = max(1, math.ceil(event.height / self.alto_fila))
+        while len(self.filas) < visibles:
+            fila = self.crear_fila(self.contenedor)
+            fila.grid(row=len(self.filas), column=0, sticky="ew", pady=2, padx=5)
+            self._enganchar_rueda(fila)
+            self.filas.append(fila)
+        while len(self.filas) > visibles:
+            self.filas.pop().destroy()
+        self.inicio = min(self.inicio, self._inicio_maximo())
+        self._refrescar()
+
+    def _refrescar(self):
+        for indice, fila in enumerate(self.filas):
+            posicion = self.inicio + indice
+            if posicion < len(self.elementos):
+                self.mostrar_fila(fila, self.elementos[posicion])
+                fila.grid()
+            else:
+                fila.grid_remove()
+
+        total = len(self.elementos)
+        if total:
+            self.barra.set(self.inicio / total, min(1.0, (self.inicio + len(self.filas)) / total))
+        else:
+            self.barra.set(0.0, 1.0)
+
+    def _mover_a(self, inicio):
+        inicio = max(0, min(int(inicio), self._inicio_maximo()))
+        if inicio != self.inicio:
+            self.inicio = inicio
+            self._refrescar()
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        if accion == "moveto":
+            self._mover_a(float(cantidad) * len(self.elementos))
+        elif unidad == "pages":
+            self._mover_a(self.inicio + int(cantidad) * len(self.filas))
+        else:
+            self._mover_a(self.inicio + int(cantidad))
+
+    def _enganchar_rueda(self, widget):
+        """La rueda se escucha en cada widget propio (no con bind_all): se va con ellos al destruirlos"""
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tkinter.Misc.bind(widget, evento, self._rueda, add="+")
+        for hijo in widget.winfo_children():
+            self._enganchar_rueda(hijo)
+
+    def _rueda(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self._mover_a(self.inicio - 3)
+        else:
+            self._mover_a(self.inicio + 3)
+
+
+class FilaProducto(ctk.CTkFrame):
+    """Fila reutilizable del inventario; los botones actúan sobre el producto que muestra"""
+
+    def __init__(self, master, acciones):
+        super().__init__(master, corner_radius=5)
+        self.producto = None
+
+        self.labels = {
+            'codigo': ctk.CTkLabel(self, width=80),
+            'nombre': ctk.CTkLabel(self, width=200),
+            'categoria': ctk.CTkLabel(self, width=150),
+            'stock': ctk.CTkLabel(self, width=100),
+            'alerta': ctk.CTkLabel(self, width=100)
+        }
+        for label in self.labels.values():
+            label.pack(side='left', padx=5)
+
+        btn_frame = ctk.CTkFrame(self, fg_color='transparent')
+        btn_frame.pack(side='right', padx=5)
+
+        btn_menos = ctk.CTkButton(btn_frame, text="-", width=30, height=30, fg_color="#1e6ba5")
+        btn_menos.bind("<ButtonPress-1>", lambda e: acciones['ajustar'](self.producto, -1))
+        btn_menos.bind("<ButtonRelease-1>", lambda e: acciones['detener']())
+        btn_menos.pack(side='left', padx=2)
+
+        btn_mas = ctk.CTkButton(btn_frame, text="+", width=30, height=30, fg_color="#1e6ba5")
+        btn_mas.bind("<ButtonPress-1>", lambda e: acciones['ajustar'](self.producto, 1))
+        btn_mas.bind("<ButtonRelease-1>", lambda e: acciones['detener']())
+        btn_mas.pack(side='left', padx=2)
+
+        ctk.CTkButton(btn_frame, text="Fijar Alerta", width=80, fg_color="#1e6ba5",
+                      command=lambda: acciones['alerta'](self.producto)).pack(side='left', padx=2)
+        ctk.CTkButton(btn_frame, text="Eliminar", width=80, fg_color="#b30000",
+                      command=lambda: acciones['eliminar'](self.producto)).pack(side='left', padx=2)
+
+    def mostrar(self, producto):
+        self.producto = producto
+        self.labels['codigo'].configure(text=producto.codigo)
+        self.labels['nombre'].configure(text=producto.nombre)
+        self.labels['categoria'].configure(text=producto.categoria)
+        self.labels['stock'].configure(text=f"Stock: {producto.stock}")
+        self.labels['alerta'].configure(text=f"Alerta: {producto.stock_minimo}")
+        color = "#4a0000" if producto.stock <= producto.stock_minimo else "#404040"
+        self.configure(fg_color=color)
+
+    def mostrar_stock(self, stock):
+        """Solo el número de stock, mientras se mantiene apretado + o -"""
+        self.labels['stock'].configure(text=f"Stock: {stock}")
+
+
+class FilaAlerta(ctk.CTkFrame):
+    """Fila reutilizable del panel de stock bajo"""
+
+    def __init__(self, master):
+        super().__init__(master, corner_radius=5, fg_color="#4a0000")
+        ctk.CTkLabel(self, text="⚠️", width=30).pack(side='left', padx=5)
+        self.nombre = ctk.CTkLabel(self, width=200)
+        self.nombre.pack(side='left', padx=5)
+        self.stock = ctk.CTkLabel(self, width=200)
+        self.stock.pack(side='left', padx=5)
+
+    def mostrar(self, producto):
+        self.nombre.configure(text=producto.nombre)
+        self.stock.configure(text=f"Stock: {producto.stock} (Alerta: {producto.stock_minimo})")
+
+
+class FilaPrecio(ctk.CTkFrame):
+    """Fila reutilizable de la lista de precios; un clic elige el producto que muestra"""
+
+    def __init__(self, master, elegir):
+        super().__init__(master, corner_radius=5, fg_color="#404040")
+        self.producto = None
+        self.nombre = ctk.CTkLabel(self, width=200, anchor="w")
+        self.nombre.pack(side='left', padx=5)
+        self.precio = ctk.CTkLabel(self, width=100)
+        self.precio.pack(side='right', padx=5)
+        for widget in (self, self.nombre, self.precio):
+            widget.bind("<Button-1>", lambda e: self.producto and elegir(self.producto))
+
+    def mostrar(self, producto):
+        self.producto = producto
+        self.nombre.configure(text=producto.nombre)
+        self.precio.configure(text=f"${producto.precio:.2f}")
+
+
+class BusquedaDiferida:
+    """Buscador que no traba el tipeo.
+
+    Espera `demora_ms` desde la última tecla, corre `buscar(texto)` en un hilo
+    aparte y entrega el resultado con `mostrar(resultado)` en el hilo de Tk
+    (vía `after`). Si se volvió a tipear mientras tanto, la consulta vieja se
+    descarta sin correrla o, si ya estaba corriendo, sin mostrarla. Si
+    `buscar` falla, el error se entrega igual con `al_fallar(error)`.
+    """
+
+    def __init__(self, entry, buscar, mostrar, demora_ms=200, al_fallar=None):
+        self.entry = entry
+        self.buscar = buscar
+        self.mostrar = mostrar
+        self.al_fallar = al_fallar
+        self.demora_ms = demora_ms
+        self.error = None
+        self._generacion = 0
+        self._programada = None
+        self._pendiente = None
+        self._detenida = False
+        self._condicion = threading.Condition()
+        self._hilo = threading.Thread(target=self._trabajar, daemon=True)
+        self._hilo.start()
+
+        entry.bind("<KeyRelease>", self.programar, add="+")
+        entry.bind("<Destroy>", lambda e: self.detener(), add="+")
+
+    def programar(self, event=None):
+        """Reinicia la espera; cualquier consulta anterior queda vieja"""
+        self._generacion += 1
+        if self._programada is not None:
+            self.entry.after_cancel(self._programada)
+        self._programada = self.entry.after(self.demora_ms, self._lanzar)
+
+    def detener(self):
+        with self._condicion:
+            self._detenida = True
+            self._condicion.notify()
+
+    def _lanzar(self):
+        self._programada = None
+        with self._condicion:
+            # Si el hilo todavía no tomó la anterior, se reemplaza
+            self._pendiente = (self._generacion, self.entry.get())
+            self._condicion.notify()
+
+    def _trabajar(self):
+        while True:
+            with self._condicion:
+                while self._pendiente is None and not self._detenida:
+                    self._condicion.wait()
+                if self._detenida:
+                    return
+                generacion, texto = self._pendiente
+                self._pendiente = None
+            if generacion != self._generacion:
+                continue
+            try:
+                resultado, entregar = self.buscar(texto), self.mostrar
+            except Exception as e:
+                self.error = e
+                if self.al_fallar is None:
+                    continue
+                resultado, entregar = e, self.al_fallar
+            try:
+                self.entry.after(0, self._entregar, generacion, entregar, resultado)
+            except (RuntimeError, TclError):
+                return  # La ventana ya no existe
+
+    def _entregar(self, generacion, entregar, resultado):
+        if generacion == self._generacion and not self._detenida:
+            entregar(resultado)
+
+
+class GraficoBarras:
+    """Gráfico de barras de matplotlib embebido, que reutiliza sus barras.
+
+    Si se vuelve a dibujar con la misma cantidad de barras (por ejemplo, las
+    mismas categorías) solo se cambian alturas, colores y etiquetas de las
+    barras existentes: no se limpia el eje ni se recalcula la disposición.
+    `clave` guarda con qué datos se dibujó por última vez; quien lo usa la
+    compara para no volver a dibujar lo que ya está en pantalla.
+    """
+
+    def __init__(self, master, titulo, xlabel="", ylabel="", horizontal=False):
+        # matplotlib es el import más pesado de la aplicación: se paga recién con el primer gráfico
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        self.horizontal = horizontal
+        self.barras = None
+        self.rango = None
+        self.clave = None
+        self.fig = Figure(figsize=(8, 5), dpi=100, facecolor='white')
+        self.ax = self.fig.add_subplot(111)
+        self.ax.set_facecolor('#f0f0f0')
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.widget = self.canvas.get_tk_widget()
+
+        # Estilo fijo: como el eje no se limpia, se aplica una sola vez
+        color = 'black'
+        self.ax.tick_params(colors=color)
+        self.ax.set_title(titulo, color=color)
+        self.ax.set_xlabel(xlabel, color=color)
+        self.ax.set_ylabel(ylabel, color=color)
+        for lado in ('bottom', 'top', 'right', 'left'):
+            self.ax.spines[lado].set_color(color)
+        if horizontal:
+            self.ax.invert_yaxis()  # El primero arriba
+
+    def dibujar(self, valores, colores, etiquetas=None, posiciones=None, anchos=None, rango=None):
+        """Dibuja una barra por valor.
+
+        Sin `posiciones` las barras van centradas en 0, 1, 2...; con `anchos`,
+        cada posición es el borde izquierdo de su barra (histograma). `rango`
+        son las distancias [abajo, arriba] de las barras de error.
+        """
+        if posiciones is None:
+            posiciones = range(len(valores))
+        reutilizar = (self.barras is not None and len(self.barras) == len(valores)
+                      and (self.rango is None) == (rango is None))
+        if reutilizar:
+            self._actualizar(valores, colores, posiciones, anchos, rango)
+        else:
+            self._reconstruir(valores, colores, posiciones, anchos, rango)
+
+        if etiquetas is not None:
+            if self.horizontal:
+                self.ax.set_yticks(posiciones, etiquetas)
+            else:
+                self.ax.set_xticks(posiciones, etiquetas)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        if not reutilizar:
+            self.fig.tight_layout()
+        self.canvas.draw_idle()
+
+    def _reconstruir(self, valores, colores, posiciones, anchos, rango):
+        if self.barras is not None:
+            self.barras.remove()
+        if self.rango is not None:
+            self.rango.remove()
+        opciones = {'color': colores, 'picker': True}
+        if anchos is not None:
+            opciones.update(align='edge', edgecolor='white')
+        if self.horizontal:
+            self.barras = self.ax.barh(posiciones, valores, height=anchos if anchos is not None else 0.8,
+                                       **opciones)
+        else:
+            self.barras = self.ax.bar(posiciones, valores, width=anchos if anchos is not None else 0.8,
+                                      **opciones)
+        self.rango = None
+        if rango is not None:
+            self.rango = self.ax.errorbar(posiciones, valores, yerr=rango, fmt='none',
+                                          ecolor='black', capsize=4)
+
+    def _actualizar(self, valores, colores, posiciones, anchos, rango):
+        for i, (barra, valor, color) in enumerate(zip(self.barras, valores, colores)):
+            if self.horizontal:
+                barra.set_width(valor)
+            else:
+                barra.set_height(valor)
+            barra.set_facecolor(color)
+            if anchos is not None:
+                barra.set_x(posiciones[i])
+                barra.set_width(anchos[i])
+        if rango is not None:
+            abajo = [v - r for v, r in zip(valores, rango[0])]
+            arriba = [v + r for v, r in zip(valores, rango[1])]
+            _, (tope_abajo, tope_arriba), (lineas,) = self.rango.lines
+            tope_abajo.set_ydata(abajo)
+            tope_arriba.set_ydata(arriba)
+            lineas.set_segments([[(x, a), (x, b)] for x, a, b in zip(posiciones, abajo, arriba)])
@@ -1,20 +1,41 @@
-import json
-import hashlib
-import customtkinter as ctk
-from tkinter import messagebox
+import os
+import sys
+import threading
+import time
 
-ARCHIVO_USUARIOS = "usuarios.json"
+from arranque import MedidorArranque
 
-class Usuario:
-    def __init__(self, usuario, contrasena, clave_recuperacion, rol="normal"):
-        self.usuario = usuario
-        self.contrasena = self._hash_contrasena(contrasena)
-        self.clave_recuperacion = clave_recuperacion
-        self.rol = rol.lower()
+# Antes que el resto de los imports, para poder medirlos
+medidor_arranque = MedidorArranque(activo="--reporte-arranque" in sys.argv)
 
-    @staticmethod
-    def _hash_contrasena(contrasena):
-        return hashlib.sha256(contrasena.encode()).hexdigest()
+import customtkinter as ctk
+from tkinter import Listbox, TclError, filedialog, messagebox, ttk
+
+from componentes import BusquedaDiferida, FilaAlerta, FilaPrecio, FilaProducto, GraficoBarras, ListaVirtual
+from stock_core import (AlertasStock, Autocompletado, Carrito, CatalogoProductos, ErrorServidor, IndiceVentas,
+                        PersistenciaJSON, PersistenciaSQLite, Producto, ResultadoImportacion, Tienda,
+                        validar_archivo)
+
+ARCHIVO_USUARIOS = "usuarios.json"
+ARCHIVO_PRODUCTOS = "productos.json"
+ARCHIVO_PROVEEDORES = "proveedores.json"
+ARCHIVO_VENTAS = "ventas.json"
+ARCHIVO_DIARIO_VENTAS = "ventas.jsonl"
+ARCHIVO_MOVIMIENTOS = "movimientos_stock.jsonl"
+FSYNC_VENTAS = "siempre"  # "siempre", "cada_n" o "nunca"
+COMPACTAR_DIARIO_CADA = 1000  # Ventas en el diario antes de volcarlas a ventas.json
+ARCHIVO_SQLITE = "gestion_stock.db"
+BACKEND = "json"  # "json" o "sqlite" (migrar antes con: python -m stock_core.migrar)
+AUTOGUARDADO_VENTANA = 0.5  # Segundos en los que se agrupan cambios antes de escribirlos
+# Servidor de stock compartido por varias cajas ("127.0.0.1:8765" o "unix:/ruta/al/socket"),
+# iniciado con: python -m stock_core.servidor. Con None esta terminal usa sus propios archivos
+SERVIDOR = None
+BUSQUEDA_DEMORA_MS = 200  # Espera desde la última tecla antes de buscar
+MARGEN_MINIMO = 20
+ANALISIS_PRODUCTOS = 20  # Barras del gráfico por producto (los de mayor o menor margen)
+ANALISIS_INTERVALOS = 20  # Barras del gráfico de distribución
+AUTOCOMPLETAR_SUGERENCIAS = 8
+AUTOCOMPLETAR_VENTANA = 5000  # Últimas ventas que cuentan para ordenar las sugerencias
 
 class GestionStock:
     def __init__(self, root):
@@ -23,10 +44,35 @@ class GestionStock:
         self.root.withdraw()  # Ocultar ventana principal
         
         self.usuarios = []
+        self.productos = CatalogoProductos()
+        self.ventas = []
+        self.proveedores = []
         self.current_user = None
+        self.toolbar = None
+        self.notebook = None
+        self.tree_ventas = None
+        self.historial_lleno = False  # La tabla ya tiene el historial entero: las ventas nuevas van directo
+        self.modo_analisis = None
+        self.lista_stock = None
+        self.carrito = None
+        self.autocompletado = None  # Se arma en segundo plano con la pestaña de ventas
+        self.pestanas_pendientes = {}
+        self.tiempos_interfaz = {}
+        self.auto_repeat_delay = 100
+        self.auto_repeat_id = None
+        self.ajuste_en_curso = None  # [producto, delta acumulado] mientras se mantiene + o -
+        # Los datos y sus operaciones: esta clase solo los muestra
+        self.tienda = Tienda(self.crear_persistencia(), SERVIDOR,
+                             despachar=lambda funcion: self.root.after(0, funcion),
+                             ventana=AUTOGUARDADO_VENTANA)
+        self.motor = self.tienda.motor
+        self.tienda.autoguardado.al_fallar = lambda error: self.root.after(0, self.avisar_error_guardado, error)
+        if SERVIDOR:
+            self.motor.oyentes.append(self.cambios_de_otra_terminal)
         
-        self.cargar_usuarios()
+        self.cargar_datos()
         self.mostrar_login()
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar_aplicacion)
         
         ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
@@ -40,22 +86,60 @@ class GestionStock:
         y = (pantalla_alto - alto) // 2
         ventana.geometry(f"{ancho}x{alto}+{x}+{y}")
 
-    def cargar_usuarios(self):
-        try:
-            with open(ARCHIVO_USUARIOS, "r") as file:
-                self.usuarios = [Usuario(**user) for user in json.load(file)]
-        except FileNotFoundError:
-            # Crear usuarios predeterminados
-            self.usuarios = [
-                Usuario("super", "admin123", "clave_super", "super"),
-                Usuario("admin", "admin123", "clave_admin", "admin"),
-                Usuario("usuario", "user123", "clave_usuario", "normal")
-            ]
-            self.guardar_usuarios()
-
-    def guardar_usuarios(self):
-        with open(ARCHIVO_USUARIOS, "w") as file:
-            json.dump([vars(u) for u in self.usuarios], file, indent=4)
+    def crear_persistencia(self):
+        """Abre el backend de almacenamiento configurado en BACKEND"""
+        if BACKEND == "sqlite":
+            return PersistenciaSQLite(ARCHIVO_SQLITE)
+        return PersistenciaJSON({
+            "usuarios": ARCHIVO_USUARIOS,
+            "productos": ARCHIVO_PRODUCTOS,
+            "proveedores": ARCHIVO_PROVEEDORES
+        }, ARCHIVO_VENTAS, ARCHIVO_DIARIO_VENTAS, fsync=FSYNC_VENTAS,
+            compactar_cada=COMPACTAR_DIARIO_CADA, indentar=["usuarios"],
+            archivo_movimientos=ARCHIVO_MOVIMIENTOS)
+
+    def cargar_datos(self):
+        self.usuarios = self.tienda.usuarios
+        self.productos = self.tienda.productos
+        self.alertas = AlertasStock(self.productos)
+        self.proveedores = self.tienda.proveedores
+        self.ventas = self.tienda.ventas
+
+    def guardar_datos(self):
+        """Escribe ya lo modificado, sin esperar al autoguardado"""
+        return self.tienda.guardar()
+
+    def avisar_error_guardado(self, error):
+        messagebox.showerror("Error al guardar", f"No se pudieron guardar los cambios: {error}\n"
+                             "Se reintentará con el próximo cambio y al cerrar.")
+
+    def registrar_ticket(self, carrito):
+        """Vende el ticket entero: el stock y las ventas de todas las líneas se guardan
+        juntos (una transacción en SQLite, una escritura al diario en JSON)"""
+        vendidos = [linea.producto for linea in carrito]
+        ventas = self.motor.vender([(linea.producto.codigo, linea.cantidad) for linea in carrito])
+        carrito.vaciar()
+        self.mostrar_ventas(ventas)
+        return ventas, vendidos
+
+    def mostrar_ventas(self, ventas):
+        """Lleva al historial y a las sugerencias ventas ya registradas"""
+        for venta in ventas:
+            if self.autocompletado is not None:
+                self.autocompletado.registrar_venta(venta)
+            if self.tree_ventas is not None and self.historial_lleno:
+                # Mientras se llena la tabla, la venta llega con el último bloque
+                self.agregar_fila_historial(venta)
+        self.actualizar_resumen_historial()
+
+    def cambios_de_otra_terminal(self, agregados, actualizados, eliminados, ventas):
+        """Muestra lo que cambiaron las otras cajas (el catálogo ya está al día)"""
+        if agregados:
+            self.mostrar_productos_agregados(agregados)
+        for producto in eliminados:
+            self.mostrar_producto_eliminado(producto)
+        self.mostrar_productos_actualizados(actualizados)
+        self.mostrar_ventas(ventas)
 
     def mostrar_login(self):
         """Muestra la ventana de login centrada"""
@@ -83,7 +167,7 @@ class GestionStock:
         
         ctk.CTkButton(btn_frame, text="Ingresar", command=self.validar_login_normal).pack(side="left", padx=5)
         ctk.CTkButton(btn_frame, text="Superusuario", command=self.mostrar_login_super).pack(side="left", padx=5)
-        ctk.CTkButton(btn_frame, text="Salir", command=self.root.destroy).pack(side="right", padx=5)
+        ctk.CTkButton(btn_frame, text="Salir", command=self.cerrar_aplicacion).pack(side="right", padx=5)
 
     def mostrar_login_super(self):
         """Ventana de login para superusuario"""
@@ -110,9 +194,7 @@ class GestionStock:
         password = self.entry_pass.get()
         
         if usuario and password:
-            user = next((u for u in self.usuarios 
-                        if u.usuario == usuario 
-                        and u.contrasena == Usuario._hash_contrasena(password)), None)
+            user = self.tienda.autenticar(usuario, password)
             if user:
                 self.current_user = user
                 self.login_window.destroy()
@@ -124,8 +206,8 @@ class GestionStock:
         usuario = self.entry_super_user.get()
         password = self.entry_super_pass.get()
         
-        if usuario == "super" and password == "admin123":
-            user = next((u for u in self.usuarios if u.usuario == "super"), None)
+        if usuario == "super":
+            user = self.tienda.autenticar(usuario, password)
             if user:
                 self.current_user = user
                 self.login_window.destroy()
@@ -134,23 +216,807 @@ class GestionStock:
         messagebox.showerror("Error", "Credenciales incorrectas", parent=self.entry_super_user.winfo_toplevel())
 
     def mostrar_interfaz_principal(self):
-        """Muestra la interfaz principal centrada"""
+        """Muestra la interfaz principal centrada; las pestañas se arman al abrirlas"""
+        inicio = time.perf_counter()
+        self.tiempos_interfaz = {}
         self.root.deiconify()  # Mostrar ventana principal
         self.centrar_ventana(self.root, 1200, 800)  # Tamaño para pantalla completa
         
         # Barra de herramientas
-        toolbar = ctk.CTkFrame(self.root)
-        toolbar.pack(fill="x", padx=5, pady=5)
+        self.toolbar = ctk.CTkFrame(self.root)
+        self.toolbar.pack(fill="x", padx=5, pady=5)
         
-        ctk.CTkLabel(toolbar, text=f"Usuario: {self.current_user.usuario} ({self.current_user.rol})").pack(side="left")
-        ctk.CTkButton(toolbar, text="Cerrar Sesión", command=self.cerrar_sesion).pack(side="right")
+        ctk.CTkLabel(self.toolbar, text=f"Usuario: {self.current_user.usuario} ({self.current_user.rol})").pack(side="left")
+        ctk.CTkButton(self.toolbar, text="Cerrar Sesión", command=self.cerrar_sesion).pack(side="right")
+
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
+        self.pestanas_pendientes = {}
+        for titulo, crear in self.pestanas():
+            tab = ctk.CTkFrame(self.notebook)
+            self.notebook.add(tab, text=titulo)
+            self.pestanas_pendientes[str(tab)] = (titulo, crear, tab)
+        self.notebook.bind("<<NotebookTabChanged>>", self.abrir_pestana)
+        self.abrir_pestana()  # La primera ya quedó seleccionada
+
+        # Lista para usar: la pestaña inicial armada y dibujada
+        self.root.update_idletasks()
+        self.tiempos_interfaz['login_a_uso'] = time.perf_counter() - inicio
+        medidor_arranque.etapa("interfaz principal en uso")
+        if medidor_arranque.activo:
+            print(f"Interfaz lista en {self.tiempos_interfaz['login_a_uso']:.3f} s desde el login")
+
+    def pestanas(self):
+        """Registro de pestañas: título y función que arma su contenido en el frame que recibe"""
+        return [
+            ('Realizar Ventas', self.crear_pestana_ventas),
+            ('Gestión de Stock', self.crear_pestana_stock),
+            ('Análisis de Margen', self.crear_pestana_analisis),
+            ('Historial de Ventas', self.crear_pestana_historial),
+        ]
+
+    def abrir_pestana(self, event=None):
+        """Arma la pestaña seleccionada si es la primera vez que se abre"""
+        pendiente = self.pestanas_pendientes.pop(self.notebook.select(), None)
+        if pendiente is None:
+            return
+        titulo, crear, tab = pendiente
+        inicio = time.perf_counter()
+        crear(tab)
+        self.tiempos_interfaz[titulo] = time.perf_counter() - inicio
 
     def cerrar_sesion(self):
         """Vuelve a la pantalla de login"""
+        self.detener_auto_repeat()
+        self.guardar_datos()
+        if self.notebook:
+            self.notebook.destroy()
+            self.notebook = None
+            self.tree_ventas = None
+            self.modo_analisis = None
+            self.lista_stock = None
+            self.carrito = None
+            self.pestanas_pendientes = {}
+        if self.toolbar:
+            self.toolbar.destroy()
+            self.toolbar = None
+        self.current_user = None
         self.root.withdraw()
         self.mostrar_login()
 
+    # ------------------------- PESTAÑA VENTAS -------------------------
+    def crear_pestana_ventas(self, tab):
+        self.tab_ventas = tab
+        self.carrito = Carrito(self.productos)
+
+        container = ctk.CTkFrame(self.tab_ventas, fg_color="transparent")
+        container.pack(expand=True, fill="both", padx=20, pady=20)
+
+        venta_frame = ctk.CTkFrame(container, corner_radius=10, fg_color="#2b2b2b")
+        venta_frame.pack(side="left", padx=10, pady=10, fill="both", expand=True)
+
+        carga_frame = ctk.CTkFrame(venta_frame, fg_color="transparent")
+        carga_frame.pack(fill='x', padx=10, pady=10)
+        ctk.CTkLabel(carga_frame, text="Código o Nombre:").grid(row=0, column=0, pady=5, padx=10)
+        self.venta_nombre_entry = ctk.CTkEntry(carga_frame, width=250)
+        self.venta_nombre_entry.grid(row=0, column=1, pady=5, padx=10)
+        ctk.CTkLabel(carga_frame, text="Cantidad:").grid(row=1, column=0, pady=5, padx=10)
+        self.venta_cantidad_entry = ctk.CTkEntry(carga_frame, width=250)
+        self.venta_cantidad_entry.grid(row=1, column=1, pady=5, padx=10)
+        ctk.CTkButton(carga_frame, text="Agregar al Ticket", command=self.agregar_al_ticket,
+                      width=150, fg_color="#1e6ba5").grid(row=0, column=2, rowspan=2, padx=10)
+        # Enter en cualquiera de los dos campos carga la línea, sin tocar el mouse
+        self.venta_nombre_entry.bind('<Return>', lambda e: self.agregar_al_ticket())
+        self.venta_cantidad_entry.bind('<Return>', lambda e: self.agregar_al_ticket())
+        self.venta_nombre_entry.bind('<KeyRelease>', self.sugerir_productos)
+        self.venta_nombre_entry.bind('<Down>', lambda e: self.mover_sugerencia(1))
+        self.venta_nombre_entry.bind('<Up>', lambda e: self.mover_sugerencia(-1))
+        self.venta_nombre_entry.bind('<Escape>', lambda e: self.ocultar_sugerencias())
+
+        self.tree_ticket = ttk.Treeview(venta_frame, columns=('Código', 'Producto', 'Cantidad', 'Precio', 'Subtotal'),
+                                        show='headings', style="Custom.Treeview")
+        self.configurar_estilo_tablas()
+        for columna in ('Código', 'Producto', 'Cantidad', 'Precio', 'Subtotal'):
+            self.tree_ticket.heading(columna, text=columna)
+
+        total_frame = ctk.CTkFrame(venta_frame, fg_color="transparent")
+        total_frame.pack(side='bottom', fill='x', padx=10, pady=10)
+        self.lbl_total_ticket = ctk.CTkLabel(total_frame, text="Total: $0.00 (0 unidades)",
+                                             font=("Arial", 16, "bold"))
+        self.lbl_total_ticket.pack(side='left', padx=10)
+        ctk.CTkButton(total_frame, text="Cobrar", command=self.cobrar_ticket,
+                      width=120, fg_color="#1e6ba5").pack(side='right', padx=5)
+        ctk.CTkButton(total_frame, text="Cancelar Ticket", command=self.cancelar_ticket,
+                      width=120, fg_color="#b30000").pack(side='right', padx=5)
+        ctk.CTkButton(total_frame, text="Quitar Línea", command=self.quitar_del_ticket,
+                      width=120, fg_color="#404040").pack(side='right', padx=5)
+        # Los avisos van acá y no en cuadros modales que frenan la carga
+        self.lbl_estado_venta = ctk.CTkLabel(venta_frame, text="")
+        self.lbl_estado_venta.pack(side='bottom', padx=10, anchor='w')
+        self.tree_ticket.pack(fill='both', expand=True, padx=10)
+
+        precios_frame = ctk.CTkFrame(container, corner_radius=10, fg_color="#2b2b2b")
+        precios_frame.pack(side="left", padx=10, pady=10, fill="both", expand=True)
+        ctk.CTkLabel(precios_frame, text="Lista de Precios",
+                     font=("Arial", 14, "bold"), text_color="#ffffff").pack(pady=5)
+        self.lista_precios = ListaVirtual(precios_frame,
+                                          crear_fila=lambda master: FilaPrecio(master, self.elegir_producto_venta),
+                                          mostrar_fila=lambda fila, producto: fila.mostrar(producto),
+                                          alto_fila=32, fg_color="#333333")
+        self.lista_precios.pack(fill="both", expand=True, padx=5, pady=5)
+        self.actualizar_lista_precios()
+
+        # Desplegable de sugerencias debajo del campo; hijo de la pestaña para quedar encima del ticket
+        self.sugerencias_venta = []
+        self.lista_sugerencias = Listbox(self.tab_ventas, bg="#333333", fg="white", selectbackground="#1e6ba5",
+                                         borderwidth=0, highlightthickness=0, activestyle="none")
+        self.lista_sugerencias.bind('<ButtonRelease-1>', self.elegir_sugerencia)
+        if self.autocompletado is None:
+            self.preparar_autocompletado()
+        self.venta_nombre_entry.focus_set()
+
+    def preparar_autocompletado(self):
+        """Arma el índice de sugerencias en otro hilo; con catálogos grandes lleva casi un segundo"""
+        productos = list(self.productos)
+        version = self.productos.version
+        ventas = self.motor.ultimas_ventas(AUTOCOMPLETAR_VENTANA)
+
+        def armar():
+            autocompletado = Autocompletado(productos, ventana=AUTOCOMPLETAR_VENTANA)
+            for venta in ventas:
+                autocompletado.registrar_venta(venta)
+            self.root.after(0, lambda: entregar(autocompletado))
+
+        def entregar(autocompletado):
+            if version != self.productos.version:  # Hubo altas o bajas mientras se armaba
+                self.preparar_autocompletado()
+                return
+            self.autocompletado = autocompletado
+
+        threading.Thread(target=armar, daemon=True).start()
+
+    def sugerir_productos(self, event=None):
+        """Muestra los productos que empiezan con lo escrito, los más vendidos primero"""
+        if event is not None and event.keysym in ('Return', 'Up', 'Down', 'Escape', 'Tab'):
+            return
+        if self.autocompletado is None:  # Todavía se está armando
+            return
+        self.sugerencias_venta = self.autocompletado.sugerencias(self.venta_nombre_entry.get(),
+                                                                 AUTOCOMPLETAR_SUGERENCIAS)
+        if not self.sugerencias_venta:
+            self.ocultar_sugerencias()
+            return
+        self.lista_sugerencias.delete(0, 'end')
+        for producto in self.sugerencias_venta:
+            self.lista_sugerencias.insert(
+                'end', f"{producto.nombre} ({producto.codigo}) - ${producto.precio:.2f} - Stock: {producto.stock}")
+        self.lista_sugerencias.configure(height=len(self.sugerencias_venta))
+        self.lista_sugerencias.selection_set(0)
+        self.lista_sugerencias.place(in_=self.venta_nombre_entry, x=0, rely=1, width=450)
+        self.lista_sugerencias.lift()
+
+    def mover_sugerencia(self, paso):
+        if not self.sugerencias_venta:
+            return
+        seleccion = self.lista_sugerencias.curselection()
+        posicion = min(max((seleccion[0] if seleccion else -1) + paso, 0), len(self.sugerencias_venta) - 1)
+        self.lista_sugerencias.selection_clear(0, 'end')
+        self.lista_sugerencias.selection_set(posicion)
+        self.lista_sugerencias.see(posicion)
+
+    def sugerencia_elegida(self):
+        seleccion = self.lista_sugerencias.curselection() if self.sugerencias_venta else ()
+        return self.sugerencias_venta[seleccion[0]] if seleccion else None
+
+    def elegir_sugerencia(self, event=None):
+        producto = self.sugerencia_elegida()
+        if producto is not None:
+            self.elegir_producto_venta(producto)
+
+    def ocultar_sugerencias(self):
+        self.sugerencias_venta = []
+        self.lista_sugerencias.place_forget()
+
+    def actualizar_lista_precios(self):
+        if self.carrito is not None:
+            self.lista_precios.establecer(list(self.productos))
+
+    def elegir_producto_venta(self, producto):
+        self.ocultar_sugerencias()
+        self.venta_nombre_entry.delete(0, 'end')
+        self.venta_nombre_entry.insert(0, producto.codigo)
+        self.venta_cantidad_entry.focus_set()
+
+    def agregar_al_ticket(self):
+        """Suma una línea al ticket; solo se actualiza esa fila y el total"""
+        # Lo escrito exacto (código o nombre) o, si no, la sugerencia marcada
+        producto = self.carrito.buscar(self.venta_nombre_entry.get()) or self.sugerencia_elegida()
+        if producto is None:
+            self.lbl_estado_venta.configure(text="Producto no encontrado", text_color="#ff6666")
+            return
+        try:
+            cantidad = int(self.venta_cantidad_entry.get().strip() or 1)
+        except ValueError:
+            self.lbl_estado_venta.configure(text="Ingrese una cantidad válida", text_color="#ff6666")
+            return
+        try:
+            linea = self.carrito.agregar(producto, cantidad)
+        except ValueError as error:
+            self.lbl_estado_venta.configure(text=str(error), text_color="#ff6666")
+            return
+
+        valores = (producto.codigo, producto.nombre, linea.cantidad,
+                   f"${producto.precio:.2f}", f"${linea.subtotal:.2f}")
+        if self.tree_ticket.exists(producto.codigo):
+            self.tree_ticket.item(producto.codigo, values=valores)
+        else:
+            self.tree_ticket.insert('', 'end', iid=producto.codigo, values=valores)
+        self.actualizar_total_ticket()
+        self.ocultar_sugerencias()
+        self.lbl_estado_venta.configure(text="")
+        self.venta_nombre_entry.delete(0, 'end')
+        self.venta_cantidad_entry.delete(0, 'end')
+        self.venta_nombre_entry.focus_set()
+
+    def quitar_del_ticket(self):
+        for codigo in self.tree_ticket.selection():
+            self.carrito.quitar(codigo)
+            self.tree_ticket.delete(codigo)
+        self.actualizar_total_ticket()
+
+    def cancelar_ticket(self):
+        self.carrito.vaciar()
+        self.tree_ticket.delete(*self.tree_ticket.get_children())
+        self.actualizar_total_ticket()
+
+    def actualizar_total_ticket(self):
+        self.lbl_total_ticket.configure(
+            text=f"Total: ${self.carrito.total:.2f} ({self.carrito.unidades} unidades)")
+
+    def cobrar_ticket(self):
+        if not len(self.carrito):
+            self.lbl_estado_venta.configure(text="El ticket está vacío", text_color="#ff6666")
+            return
+        total = self.carrito.total
+        try:
+            ventas, vendidos = self.registrar_ticket(self.carrito)
+        except (ValueError, ConnectionError, ErrorServidor) as error:  # Por ejemplo, otra caja vendió ese stock
+            self.lbl_estado_venta.configure(text=str(error), text_color="#ff6666")
+            return
+
+        self.tree_ticket.delete(*self.tree_ticket.get_children())
+        self.actualizar_total_ticket()
+        self.refrescar_productos(vendidos)
+        self.lbl_estado_venta.configure(text=f"Venta registrada: {len(ventas)} líneas, ${total:.2f}",
+                                        text_color="#66ff66")
+
+    # ------------------------- PESTAÑA STOCK -------------------------
+    def crear_pestana_stock(self, tab):
+        self.tab_stock = tab
+        
+        alertas_frame = ctk.CTkFrame(self.tab_stock, corner_radius=10, fg_color="#4a0000")
+        alertas_frame.pack(pady=5, padx=10, fill='x')
+        ctk.CTkLabel(alertas_frame, text="⚠️ Productos con Stock Bajo", 
+                   font=("Arial", 12, "bold"), text_color="#ff6666").pack(pady=5)
+        
+        # También virtual: con muchos productos bajo el mínimo solo se crean las filas visibles
+        self.lista_alertas = ListaVirtual(alertas_frame, crear_fila=FilaAlerta,
+                                          mostrar_fila=lambda fila, codigo: fila.mostrar(self.productos.buscar(codigo)),
+                                          alto_fila=32, height=100, fg_color="#333333")
+        self.lista_alertas.pack_propagate(False)  # Alto fijo: las filas no agrandan el panel
+        self.lista_alertas.pack(fill="both", expand=True, padx=5, pady=5)
+
+        control_frame = ctk.CTkFrame(self.tab_stock, fg_color="#2b2b2b")
+        control_frame.pack(pady=10, padx=10, fill='x')
+
+        labels = ["Código:", "Nombre:", "Categoría:", "Costo:", "Precio:", "Stock:", "Alerta Mínima:"]
+        self.entries_stock = []
+        for i, label in enumerate(labels):
+            ctk.CTkLabel(control_frame, text=label).grid(row=i//4, column=(i%4)*2, padx=5, pady=2)
+            entry = ctk.CTkEntry(control_frame, width=120)
+            entry.grid(row=i//4, column=(i%4)*2+1, padx=5, pady=2)
+            self.entries_stock.append(entry)
+
+        btn_agregar = ctk.CTkButton(control_frame, text="Agregar Producto", 
+                                  command=self.agregar_producto, fg_color="#1e6ba5")
+        btn_agregar.grid(row=2, column=7, padx=10, pady=5, sticky='e')
+        ctk.CTkButton(control_frame, text="Importar CSV", command=self.importar_productos,
+                      fg_color="#1e6ba5").grid(row=2, column=6, padx=10, pady=5, sticky='e')
+
+        ctk.CTkLabel(self.tab_stock, text="Inventario Actual").pack(padx=10, anchor="w")
+        # Solo se crean las filas visibles y se reutilizan al desplazarse
+        acciones = {
+            'ajustar': self.iniciar_auto_repeat,
+            'detener': self.detener_auto_repeat,
+            'alerta': self.fijar_alerta_stock,
+            'eliminar': self.eliminar_producto
+        }
+        self.lista_stock = ListaVirtual(self.tab_stock,
+                                        crear_fila=lambda master: FilaProducto(master, acciones),
+                                        mostrar_fila=lambda fila, producto: fila.mostrar(producto),
+                                        fg_color="#333333")
+        self.lista_stock.pack(fill='both', expand=True, padx=10, pady=10)
+        self.actualizar_lista_stock()
+        self.actualizar_alertas()
+
+    def actualizar_lista_stock(self):
+        if self.lista_stock is not None:
+            self.lista_stock.establecer(list(self.productos))
+
+    def actualizar_frame_producto(self, producto):
+        self.lista_stock.refrescar_elemento(producto)
+
+    def iniciar_auto_repeat(self, producto, incremento):
+        """Mientras el botón está apretado el cambio se acumula y solo se muestra;
+        se aplica y se guarda una vez, al soltarlo (detener_auto_repeat)"""
+        self.detener_auto_repeat()
+        self.ajuste_en_curso = [producto, 0]
+        self.auto_repeat_action(producto, incremento)
+        self.auto_repeat_id = self.root.after(self.auto_repeat_delay, 
+                                            lambda: self.auto_repeat_continuar(producto, incremento))
+
+    def auto_repeat_continuar(self, producto, incremento):
+        self.auto_repeat_action(producto, incremento)
+        self.auto_repeat_delay = max(50, self.auto_repeat_delay - 10)
+        self.auto_repeat_id = self.root.after(self.auto_repeat_delay, 
+                                            lambda: self.auto_repeat_continuar(producto, incremento))
+
+    def auto_repeat_action(self, producto, incremento):
+        ajuste = self.ajuste_en_curso
+        if producto.stock + ajuste[1] + incremento < 0:
+            return
+        ajuste[1] += incremento
+        fila = self.lista_stock.fila_de(producto)
+        if fila is not None:
+            fila.mostrar_stock(producto.stock + ajuste[1])
+
+    def detener_auto_repeat(self):
+        if self.auto_repeat_id:
+            self.root.after_cancel(self.auto_repeat_id)
+            self.auto_repeat_delay = 100
+            self.auto_repeat_id = None
+        if self.ajuste_en_curso is None:
+            return
+        producto, delta = self.ajuste_en_curso
+        self.ajuste_en_curso = None
+        # Un solo cambio, un solo movimiento y un solo guardado por pulsación
+        if delta:
+            try:
+                self.motor.ajustar_stock(producto.codigo, delta, "ajuste",
+                                         self.current_user.usuario if self.current_user else None)
+            except ValueError:
+                pass  # Otra caja lo dejó sin stock suficiente: se muestra el actual
+            except (ConnectionError, ErrorServidor) as error:
+                # Se avisa y se sigue: también se llega aquí al cerrar la sesión o la aplicación
+                messagebox.showerror("Error", f"No se pudo ajustar el stock de {producto.nombre}: {error}")
+        self.refrescar_productos([producto])
+
+    def refrescar_productos(self, productos):
+        """Lleva a la lista de stock y al panel de alertas el estado actual de estos productos"""
+        for producto in productos:
+            self.alertas.actualizar(producto)  # Si la pestaña no está armada, el panel sale de aquí al abrirla
+            if self.lista_stock is not None:
+                self.actualizar_frame_producto(producto)
+        self.actualizar_alertas()
+
+    def fijar_alerta_stock(self, producto):
+        dialogo = ctk.CTkInputDialog(text=f"Ingrese el stock mínimo para {producto.nombre}:", 
+                                   title="Configurar Alerta de Stock")
+        nuevo_minimo = dialogo.get_input()
+        if nuevo_minimo is None:
+            return  # Cancelado
+
+        try:
+            self.motor.fijar_stock_minimo(producto.codigo, nuevo_minimo)
+            self.refrescar_productos([producto])
+        except ValueError:
+            messagebox.showerror("Error", "Ingrese un número válido mayor o igual a 0")
+
+    def actualizar_alertas(self):
+        """Muestra el panel de stock bajo en el orden de self.alertas (solo redibuja las filas visibles)"""
+        if self.lista_stock is not None:
+            self.lista_alertas.establecer(self.alertas)
+
+    def quitar_alerta(self, producto):
+        if self.alertas.quitar(producto) is not None:
+            self.actualizar_alertas()
+
+    def agregar_producto(self):
+        datos = [entry.get() for entry in self.entries_stock]
+        if not all(datos):
+            messagebox.showerror("Error", "Todos los campos son obligatorios")
+            return
+
+        try:
+            nuevo_producto = Producto(*datos)
+        except ValueError:
+            messagebox.showerror("Error", "Datos numéricos inválidos")
+            return
+
+        if nuevo_producto.codigo in self.productos:
+            messagebox.showerror("Error", "El código ya existe")
+            return
+
+        try:
+            nuevo_producto = self.motor.agregar_producto(nuevo_producto)
+        except ValueError as error:  # Otra caja lo dio de alta recién
+            messagebox.showerror("Error", str(error))
+            return
+        self.mostrar_productos_agregados([nuevo_producto])
+
+        for entry in self.entries_stock:
+            entry.delete(0, 'end')
+
+        messagebox.showinfo("Éxito", "Producto agregado correctamente")
+
+    def importar_productos(self):
+        """Alta o actualización de los productos de un CSV; las filas con errores van a un reporte.
+
+        El archivo se lee y se valida en otro hilo, sin trabar la ventana; el
+        catálogo se actualiza después en el hilo de Tk (vía `after`)."""
+        archivo = filedialog.askopenfilename(title="Importar productos",
+                                             filetypes=[("Archivos CSV", "*.csv"), ("Todos", "*.*")])
+        if not archivo:
+            return
+
+        def validar():
+            try:
+                productos, errores = validar_archivo(archivo)
+                entregar = lambda: self.aplicar_importacion(archivo, productos, errores)
+            except (ValueError, OSError) as error:
+                entregar = lambda error=error: messagebox.showerror(
+                    "Error", f"No se pudo importar el archivo: {error}")
+            try:
+                self.root.after(0, entregar)
+            except (RuntimeError, TclError):
+                pass  # La ventana ya no existe
+
+        threading.Thread(target=validar, name="importacion", daemon=True).start()
+
+    def aplicar_importacion(self, archivo, productos, errores):
+        try:
+            agregados, actualizados = self.motor.importar_productos(productos)
+        except (ValueError, ConnectionError, ErrorServidor) as error:
+            messagebox.showerror("Error", f"No se pudo importar el archivo: {error}")
+            return
+        resultado = ResultadoImportacion(agregados, actualizados, errores)
+        if resultado.agregados:
+            self.mostrar_productos_agregados(resultado.agregados)
+        self.mostrar_productos_actualizados(resultado.actualizados)
+
+        mensaje = resultado.resumen()
+        if resultado.errores:
+            reporte = os.path.splitext(archivo)[0] + ".errores.csv"
+            resultado.escribir_reporte(reporte)
+            mensaje += f"\n\nEl detalle de las filas con errores quedó en:\n{reporte}"
+        messagebox.showinfo("Importación", mensaje)
+
+    def eliminar_producto(self, producto):
+        try:
+            self.motor.eliminar_producto(producto.codigo)
+        except ValueError:
+            return  # Ya lo eliminó otra caja; su aviso actualiza la pantalla
+        self.mostrar_producto_eliminado(producto)
+
+    def mostrar_productos_agregados(self, productos):
+        """Una sola actualización de las listas aunque sean muchos (importación)"""
+        if self.autocompletado is not None:
+            for producto in productos:
+                self.autocompletado.agregar(producto)
+        self.actualizar_lista_stock()
+        self.refrescar_productos(productos)
+        self.actualizar_lista_precios()
+        self.actualizar_analisis()
+
+    def mostrar_productos_actualizados(self, productos):
+        """Stock, precio o nombre cambiados: solo se redibujan las filas a la vista"""
+        for producto in productos:
+            if self.autocompletado is not None:
+                self.autocompletado.actualizar(producto)
+            if self.carrito is not None:
+                self.lista_precios.refrescar_elemento(producto)
+        self.refrescar_productos(productos)
+        if productos:
+            self.actualizar_analisis()
+
+    def mostrar_producto_eliminado(self, producto):
+        if self.autocompletado is not None:
+            self.autocompletado.eliminar(producto)
+        self.actualizar_lista_stock()
+        self.quitar_alerta(producto)
+        if self.carrito is not None and producto.codigo in self.carrito.lineas:
+            self.carrito.quitar(producto.codigo)
+            self.tree_ticket.delete(producto.codigo)
+            self.actualizar_total_ticket()
+        self.actualizar_lista_precios()
+        self.actualizar_analisis()
+
+    # ------------------------- PESTAÑA ANÁLISIS -------------------------
+    def crear_pestana_analisis(self, tab):
+        self.tab_analisis = tab
+
+        control_frame = ctk.CTkFrame(self.tab_analisis, fg_color="#f0f0f0")
+        control_frame.pack(pady=10, padx=10, fill='x')
+
+        self.modo_analisis = ctk.CTkComboBox(control_frame,
+                                             values=['Por Categoría', 'Por Producto', 'Distribución'],
+                                             command=self.cambiar_modo_analisis,
+                                             fg_color="#1e6ba5", button_color="#1e6ba5")
+        self.modo_analisis.set('Por Categoría')
+        self.modo_analisis.pack(side='left', padx=10)
+
+        # Por producto se grafican solo los N de mayor o menor margen
+        self.orden_analisis = ctk.CTkSegmentedButton(control_frame, values=['Mayor margen', 'Menor margen'],
+                                                     command=self.actualizar_analisis)
+        self.orden_analisis.set('Menor margen')
+        self.orden_analisis.pack(side='left', padx=10)
+
+        self.cantidad_analisis = ctk.CTkComboBox(control_frame, values=['10', '20', '50'], width=70,
+                                                 state='readonly', command=self.actualizar_analisis)
+        self.cantidad_analisis.set(str(ANALISIS_PRODUCTOS))
+        self.cantidad_analisis.pack(side='left', padx=5)
+
+        ctk.CTkButton(control_frame, text="Ver Todos", width=90, fg_color="#1e6ba5",
+                      command=self.quitar_filtro_analisis).pack(side='left', padx=10)
+
+        self.lbl_margen_promedio = ctk.CTkLabel(control_frame, text="Margen Promedio: 0%", text_color="black")
+        self.lbl_margen_promedio.pack(side='left', padx=20)
+
+        self.lbl_seleccion_analisis = ctk.CTkLabel(control_frame, text="", text_color="black")
+        self.lbl_seleccion_analisis.pack(side='left', padx=10)
+
+        self.filtro_analisis = None  # ('categoria', nombre) o ('rango', desde, hasta, incluir_hasta)
+        self.barras_analisis = {}  # Por modo: [(barra, filtro al que lleva un clic sobre ella)]
+        self.textos_analisis = {}  # Por modo: texto de lo que se está mostrando
+        self.analisis_cache = (None, None)  # (versión del catálogo, AnalisisMargen)
+        # Un gráfico por modo: al volver a un modo ya dibujado con los mismos datos no se redibuja
+        self.graficos_analisis = {}
+        self.grafico_visible = None
+        self.actualizar_analisis()
+
+    def analisis_margen(self):
+        """Análisis del catálogo, recalculado solo si el catálogo cambió desde la última vez"""
+        version, analisis = self.analisis_cache
+        if version != self.productos.version:
+            analisis = self.tienda.analizar_margenes(MARGEN_MINIMO)
+            self.analisis_cache = (self.productos.version, analisis)
+        return analisis
+
+    def grafico_analisis(self, modo):
+        """Muestra el gráfico de un modo, creándolo la primera vez"""
+        grafico = self.graficos_analisis.get(modo)
+        if grafico is None:
+            if modo == 'Por Categoría':
+                grafico = GraficoBarras(self.tab_analisis, 'Margen de Ganancia por Categoría', ylabel='Margen (%)')
+            elif modo == 'Distribución':
+                grafico = GraficoBarras(self.tab_analisis, 'Distribución de Márgenes',
+                                        xlabel='Margen (%)', ylabel='Productos')
+            else:
+                grafico = GraficoBarras(self.tab_analisis, 'Margen de Ganancia por Producto',
+                                        xlabel='Margen (%)', horizontal=True)
+            grafico.canvas.mpl_connect('pick_event', self.profundizar_analisis)
+            self.graficos_analisis[modo] = grafico
+        if grafico is not self.grafico_visible:
+            if self.grafico_visible is not None:
+                self.grafico_visible.widget.pack_forget()
+            grafico.widget.pack(fill='both', expand=True, padx=10, pady=10)
+            self.grafico_visible = grafico
+        return grafico
+
+    def actualizar_analisis(self, *args):
+        """Grafica el modo elegido con una cantidad acotada de barras.
+
+        Los márgenes se calculan de una vez (ver stock_core.analisis) y solo si
+        cambió el catálogo; el gráfico se redibuja solo si cambió lo que muestra.
+        """
+        if self.modo_analisis is None:
+            return  # La pestaña todavía no se abrió: se dibuja al abrirla
+        modo = self.modo_analisis.get()
+        grafico = self.grafico_analisis(modo)
+        if modo == 'Por Producto':
+            clave = (self.productos.version, self.orden_analisis.get(),
+                     self.cantidad_analisis.get(), self.filtro_analisis)
+        else:
+            clave = self.productos.version
+
+        analisis = self.analisis_margen()
+        if grafico.clave != clave:
+            if modo == 'Por Categoría':
+                self.dibujar_analisis_categorias(grafico, analisis)
+            elif modo == 'Distribución':
+                self.dibujar_analisis_distribucion(grafico, analisis)
+            else:
+                self.dibujar_analisis_productos(grafico, analisis)
+            grafico.clave = clave
+
+        self.lbl_margen_promedio.configure(text=f"Margen Promedio: {analisis.promedio:.1f}%")
+        self.lbl_seleccion_analisis.configure(text=self.textos_analisis[modo])
+
+    def dibujar_analisis_categorias(self, grafico, analisis):
+        por_categoria = analisis.por_categoria
+        # Debajo de cada categoría, cuántos productos quedan bajo el margen mínimo
+        categorias = [f"{c.categoria}\n({c.bajo_minimo} bajo {MARGEN_MINIMO}%)" for c in por_categoria]
+        margenes = [c.promedio for c in por_categoria]
+        # Barra del promedio, con el rango mínimo-máximo de la categoría
+        rango = [[c.promedio - c.minimo for c in por_categoria],
+                 [c.maximo - c.promedio for c in por_categoria]]
+        grafico.dibujar(margenes, ['#4CAF50' if m >= MARGEN_MINIMO else '#F44336' for m in margenes],
+                        etiquetas=categorias, rango=rango if por_categoria else None)
+        self.barras_analisis['Por Categoría'] = [(barra, ('categoria', c.categoria))
+                                                 for barra, c in zip(grafico.barras, por_categoria)]
+        self.textos_analisis['Por Categoría'] = "Clic en una categoría para ver sus productos"
+
+    def dibujar_analisis_distribucion(self, grafico, analisis):
+        bordes, cantidades = analisis.histograma(ANALISIS_INTERVALOS)
+        anchos = [hasta - desde for desde, hasta in zip(bordes, bordes[1:])]
+        colores = ['#4CAF50' if desde >= MARGEN_MINIMO else '#F44336' for desde in bordes[:-1]]
+        grafico.dibujar(cantidades, colores, posiciones=bordes[:-1], anchos=anchos)
+        ultimo = len(cantidades) - 1
+        self.barras_analisis['Distribución'] = [(barra, ('rango', bordes[i], bordes[i + 1], i == ultimo))
+                                                for i, barra in enumerate(grafico.barras)]
+        self.textos_analisis['Distribución'] = "Clic en un intervalo para ver sus productos"
+
+    def dibujar_analisis_productos(self, grafico, analisis):
+        filas, descripcion = self.filas_filtro_analisis(analisis)
+        total = len(analisis) if filas is None else len(filas)
+        menores = self.orden_analisis.get() == 'Menor margen'
+        elegidas = analisis.extremos(int(self.cantidad_analisis.get()), menores, filas)
+        margenes = [analisis.margenes[fila] for fila in elegidas]
+        # Por posición y no por nombre: dos productos pueden llamarse igual
+        grafico.dibujar(margenes, ['#4CAF50' if m >= MARGEN_MINIMO else '#F44336' for m in margenes],
+                        etiquetas=[analisis.nombres[fila] for fila in elegidas])
+        self.barras_analisis['Por Producto'] = []
+        self.textos_analisis['Por Producto'] = f"Mostrando {len(elegidas)} de {total} productos{descripcion}"
+
+    def filas_filtro_analisis(self, analisis):
+        """Filas a las que se profundizó (None si son todas) y su descripción"""
+        if self.filtro_analisis is None:
+            return None, ""
+        tipo, *datos = self.filtro_analisis
+        if tipo == 'categoria':
+            return analisis.filas_de_categoria(*datos), f" de {datos[0]}"
+        desde, hasta = datos[0], datos[1]
+        return analisis.filas_en_rango(*datos), f" con margen entre {desde:.1f}% y {hasta:.1f}%"
+
+    def profundizar_analisis(self, event):
+        """Clic en una categoría o intervalo: pasa a ver sus productos"""
+        for barra, filtro in self.barras_analisis.get(self.modo_analisis.get(), []):
+            if barra is event.artist:
+                self.filtro_analisis = filtro
+                self.modo_analisis.set('Por Producto')
+                self.actualizar_analisis()
+                return
+
+    def cambiar_modo_analisis(self, modo):
+        self.filtro_analisis = None
+        self.actualizar_analisis()
+
+    def quitar_filtro_analisis(self):
+        self.filtro_analisis = None
+        self.actualizar_analisis()
+
+    # ------------------------- PESTAÑA HISTORIAL -------------------------
+    def crear_pestana_historial(self, tab):
+        self.tab_historial = tab
+
+        control_frame = ctk.CTkFrame(self.tab_historial, fg_color="#2b2b2b")
+        control_frame.pack(pady=10, padx=10, fill='x')
+
+        ctk.CTkLabel(control_frame, text="Buscar:").pack(side='left', padx=5)
+        self.buscar_ventas_entry = ctk.CTkEntry(control_frame, width=200)
+        self.buscar_ventas_entry.pack(side='left', padx=5)
+
+        stats_frame = ctk.CTkFrame(self.tab_historial, fg_color="#2b2b2b")
+        stats_frame.pack(side='bottom', pady=10, padx=10, fill='x')
+
+        self.lbl_ventas_cantidad = ctk.CTkLabel(stats_frame, text="Ventas: 0")
+        self.lbl_ventas_cantidad.pack(side='left', padx=20)
+        self.lbl_ventas_totales = ctk.CTkLabel(stats_frame, text="Ventas Totales: $0.00")
+        self.lbl_ventas_totales.pack(side='left', padx=20)
+        self.lbl_ventas_promedio = ctk.CTkLabel(stats_frame, text="Ticket Promedio: $0.00")
+        self.lbl_ventas_promedio.pack(side='left', padx=20)
+        self.lbl_ventas_extremos = ctk.CTkLabel(stats_frame, text="Ticket Mín/Máx: $0.00 / $0.00")
+        self.lbl_ventas_extremos.pack(side='left', padx=20)
+
+        self.tree_ventas = ttk.Treeview(self.tab_historial, columns=('Fecha', 'Producto', 'Cantidad', 'Total'),
+                                        show='headings', style="Custom.Treeview")
+        self.configurar_estilo_tablas()
+
+        self.tree_ventas.heading('Fecha', text='Fecha')
+        self.tree_ventas.heading('Producto', text='Producto')
+        self.tree_ventas.heading('Cantidad', text='Cantidad')
+        self.tree_ventas.heading('Total', text='Total')
+
+        scroll = ttk.Scrollbar(self.tab_historial, orient="vertical", command=self.tree_ventas.yview)
+        self.tree_ventas.configure(yscrollcommand=scroll.set)
+
+        self.tree_ventas.pack(side='left', fill='both', expand=True)
+        scroll.pack(side='right', fill='y')
+
+        self.items_historial = []  # Todas las filas en orden, también las ocultas por la búsqueda
+        self.visibles_historial = set()  # Números de fila que están a la vista
+        self.indice_ventas = IndiceVentas()
+        self.busqueda_historial = BusquedaDiferida(self.buscar_ventas_entry, self.indice_ventas.buscar,
+                                                   self.filtrar_historial, demora_ms=BUSQUEDA_DEMORA_MS,
+                                                   al_fallar=lambda error: messagebox.showerror(
+                                                       "Error", f"No se pudo buscar: {error}"))
+        self.actualizar_resumen_historial()
+        self.actualizar_historial()
+
+    def actualizar_historial(self):
+        """Llena la tabla de a un bloque por vuelta del mainloop, sin trabar la ventana"""
+        tree = self.tree_ventas
+        bloques = self.ventas.bloques()
+        self.historial_lleno = False
+
+        def cargar_bloque():
+            if tree is not self.tree_ventas:  # Se cerró la sesión mientras se llenaba
+                return
+            try:
+                bloque = next(bloques)
+            except StopIteration:
+                self.historial_lleno = True
+                return
+            for venta in bloque:
+                self.agregar_fila_historial(venta)
+            self.root.after_idle(cargar_bloque)
+
+        cargar_bloque()
+
+    def agregar_fila_historial(self, venta):
+        """Agrega una sola fila al final y la indexa; queda oculta si no coincide con la búsqueda"""
+        valores = (venta['fecha'], venta['producto'], venta['cantidad'], f"${venta['total']:.2f}")
+        item = self.tree_ventas.insert('', 'end', values=valores)
+        self.items_historial.append(item)
+        fila = self.indice_ventas.agregar(valores)
+        if self.indice_ventas.coincide(fila, self.buscar_ventas_entry.get()):
+            self.visibles_historial.add(fila)
+        else:
+            self.tree_ventas.detach(item)
+
+    def actualizar_resumen_historial(self):
+        """Muestra los agregados que el historial mantiene al día; no recorre las ventas"""
+        if self.tree_ventas is None:
+            return
+        resumen = self.ventas.resumen
+        self.lbl_ventas_cantidad.configure(text=f"Ventas: {resumen.cantidad}")
+        self.lbl_ventas_totales.configure(text=f"Ventas Totales: ${resumen.total:.2f}")
+        self.lbl_ventas_promedio.configure(text=f"Ticket Promedio: ${resumen.promedio:.2f}")
+        self.lbl_ventas_extremos.configure(
+            text=f"Ticket Mín/Máx: ${resumen.minimo or 0:.2f} / ${resumen.maximo or 0:.2f}")
+
+    def filtrar_historial(self, coincidencias):
+        """Muestra el resultado de la búsqueda tocando solo las filas que cambian de estado"""
+        nuevas_visibles = set(coincidencias)
+        ocultar = [self.items_historial[fila] for fila in self.visibles_historial - nuevas_visibles]
+        if ocultar:
+            self.tree_ventas.detach(*ocultar)
+        # Las que reaparecen se ubican por su lugar entre las coincidencias, que vienen en orden
+        for posicion, fila in enumerate(coincidencias):
+            if fila not in self.visibles_historial:
+                self.tree_ventas.move(self.items_historial[fila], '', posicion)
+        self.visibles_historial = nuevas_visibles
+
+    def configurar_estilo_tablas(self):
+        style = ttk.Style()
+        style.configure("Custom.Treeview", background="#333333", foreground="white", fieldbackground="#333333")
+        style.map("Custom.Treeview", background=[('selected', '#1e6ba5')])
+
+    def cerrar_aplicacion(self):
+        """Guarda lo pendiente, cierra el almacenamiento y la aplicación"""
+        self.detener_auto_repeat()
+        self.tienda.cerrar()
+        self.root.destroy()
+
 if __name__ == "__main__":
+    medidor_arranque.etapa("imports")
     root = ctk.CTk()
+    medidor_arranque.etapa("ventana principal")
     app = GestionStock(root)
+    medidor_arranque.etapa("datos cargados y login armado")
+    if medidor_arranque.activo:
+        def reportar_arranque():
+            medidor_arranque.etapa("login en pantalla")
+            print(medidor_arranque.reporte())
+        root.after_idle(reportar_arranque)
     root.mainloop()
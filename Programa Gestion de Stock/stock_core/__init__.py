@@ -0,0 +1,25 @@
+from .alertas import AlertasStock
+from .analisis import AnalisisMargen, MargenCategoria, analizar_margenes
+from .autocompletar import Autocompletado
+from .autoguardado import Autoguardado
+from .busqueda import IndiceVentas
+from .carrito import Carrito, LineaCarrito
+from .catalogo import CatalogoProductos, normalizar_nombre
+from .cliente import ClienteStock, ErrorServidor
+from .diario import DiarioVentas
+from .historial import HistorialVentas, ResumenVentas
+from .importacion import ResultadoImportacion, importar_productos, validar_archivo
+from .modelos import ConflictoVersion, Producto, Proveedor, Usuario
+from .motor import MotorStock
+from .persistencia import Persistencia, PersistenciaJSON
+from .persistencia_sqlite import PersistenciaSQLite
+from .tabla import TablaProductos
+from .tienda import Tienda
+
+__all__ = [
+    "AlertasStock", "AnalisisMargen", "Autocompletado", "Autoguardado", "Carrito", "CatalogoProductos",
+    "ClienteStock", "ConflictoVersion", "DiarioVentas", "ErrorServidor", "HistorialVentas",
+    "IndiceVentas", "LineaCarrito", "MargenCategoria", "MotorStock", "Persistencia", "PersistenciaJSON",
+    "PersistenciaSQLite", "Producto", "Proveedor", "ResultadoImportacion", "ResumenVentas", "TablaProductos",
+    "Tienda", "Usuario", "analizar_margenes", "importar_productos", "normalizar_nombre", "validar_archivo"
+]
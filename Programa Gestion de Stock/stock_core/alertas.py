@@ -0,0 +1,55 @@
+from bisect import bisect_left, insort
+
+
+class AlertasStock:
+    """Productos con stock bajo (stock <= stock_minimo), del mayor faltante al menor.
+
+    Se mantiene al día producto por producto: `actualizar` se llama cuando
+    cambia el stock o el mínimo de uno, y devuelve en qué posición estaba y
+    en cuál quedó. Se indexa por posición (da el código), así una lista
+    virtual la muestra sin copiarla.
+    """
+
+    def __init__(self, productos=()):
+        self._orden = []
+        self._claves = {}
+        for producto in productos:
+            self.actualizar(producto)
+
+    def __len__(self):
+        return len(self._orden)
+
+    def __iter__(self):
+        return (codigo for _, codigo in self._orden)
+
+    def __getitem__(self, posicion):
+        return self._orden[posicion][1]
+
+    def __contains__(self, codigo):
+        return codigo in self._claves
+
+    def codigo_en(self, posicion):
+        """Código en esa posición, o None si está fuera de la lista"""
+        if 0 <= posicion < len(self._orden):
+            return self._orden[posicion][1]
+        return None
+
+    def actualizar(self, producto):
+        """Reubica un producto. Devuelve (posición anterior, posición nueva); None si no estaba / no está"""
+        anterior = self.quitar(producto)
+        if producto.stock > producto.stock_minimo:
+            return anterior, None
+        # Mayor faltante primero; a igual faltante, por código
+        clave = (producto.stock - producto.stock_minimo, producto.codigo)
+        insort(self._orden, clave)
+        self._claves[producto.codigo] = clave
+        return anterior, bisect_left(self._orden, clave)
+
+    def quitar(self, producto):
+        """Saca un producto de la lista. Devuelve la posición que tenía, o None"""
+        clave = self._claves.pop(producto.codigo, None)
+        if clave is None:
+            return None
+        posicion = bisect_left(self._orden, clave)
+        del self._orden[posicion]
+        return posicion
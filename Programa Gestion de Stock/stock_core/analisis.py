@@ -0,0 +1,170 @@
+import heapq
+
+from .tabla import TablaProductos
+
+# NumPy es opcional (sin él se calcula en Python puro, en una sola pasada) y
+# se importa con el primer análisis, no al importar stock_core
+np = None
+_numpy_buscado = False
+
+
+def _numpy():
+    global np, _numpy_buscado
+    if not _numpy_buscado:
+        _numpy_buscado = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np
+
+
+class MargenCategoria:
+    __slots__ = ("categoria", "cantidad", "minimo", "promedio", "maximo", "bajo_minimo")
+
+    def __init__(self, categoria, cantidad, minimo, promedio, maximo, bajo_minimo):
+        self.categoria = categoria
+        self.cantidad = cantidad
+        self.minimo = minimo
+        self.promedio = promedio
+        self.maximo = maximo
+        self.bajo_minimo = bajo_minimo
+
+
+class AnalisisMargen:
+    """Márgenes de todos los productos y sus estadísticas por categoría.
+
+    `margenes[i]` es el margen del i-ésimo producto recorrido (un array de
+    NumPy, o una lista sin NumPy). `por_categoria` sigue el orden en que
+    aparece cada categoría. Para graficar sin dibujar todo el catálogo,
+    `extremos` elige los N mayores/menores e `histograma` agrupa en intervalos;
+    `filas_de_categoria` y `filas_en_rango` sirven para profundizar.
+    """
+
+    def __init__(self, nombres, categorias, margenes, por_categoria, promedio):
+        self.nombres = nombres
+        self.categorias = categorias
+        self.margenes = margenes
+        self.por_categoria = por_categoria
+        self.promedio = promedio
+
+    def __len__(self):
+        return len(self.margenes)
+
+    def extremos(self, cantidad, menores=False, filas=None):
+        """Las `cantidad` filas de mayor (o menor) margen, ordenadas; selección parcial con un heap"""
+        if filas is None:
+            filas = range(len(self.margenes))
+        elegir = heapq.nsmallest if menores else heapq.nlargest
+        return elegir(cantidad, filas, key=self.margenes.__getitem__)
+
+    def histograma(self, intervalos):
+        """(bordes, cantidades) de los márgenes en `intervalos` tramos iguales; el último incluye el máximo"""
+        if not len(self.margenes):
+            return [], []
+        if isinstance(self.margenes, list):
+            return _histograma_python(self.margenes, intervalos)
+        cantidades, bordes = np.histogram(self.margenes, bins=intervalos)
+        return bordes.tolist(), cantidades.tolist()
+
+    def filas_de_categoria(self, categoria):
+        return [fila for fila, c in enumerate(self.categorias) if c == categoria]
+
+    def filas_en_rango(self, desde, hasta, incluir_hasta=False):
+        """Filas con desde <= margen < hasta (o <= hasta, para el último intervalo)"""
+        if isinstance(self.margenes, list):
+            return [fila for fila, m in enumerate(self.margenes)
+                    if desde <= m < hasta or (incluir_hasta and m == hasta)]
+        m = self.margenes
+        dentro = (m >= desde) & ((m <= hasta) if incluir_hasta else (m < hasta))
+        return np.flatnonzero(dentro).tolist()
+
+
+def analizar_margenes(productos, margen_minimo):
+    """Calcula los márgenes de una vez y los agrupa por categoría.
+
+    `productos` puede ser un iterable de Producto o una TablaProductos (en ese
+    caso se usan sus columnas sin copiar). Un producto con precio 0 tiene
+    margen 0, como en Producto.margen_ganancia.
+    """
+    if isinstance(productos, TablaProductos):
+        nombres, categorias = productos.nombres, productos.categorias
+        costos, precios = productos.costos, productos.precios
+    else:
+        productos = list(productos)
+        nombres = [p.nombre for p in productos]
+        categorias = [p.categoria for p in productos]
+        costos = [p.costo for p in productos]
+        precios = [p.precio for p in productos]
+
+    if _numpy() is None:
+        return _analizar_python(nombres, categorias, costos, precios, margen_minimo)
+    return _analizar_numpy(nombres, categorias, costos, precios, margen_minimo)
+
+
+def _analizar_numpy(nombres, categorias, costos, precios, margen_minimo):
+    costos = np.asarray(costos, dtype=float)
+    precios = np.asarray(precios, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margenes = np.where(precios == 0, 0.0, ((precios - costos) / precios) * 100)
+    if not len(margenes):
+        return AnalisisMargen(nombres, categorias, margenes, [], 0)
+
+    # Número de grupo por producto, en orden de aparición de la categoría
+    numeros = {}
+    grupos = np.fromiter((numeros.setdefault(c, len(numeros)) for c in categorias),
+                         dtype=np.intp, count=len(categorias))
+    cantidad = np.bincount(grupos)
+    suma = np.bincount(grupos, weights=margenes)
+    bajo_minimo = np.bincount(grupos, weights=margenes < margen_minimo)
+    # Ordenados por grupo, cada grupo queda contiguo y se reduce por tramos
+    ordenados = margenes[np.argsort(grupos, kind="stable")]
+    inicios = np.concatenate(([0], np.cumsum(cantidad)[:-1]))
+    minimo = np.minimum.reduceat(ordenados, inicios)
+    maximo = np.maximum.reduceat(ordenados, inicios)
+
+    por_categoria = [
+        MargenCategoria(categoria, int(cantidad[g]), float(minimo[g]), float(suma[g] / cantidad[g]),
+                        float(maximo[g]), int(bajo_minimo[g]))
+        for categoria, g in numeros.items()
+    ]
+    return AnalisisMargen(nombres, categorias, margenes, por_categoria, float(margenes.mean()))
+
+
+def _analizar_python(nombres, categorias, costos, precios, margen_minimo):
+    margenes = [0 if precio == 0 else ((precio - costo) / precio) * 100
+                for costo, precio in zip(costos, precios)]
+    acumulados = {}
+    for categoria, margen in zip(categorias, margenes):
+        a = acumulados.get(categoria)
+        if a is None:
+            acumulados[categoria] = [1, margen, margen, margen, int(margen < margen_minimo)]
+            continue
+        a[0] += 1
+        a[1] += margen
+        if margen < a[2]:
+            a[2] = margen
+        if margen > a[3]:
+            a[3] = margen
+        if margen < margen_minimo:
+            a[4] += 1
+
+    por_categoria = [
+        MargenCategoria(categoria, cantidad, minimo, suma / cantidad, maximo, bajo_minimo)
+        for categoria, (cantidad, suma, minimo, maximo, bajo_minimo) in acumulados.items()
+    ]
+    promedio = sum(margenes) / len(margenes) if margenes else 0
+    return AnalisisMargen(nombres, categorias, margenes, por_categoria, promedio)
+
+
+def _histograma_python(margenes, intervalos):
+    minimo, maximo = min(margenes), max(margenes)
+    if minimo == maximo:  # Igual que NumPy: un rango de 1 centrado en el valor
+        minimo, maximo = minimo - 0.5, maximo + 0.5
+    ancho = (maximo - minimo) / intervalos
+    bordes = [minimo + i * ancho for i in range(intervalos)] + [maximo]
+    cantidades = [0] * intervalos
+    for m in margenes:
+        cantidades[min(int((m - minimo) / ancho), intervalos - 1)] += 1
+    return bordes, cantidades
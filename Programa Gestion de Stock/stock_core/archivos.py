@@ -0,0 +1,118 @@
+import json
+import os
+
+
+def escribir_atomico(archivo, contenido):
+    """Escribe `contenido` en un temporal y lo renombra sobre `archivo`.
+
+    Quien lea el archivo ve la versión anterior o la nueva, nunca una a medias.
+    """
+    temporal = archivo + ".tmp"
+    with open(temporal, "w") as f:
+        f.write(contenido)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, archivo)
+
+
+def iterar_arreglo_json(archivo, tamano_lectura=1 << 16):
+    """Recorre los elementos de un archivo con un arreglo JSON sin cargarlo entero"""
+    decodificador = json.JSONDecoder()
+    with open(archivo, "r") as f:
+        buffer = ""
+        pos = 0
+        fin = False
+
+        def leer_mas():
+            nonlocal buffer, pos, fin
+            bloque = f.read(tamano_lectura)
+            fin = not bloque
+            buffer = buffer[pos:] + bloque
+            pos = 0
+
+        def siguiente_caracter():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or fin:
+                    return buffer[pos] if pos < len(buffer) else ""
+                leer_mas()
+
+        if siguiente_caracter() != "[":
+            raise ValueError(f"{archivo} no contiene un arreglo JSON")
+        pos += 1
+        if siguiente_caracter() == "]":
+            return
+
+        while True:
+            siguiente_caracter()
+            try:
+                elemento, final = decodificador.raw_decode(buffer, pos)
+                # Un valor que toca el final del buffer puede seguir en el próximo bloque
+                completo = final < len(buffer) or fin
+            except json.JSONDecodeError:
+                if fin:
+                    raise
+                completo = False
+            if not completo:
+                leer_mas()
+                continue
+            pos = final
+            yield elemento
+
+            separador = siguiente_caracter()
+            pos += 1
+            if separador == "]":
+                return
+            if separador != ",":
+                raise ValueError(f"{archivo}: se esperaba ',' o ']'")
+
+
+class Bitacora:
+    """Archivo JSONL de solo anexado: un registro por línea, nunca se reescribe.
+
+    Una línea cortada por un corte de luz se saltea al leer, y la siguiente
+    escritura empieza en una línea nueva para no pegarse a ella.
+    """
+
+    def __init__(self, archivo, fsync=True):
+        self.archivo = archivo
+        self.fsync = fsync
+        self._archivo = None
+
+    def registrar(self, registro):
+        if self._archivo is None:
+            self._archivo = open(self.archivo, "a+")
+            if self._archivo.tell():
+                self._archivo.seek(self._archivo.tell() - 1)
+                if self._archivo.read(1) != "\n":
+                    self._archivo.write("\n")
+        self._archivo.write(json.dumps(registro) + "\n")
+        self._archivo.flush()
+        if self.fsync:
+            os.fsync(self._archivo.fileno())
+
+    def leer(self, desde=0):
+        """Recorre los registros; `desde` es una posición en bytes devuelta por `tamano`"""
+        try:
+            with open(self.archivo, "rb") as f:
+                f.seek(desde)
+                for linea in f:
+                    try:
+                        yield json.loads(linea)
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    def tamano(self):
+        try:
+            return os.path.getsize(self.archivo)
+        except FileNotFoundError:
+            return 0
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
@@ -0,0 +1,129 @@
+from bisect import bisect_left, insort
+from collections import deque
+
+from .catalogo import normalizar_nombre
+
+# Cada clave es "texto\0código": el separador, menor que cualquier carácter, deja
+# juntas las claves de un mismo texto, y prefijo + FIN (mayor que cualquiera)
+# acota el rango de las que empiezan con el prefijo
+SEPARADOR = "\0"
+FIN = chr(0x10FFFF)
+
+
+class Autocompletado:
+    """Sugerencias por prefijo de nombre o código, las más vendidas primero.
+
+    Las claves son el código y el nombre normalizado a partir de cada palabra
+    (así "leche entera" aparece tanto con "lec" como con "ent"). Viven en una
+    lista ordenada de cadenas: las que empiezan con un prefijo forman
+    un rango contiguo que se ubica con bisect. Altas y bajas insertan y borran
+    en su lugar, sin reordenar.
+
+    La frecuencia es la cantidad de ventas de cada nombre entre las últimas
+    `ventana` registradas.
+    """
+
+    def __init__(self, productos=(), ventana=5000):
+        self.ventana = ventana
+        self._productos = {}  # código -> producto
+        self._claves_de = {}  # código -> sus claves, para poder borrarlas
+        self._codigos_de_nombre = {}  # nombre normalizado -> {código: None}
+        self._frecuencia = {}  # nombre normalizado -> ventas en la ventana
+        self._recientes = deque()
+        self._claves = []
+        for producto in productos:
+            self._claves += self._indexar(producto)
+        self._claves.sort()
+
+    def __len__(self):
+        return len(self._productos)
+
+    def agregar(self, producto):
+        for clave in self._indexar(producto):
+            insort(self._claves, clave)
+
+    def eliminar(self, producto):
+        codigo = producto.codigo
+        claves = self._claves_de.pop(codigo)
+        for clave in claves:
+            posicion = bisect_left(self._claves, clave)
+            del self._claves[posicion]
+        del self._productos[codigo]
+        # El nombre con el que se indexó, por si el producto ya se renombró
+        nombre = claves[1].rpartition(SEPARADOR)[0]
+        mismos = self._codigos_de_nombre[nombre]
+        del mismos[codigo]
+        if not mismos:
+            del self._codigos_de_nombre[nombre]
+
+    def actualizar(self, producto):
+        """Reindexa un producto que cambió de nombre"""
+        claves = self._claves_de.get(producto.codigo)
+        if claves is not None and claves[1] != normalizar_nombre(producto.nombre) + SEPARADOR + producto.codigo:
+            self.eliminar(producto)
+            self.agregar(producto)
+
+    def registrar_venta(self, venta):
+        """Cuenta una venta y descuenta la que sale de la ventana"""
+        nombre = normalizar_nombre(venta["producto"])
+        self._recientes.append(nombre)
+        self._frecuencia[nombre] = self._frecuencia.get(nombre, 0) + 1
+        if len(self._recientes) > self.ventana:
+            viejo = self._recientes.popleft()
+            if self._frecuencia[viejo] == 1:
+                del self._frecuencia[viejo]
+            else:
+                self._frecuencia[viejo] -= 1
+
+    def frecuencia(self, producto):
+        return self._frecuencia.get(normalizar_nombre(producto.nombre), 0)
+
+    def sugerencias(self, texto, cantidad=8):
+        """Hasta `cantidad` productos cuyo código o alguna palabra del nombre empieza con `texto`.
+
+        Primero los más vendidos; a igual frecuencia, en orden alfabético de la
+        clave que coincidió. El costo depende del tamaño del rango o de la
+        cantidad de nombres vendidos (el menor), no del catálogo.
+        """
+        prefijo = normalizar_nombre(texto)
+        if not prefijo:
+            return []
+        inicio = bisect_left(self._claves, prefijo)
+        fin = bisect_left(self._claves, prefijo + FIN, inicio)
+
+        if fin - inicio <= len(self._frecuencia):
+            # Rango chico: se ordena entero
+            orden = {}
+            for clave in self._claves[inicio:fin]:
+                orden.setdefault(clave.rpartition(SEPARADOR)[2], len(orden))
+            elegidos = sorted(orden, key=lambda c: (-self.frecuencia(self._productos[c]), orden[c]))
+            return [self._productos[c] for c in elegidos[:cantidad]]
+
+        # Rango grande: primero los vendidos que coinciden, después se completa en orden alfabético
+        vendidos = []
+        buscado = " " + prefijo
+        for nombre, veces in self._frecuencia.items():
+            for codigo in self._codigos_de_nombre.get(nombre, ()):
+                if buscado in " " + nombre or codigo.casefold().startswith(prefijo):
+                    vendidos.append((veces, codigo))
+        vendidos.sort(key=lambda v: -v[0])
+        elegidos = dict.fromkeys(codigo for _, codigo in vendidos[:cantidad])
+        posicion = inicio
+        while len(elegidos) < cantidad and posicion < fin:
+            elegidos.setdefault(self._claves[posicion].rpartition(SEPARADOR)[2])
+            posicion += 1
+        return [self._productos[c] for c in elegidos]
+
+    def _indexar(self, producto):
+        codigo = producto.codigo
+        nombre = normalizar_nombre(producto.nombre)
+        self._productos[codigo] = producto
+        self._codigos_de_nombre.setdefault(nombre, {})[codigo] = None
+        sufijo = SEPARADOR + codigo
+        claves = [codigo.casefold() + sufijo, nombre + sufijo]
+        inicio = nombre.find(" ")
+        while inicio >= 0:
+            claves.append(nombre[inicio + 1:] + sufijo)
+            inicio = nombre.find(" ", inicio + 1)
+        self._claves_de[codigo] = claves
+        return claves
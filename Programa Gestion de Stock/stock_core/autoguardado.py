@@ -0,0 +1,63 @@
+import threading
+
+
+class Autoguardado:
+    """Guardado diferido en un hilo aparte (write-behind).
+
+    Cada `programar` avisa que hay cambios; el hilo espera `ventana` segundos
+    para juntar los que lleguen en ráfaga (por ejemplo al mantener apretado
+    +/-) y los escribe todos en un único guardado, fuera del hilo de la interfaz.
+    `vaciar` guarda lo pendiente de forma síncrona.
+
+    Si un guardado del hilo falla, el error queda en `error` y se pasa a
+    `al_fallar(error)` (desde el hilo de guardado) la primera vez que falla
+    después de haber guardado bien. Lo no guardado sigue marcado.
+    """
+
+    def __init__(self, persistencia, serializadores, ventana=0.5):
+        self.persistencia = persistencia
+        self.serializadores = serializadores
+        self.ventana = ventana
+        self.error = None
+        self.al_fallar = None
+        self._hay_cambios = threading.Event()
+        self._detenido = threading.Event()
+        self._bloqueo_guardado = threading.Lock()
+        self._hilo = threading.Thread(target=self._ejecutar, name="autoguardado", daemon=True)
+        self._hilo.start()
+
+    def programar(self):
+        """Avisa al hilo que hay cambios marcados para guardar"""
+        self._hay_cambios.set()
+
+    def vaciar(self):
+        """Guarda ya, en el hilo que llama, lo que esté pendiente"""
+        with self._bloqueo_guardado:
+            guardados = self.persistencia.guardar(self.serializadores)
+            self.error = None
+            return guardados
+
+    def detener(self):
+        """Termina el hilo y guarda lo pendiente de forma síncrona"""
+        self._detenido.set()
+        self._hay_cambios.set()
+        self._hilo.join()
+        return self.vaciar()
+
+    def _ejecutar(self):
+        while True:
+            self._hay_cambios.wait()
+            # Ventana de agrupado: se corta antes si la aplicación se cierra
+            self._detenido.wait(self.ventana)
+            if self._detenido.is_set():
+                return
+            self._hay_cambios.clear()
+            try:
+                with self._bloqueo_guardado:
+                    self.persistencia.guardar(self.serializadores)
+                self.error = None
+            except Exception as error:
+                # Lo no guardado sigue marcado: se reintenta en el próximo aviso o al vaciar
+                anterior, self.error = self.error, error
+                if anterior is None and self.al_fallar is not None:
+                    self.al_fallar(error)
@@ -0,0 +1,95 @@
+import re
+import threading
+from array import array
+
+_PALABRA = re.compile(r"\w+")
+_SEPARADOR = "\x00"  # Entre valores de una fila; no se puede tipear en el buscador
+
+
+class IndiceVentas:
+    """Índice invertido del historial para el buscador.
+
+    Cada fila se indexa por sus palabras (tramos de letras y números, en
+    minúsculas) y cada palabra por sus trigramas. Una búsqueda toma las filas
+    que tienen, para cada palabra de la consulta, alguna palabra que la contiene,
+    y confirma sobre esas pocas que algún valor contenga el texto, igual que el
+    filtro anterior. Si la consulta nueva contiene a la anterior (se siguió
+    escribiendo) solo se revisan los resultados previos.
+
+    Se puede buscar desde otro hilo mientras el de Tk agrega filas. La lista
+    que devuelve `buscar` sigue recibiendo las filas que se agreguen y
+    coincidan, hasta la búsqueda siguiente.
+    """
+
+    def __init__(self):
+        self._textos = []
+        self._filas_por_palabra = {}
+        self._palabras_por_trigrama = {}
+        self._ultima = ("", None)
+        self._bloqueo = threading.Lock()
+
+    def __len__(self):
+        return len(self._textos)
+
+    def agregar(self, valores):
+        """Indexa una fila (sus valores como se muestran) y devuelve su número"""
+        texto = _SEPARADOR.join(str(valor).lower() for valor in valores)
+        palabras = set(_PALABRA.findall(texto))
+        with self._bloqueo:
+            fila = len(self._textos)
+            self._textos.append(texto)
+            for palabra in palabras:
+                filas = self._filas_por_palabra.get(palabra)
+                if filas is None:
+                    filas = self._filas_por_palabra[palabra] = array("L")
+                    for i in range(len(palabra) - 2):
+                        self._palabras_por_trigrama.setdefault(palabra[i:i + 3], set()).add(palabra)
+                filas.append(fila)
+
+            consulta, resultados = self._ultima
+            if resultados is not None and consulta in texto:
+                resultados.append(fila)
+        return fila
+
+    def coincide(self, fila, consulta):
+        return consulta.lower() in self._textos[fila]
+
+    def buscar(self, consulta):
+        """Filas con algún valor que contiene `consulta` (sin distinguir mayúsculas), en orden"""
+        consulta = consulta.lower()
+        with self._bloqueo:
+            if not consulta:
+                resultados = list(range(len(self._textos)))
+                self._ultima = ("", resultados)
+                return resultados
+
+            anterior, resultados = self._ultima
+            if anterior and resultados is not None and anterior in consulta:
+                candidatas = resultados  # Solo puede achicarse
+            else:
+                candidatas = self._candidatas(consulta)
+            textos = self._textos
+            resultados = [fila for fila in candidatas if consulta in textos[fila]]
+            self._ultima = (consulta, resultados)
+            return resultados
+
+    def _candidatas(self, consulta):
+        palabras = set(_PALABRA.findall(consulta))
+        if not palabras:
+            return range(len(self._textos))
+        conjuntos = []
+        for palabra in palabras:
+            filas = set()
+            for indexada in self._palabras_que_contienen(palabra):
+                filas.update(self._filas_por_palabra[indexada])
+            if not filas:
+                return []
+            conjuntos.append(filas)
+        conjuntos.sort(key=len)
+        return sorted(set.intersection(*conjuntos))
+
+    def _palabras_que_contienen(self, palabra):
+        if len(palabra) < 3:
+            return [p for p in self._filas_por_palabra if palabra in p]
+        grupos = [self._palabras_por_trigrama.get(palabra[i:i + 3], ()) for i in range(len(palabra) - 2)]
+        return [p for p in min(grupos, key=len) if palabra in p]
@@ -0,0 +1,95 @@
+class LineaCarrito:
+    __slots__ = ("producto", "cantidad")
+
+    def __init__(self, producto, cantidad):
+        self.producto = producto
+        self.cantidad = cantidad
+
+    @property
+    def subtotal(self):
+        return self.producto.precio * self.cantidad
+
+
+class Carrito:
+    """Ticket en armado: una línea por producto y el total llevado al día en cada cambio.
+
+    Los productos se buscan en el catálogo por código o por nombre (índices,
+    no recorridos). Cargar de nuevo un producto suma a su línea. El stock se
+    controla contra lo que ya está en el ticket al agregar, y otra vez al confirmar.
+    """
+
+    def __init__(self, catalogo):
+        self.catalogo = catalogo
+        self.lineas = {}
+        self.total = 0.0
+        self.unidades = 0
+
+    def __len__(self):
+        return len(self.lineas)
+
+    def __iter__(self):
+        return iter(self.lineas.values())
+
+    def buscar(self, texto):
+        """Producto cuyo código o nombre es `texto`, o None"""
+        texto = texto.strip()
+        return self.catalogo.buscar(texto) or self.catalogo.buscar_por_nombre(texto)
+
+    def agregar(self, producto, cantidad):
+        """Suma `cantidad` unidades al ticket y devuelve la línea. ValueError si no alcanza el stock"""
+        if cantidad <= 0:
+            raise ValueError("La cantidad debe ser mayor a cero")
+        linea = self.lineas.get(producto.codigo)
+        en_ticket = linea.cantidad if linea else 0
+        if en_ticket + cantidad > producto.stock:
+            raise ValueError(f"No hay suficiente stock de {producto.nombre} (quedan {producto.stock})")
+        if linea is None:
+            linea = self.lineas[producto.codigo] = LineaCarrito(producto, 0)
+        linea.cantidad += cantidad
+        self.total += producto.precio * cantidad
+        self.unidades += cantidad
+        return linea
+
+    def quitar(self, codigo):
+        linea = self.lineas.pop(codigo)
+        self.total -= linea.subtotal
+        self.unidades -= linea.cantidad
+        if not self.lineas:
+            self.total = 0.0  # Sin arrastrar redondeos al ticket siguiente
+        return linea
+
+    def vaciar(self):
+        self.lineas = {}
+        self.total = 0.0
+        self.unidades = 0
+
+    def confirmar(self, registrar, fecha):
+        """Vende el ticket entero de una vez.
+
+        Controla el stock de todas las líneas, arma las ventas y llama a
+        `registrar(ventas, stocks)` (que debe guardar todo junto; `stocks` es
+        código -> (stock final, versión leída)). Recién después descuenta el
+        stock en memoria y sube la versión: si algo falla, incluido un
+        ConflictoVersion, no se descuenta nada. Devuelve (ventas, productos vendidos).
+        """
+        for linea in self:
+            if linea.cantidad > linea.producto.stock:
+                raise ValueError(f"No hay suficiente stock de {linea.producto.nombre} "
+                                 f"(quedan {linea.producto.stock})")
+        ventas = [{
+            "producto": linea.producto.nombre,
+            "cantidad": linea.cantidad,
+            "fecha": fecha,
+            "total": linea.subtotal
+        } for linea in self]
+        stocks = {linea.producto.codigo: (linea.producto.stock - linea.cantidad, linea.producto.version)
+                  for linea in self}
+        registrar(ventas, stocks)
+
+        productos = []
+        for linea in self:
+            linea.producto.stock -= linea.cantidad
+            linea.producto.version += 1
+            productos.append(linea.producto)
+        self.vaciar()
+        return ventas, productos
@@ -0,0 +1,78 @@
+def normalizar_nombre(nombre):
+    """Clave de búsqueda de un nombre: sin espacios sobrantes y sin mayúsculas (incluye ñ y acentos)"""
+    return " ".join(nombre.split()).casefold()
+
+
+class CatalogoProductos:
+    """Productos indexados por código y por nombre normalizado.
+
+    Altas, bajas, búsquedas y control de códigos duplicados son O(1). Se recorre
+    en orden de alta, como la lista que reemplaza. Para cambiar el nombre de un
+    producto hay que usar `renombrar`, así el índice queda al día.
+
+    `version` aumenta con cada alta, baja o cambio de nombre, costo o precio:
+    quien guarde resultados derivados del catálogo (análisis, gráficos) sabe
+    si siguen valiendo.
+    """
+
+    def __init__(self, productos=()):
+        self._por_codigo = {}
+        self._por_nombre = {}
+        self.version = 0
+        for producto in productos:
+            self.agregar(producto)
+
+    def __len__(self):
+        return len(self._por_codigo)
+
+    def __iter__(self):
+        return iter(self._por_codigo.values())
+
+    def __contains__(self, codigo):
+        return codigo in self._por_codigo
+
+    def agregar(self, producto):
+        if producto.codigo in self._por_codigo:
+            raise ValueError(f"El código {producto.codigo} ya existe")
+        self._por_codigo[producto.codigo] = producto
+        self._indexar_nombre(producto)
+        self.version += 1
+
+    def eliminar(self, producto):
+        del self._por_codigo[producto.codigo]
+        self._desindexar_nombre(producto)
+        self.version += 1
+
+    def renombrar(self, producto, nuevo_nombre):
+        self._desindexar_nombre(producto)
+        producto.nombre = nuevo_nombre
+        self._indexar_nombre(producto)
+        self.version += 1
+
+    def actualizar(self, producto, datos):
+        """Lleva a `producto` los campos de `datos` (dict), reindexando el nombre si cambió"""
+        if datos.get("nombre", producto.nombre) != producto.nombre:
+            self.renombrar(producto, datos["nombre"])
+        if (datos.get("costo", producto.costo), datos.get("precio", producto.precio)) != \
+                (producto.costo, producto.precio):
+            self.version += 1
+        for campo, valor in datos.items():
+            setattr(producto, campo, valor)
+
+    def buscar(self, codigo):
+        return self._por_codigo.get(codigo)
+
+    def buscar_por_nombre(self, nombre):
+        """Producto con ese nombre (sin distinguir mayúsculas); el primero dado de alta si se repite"""
+        mismos = self._por_nombre.get(normalizar_nombre(nombre))
+        return next(iter(mismos.values())) if mismos else None
+
+    def _indexar_nombre(self, producto):
+        self._por_nombre.setdefault(normalizar_nombre(producto.nombre), {})[producto.codigo] = producto
+
+    def _desindexar_nombre(self, producto):
+        clave = normalizar_nombre(producto.nombre)
+        mismos = self._por_nombre[clave]
+        del mismos[producto.codigo]
+        if not mismos:
+            del self._por_nombre[clave]
@@ -0,0 +1,252 @@
+"""Gestión de stock desde la línea de comandos, sin interfaz gráfica.
+
+Usa los mismos archivos (o la misma base, o el mismo servidor de stock) que
+la aplicación. Con `lote` se ejecutan muchos comandos, uno por línea, sobre
+una sola carga de los datos.
+
+Uso (desde la carpeta del programa):
+    python -m stock_core.cli productos --bajo-stock
+    python -m stock_core.cli vender A1:2 B7:1
+    python -m stock_core.cli --usuario admin --contrasena admin123 usuario ana secreta
+    python -m stock_core.cli lote reposicion.txt      (o "-" para leer de la entrada estándar)
+    python -m stock_core.cli importar lista_precios.csv --reporte errores.csv
+
+Ejemplo de archivo de lote (las líneas vacías y las que empiezan con # se saltean):
+    agregar A1 "Yerba 1kg" Almacén 900 1500 40 --minimo 10
+    ajustar A1 -3 --motivo rotura
+    vender A1:2
+"""
+import argparse
+import shlex
+import sys
+
+from .modelos import Producto
+from .tienda import Tienda, abrir_persistencia, agregar_argumentos_almacenamiento
+
+
+class _ParserDeLote(argparse.ArgumentParser):
+    """En un lote un comando mal escrito es un error de esa línea, no el fin del programa"""
+
+    def error(self, mensaje):
+        raise ValueError(mensaje)
+
+
+def _linea_de_venta(texto):
+    codigo, _, cantidad = texto.rpartition(":")
+    if not codigo or not cantidad.isdigit():
+        raise argparse.ArgumentTypeError(f"se esperaba CODIGO:CANTIDAD y no {texto!r}")
+    return codigo, int(cantidad)
+
+
+def _fila(*valores):
+    print("\t".join(str(valor) for valor in valores))
+
+
+def productos(tienda, args, usuario):
+    for producto in tienda.productos:
+        if args.categoria and producto.categoria != args.categoria:
+            continue
+        if args.bajo_stock and producto.stock > producto.stock_minimo:
+            continue
+        if args.buscar and args.buscar.casefold() not in producto.nombre.casefold():
+            continue
+        _fila(producto.codigo, producto.nombre, producto.categoria, f"{producto.costo:.2f}",
+              f"{producto.precio:.2f}", producto.stock, producto.stock_minimo)
+
+
+def agregar(tienda, args, usuario):
+    producto = tienda.motor.agregar_producto(Producto(args.codigo, args.nombre, args.categoria, args.costo,
+                                                      args.precio, args.stock, args.minimo))
+    print(f"Producto {producto.codigo} agregado")
+
+
+def eliminar(tienda, args, usuario):
+    print(f"Producto {tienda.motor.eliminar_producto(args.codigo).codigo} eliminado")
+
+
+def ajustar(tienda, args, usuario):
+    movimiento = tienda.motor.ajustar_stock(args.codigo, args.incremento, args.motivo,
+                                            usuario.usuario if usuario else None)
+    print(f"Stock de {movimiento['codigo']}: {movimiento['stock']}")
+
+
+def minimo(tienda, args, usuario):
+    producto = tienda.motor.fijar_stock_minimo(args.codigo, args.minimo)
+    print(f"Stock mínimo de {producto.codigo}: {producto.stock_minimo}")
+
+
+def vender(tienda, args, usuario):
+    ventas = tienda.motor.vender(args.lineas)
+    print(f"Venta registrada: {len(ventas)} líneas, ${sum(v['total'] for v in ventas):.2f}")
+
+
+def importar(tienda, args, usuario):
+    resultado = tienda.importar_productos(args.archivo, args.procesos)
+    print(resultado.resumen())
+    if args.reporte:
+        resultado.escribir_reporte(args.reporte)
+    else:
+        for linea, codigo, error in resultado.errores:
+            print(f"Línea {linea} ({codigo or 'sin código'}): {error}", file=sys.stderr)
+
+
+def ventas(tienda, args, usuario):
+    cantidad = total = 0
+    for venta in tienda.ventas_entre(args.desde, args.hasta, args.buscar):
+        _fila(venta["fecha"], venta["producto"], venta["cantidad"], f"{venta['total']:.2f}")
+        cantidad += 1
+        total += venta["total"]
+    print(f"{cantidad} ventas, total ${total:.2f}", file=sys.stderr)
+
+
+def margenes(tienda, args, usuario):
+    analisis = tienda.analizar_margenes(args.minimo)
+    for categoria in analisis.por_categoria:
+        _fila(categoria.categoria, categoria.cantidad, f"{categoria.minimo:.1f}", f"{categoria.promedio:.1f}",
+              f"{categoria.maximo:.1f}", categoria.bajo_minimo)
+    print(f"Margen promedio: {analisis.promedio:.1f}% en {len(analisis)} productos", file=sys.stderr)
+
+
+def proveedores(tienda, args, usuario):
+    for proveedor in tienda.proveedores:
+        _fila(proveedor.nombre, proveedor.telefono, proveedor.direccion)
+
+
+def proveedor(tienda, args, usuario):
+    nuevo = tienda.registrar_proveedor(args.nombre, args.telefono, args.direccion)
+    print(f"Proveedor {nuevo.nombre} registrado")
+
+
+def nuevo_usuario(tienda, args, usuario):
+    nuevo = tienda.registrar_usuario(usuario, args.nombre, args.contrasena, args.rol)
+    print(f"Usuario {nuevo.usuario} registrado")
+
+
+def lote(tienda, args, usuario):
+    """Ejecuta un comando por línea; sigue después de un error salvo con --detener. Devuelve los errores"""
+    parser = _ParserDeLote(prog="lote", add_help=False)
+    agregar_comandos(parser, en_lote=True)
+    archivo = sys.stdin if args.archivo == "-" else open(args.archivo, encoding="utf-8")
+    errores = 0
+    with archivo:
+        for numero, linea in enumerate(archivo, 1):
+            if not linea.strip() or linea.lstrip().startswith("#"):
+                continue
+            try:
+                comando = parser.parse_args(shlex.split(linea))
+                comando.ejecutar(tienda, comando, usuario)
+            except (ValueError, ConnectionError, OSError) as error:
+                errores += 1
+                print(f"Línea {numero}: {error}", file=sys.stderr)
+                if args.detener:
+                    break
+    return errores
+
+
+def agregar_comandos(parser, en_lote=False):
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    comando = comandos.add_parser("productos", help="Lista el catálogo")
+    comando.add_argument("--categoria")
+    comando.add_argument("--bajo-stock", action="store_true", help="Solo los que están en el mínimo o debajo")
+    comando.add_argument("--buscar", help="Texto contenido en el nombre")
+    comando.set_defaults(ejecutar=productos)
+
+    comando = comandos.add_parser("agregar", help="Da de alta un producto")
+    comando.add_argument("codigo")
+    comando.add_argument("nombre")
+    comando.add_argument("categoria")
+    comando.add_argument("costo", type=float)
+    comando.add_argument("precio", type=float)
+    comando.add_argument("stock", type=int)
+    comando.add_argument("--minimo", type=int, default=5)
+    comando.set_defaults(ejecutar=agregar)
+
+    comando = comandos.add_parser("eliminar", help="Da de baja un producto")
+    comando.add_argument("codigo")
+    comando.set_defaults(ejecutar=eliminar)
+
+    comando = comandos.add_parser("ajustar", help="Suma (o resta, con negativo) unidades al stock")
+    comando.add_argument("codigo")
+    comando.add_argument("incremento", type=int)
+    comando.add_argument("--motivo", default="ajuste")
+    comando.set_defaults(ejecutar=ajustar)
+
+    comando = comandos.add_parser("minimo", help="Fija el stock mínimo de un producto")
+    comando.add_argument("codigo")
+    comando.add_argument("minimo", type=int)
+    comando.set_defaults(ejecutar=minimo)
+
+    comando = comandos.add_parser("vender", help="Registra un ticket: todas sus líneas o ninguna")
+    comando.add_argument("lineas", nargs="+", type=_linea_de_venta, metavar="CODIGO:CANTIDAD")
+    comando.set_defaults(ejecutar=vender)
+
+    comando = comandos.add_parser("importar", help="Agrega o actualiza los productos de un archivo CSV")
+    comando.add_argument("archivo", help="CSV con codigo, nombre, categoria, costo, precio, stock[, stock_minimo]")
+    comando.add_argument("--reporte", help="Escribir las filas con errores en este CSV")
+    comando.add_argument("--procesos", type=int, help="Procesos para validar (por defecto, uno por procesador)")
+    comando.set_defaults(ejecutar=importar)
+
+    comando = comandos.add_parser("ventas", help="Lista el historial de ventas")
+    comando.add_argument("--desde", help='Fecha inicial, por ejemplo "2024-05-01"')
+    comando.add_argument("--hasta", help='Fecha final inclusive, por ejemplo "2024-05-31~"')
+    comando.add_argument("--buscar", help="Texto contenido en el producto")
+    comando.set_defaults(ejecutar=ventas)
+
+    comando = comandos.add_parser("margenes", help="Márgenes de ganancia por categoría")
+    comando.add_argument("--minimo", type=float, default=20, help="Margen mínimo aceptable (%%)")
+    comando.set_defaults(ejecutar=margenes)
+
+    comando = comandos.add_parser("proveedores", help="Lista los proveedores")
+    comando.set_defaults(ejecutar=proveedores)
+
+    comando = comandos.add_parser("proveedor", help="Registra un proveedor")
+    comando.add_argument("nombre")
+    comando.add_argument("telefono")
+    comando.add_argument("direccion")
+    comando.set_defaults(ejecutar=proveedor)
+
+    comando = comandos.add_parser("usuario", help="Registra un usuario (requiere --usuario de admin)")
+    comando.add_argument("nombre")
+    comando.add_argument("contrasena")
+    comando.add_argument("--rol", default="normal")
+    comando.set_defaults(ejecutar=nuevo_usuario)
+
+    if not en_lote:
+        comando = comandos.add_parser("lote", help="Ejecuta los comandos de un archivo, uno por línea")
+        comando.add_argument("archivo", help='Archivo de comandos, o "-" para la entrada estándar')
+        comando.add_argument("--detener", action="store_true", help="Terminar en el primer error")
+        comando.set_defaults(ejecutar=lote)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m stock_core.cli",
+                                     description="Gestión de stock desde la línea de comandos")
+    agregar_argumentos_almacenamiento(parser)
+    parser.add_argument("--servidor", help='Servidor de stock compartido ("host:puerto" o "unix:/ruta")')
+    # Otro dest: el comando "usuario" tiene su propia contraseña
+    parser.add_argument("--usuario", dest="sesion_usuario",
+                        help="Usuario con el que se opera (queda en los movimientos de stock)")
+    parser.add_argument("--contrasena", dest="sesion_contrasena", default="")
+    agregar_comandos(parser)
+    args = parser.parse_args(argv)
+
+    tienda = Tienda(abrir_persistencia(args), args.servidor)
+    try:
+        usuario = None
+        if args.sesion_usuario:
+            usuario = tienda.autenticar(args.sesion_usuario, args.sesion_contrasena)
+            if usuario is None:
+                parser.error("Credenciales inválidas")
+        try:
+            errores = args.ejecutar(tienda, args, usuario)
+        except (ValueError, ConnectionError, OSError) as error:
+            parser.exit(1, f"Error: {error}\n")
+        if errores:
+            parser.exit(1, f"{errores} comandos con error\n")
+    finally:
+        tienda.cerrar()
+
+
+if __name__ == "__main__":
+    main()
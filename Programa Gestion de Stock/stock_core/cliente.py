@@ -0,0 +1,194 @@
+import itertools
+import json
+import socket
+import threading
+
+from .catalogo import CatalogoProductos
+from .historial import HistorialVentas, ResumenVentas
+from .modelos import ConflictoVersion, Producto
+
+IMPORTAR_POR_PEDIDO = 2000  # Productos por pedido al importar: cada pedido tiene un límite de tamaño
+
+
+class ErrorServidor(Exception):
+    """El servidor de stock no pudo completar un pedido válido"""
+
+
+def conectar(direccion):
+    """Socket conectado a "host:puerto" o a "unix:/ruta/al/socket" """
+    if direccion.startswith("unix:"):
+        conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexion.connect(direccion[len("unix:"):])
+        return conexion
+    host, _, puerto = direccion.rpartition(":")
+    conexion = socket.create_connection((host or "127.0.0.1", int(puerto)))
+    # Pedidos chicos de ida y vuelta: sin Nagle cada uno sale en el momento
+    conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return conexion
+
+
+class ClienteStock:
+    """Terminal de un servidor de stock, con las mismas operaciones que MotorStock.
+
+    Al conectarse recibe el catálogo y el resumen de ventas y los mantiene al
+    día con lo que hacen las otras terminales. Un hilo lee respuestas y
+    avisos; los cambios ajenos se aplican con `despachar(funcion)` (en la
+    interfaz, `root.after`) para que el catálogo se toque desde un solo hilo,
+    y después se pasan a los `oyentes` como (agregados, actualizados,
+    eliminados, ventas). Los cambios propios se aplican al volver cada llamada.
+    """
+
+    def __init__(self, direccion, despachar=None, tamano_bloque=5000, espera=10):
+        self.despachar = despachar or (lambda funcion: funcion())
+        self.espera = espera
+        self.oyentes = []
+        self._socket = conectar(direccion)
+        self._bloqueo_envio = threading.Lock()
+        self._bloqueo_catalogo = threading.RLock()
+        self._esperando = {}  # id -> [Event, respuesta]
+        self._ids = itertools.count(1)
+        self._listo = threading.Event()
+        self._hilo = threading.Thread(target=self._leer, name="cliente-stock", daemon=True)
+        self._hilo.start()
+
+        estado = self._llamar("estado")
+        self.productos = CatalogoProductos(Producto(**p) for p in estado["productos"])
+        resumen = ResumenVentas.desde_dict(estado["resumen"])
+        # Las ventas hasta este punto se piden al servidor; las siguientes llegan como avisos
+        hasta = resumen.cantidad
+        self.ventas = HistorialVentas(resumen, lambda tamano: self._leer_ventas(hasta, tamano),
+                                      tamano_bloque)
+        self._listo.set()
+
+    def producto(self, codigo):
+        producto = self.productos.buscar(codigo)
+        if producto is None:
+            raise ValueError(f"No existe el producto {codigo}")
+        return producto
+
+    def vender(self, lineas):
+        return self._llamar("vender", lineas=[list(linea) for linea in lineas])
+
+    def ajustar_stock(self, codigo, incremento, motivo="ajuste", usuario=None, version=None):
+        return self._llamar("ajustar_stock", codigo=codigo, incremento=incremento,
+                            motivo=motivo, usuario=usuario, version=version)
+
+    def fijar_stock_minimo(self, codigo, minimo):
+        self._llamar("fijar_stock_minimo", codigo=codigo, minimo=minimo)
+        return self.producto(codigo)
+
+    def agregar_producto(self, producto):
+        self._llamar("agregar_producto", producto=producto.a_dict())
+        return self.producto(producto.codigo)
+
+    def importar_productos(self, registros):
+        """Se envían en tandas de IMPORTAR_POR_PEDIDO: un guardado del servidor por tanda"""
+        agregados, actualizados = [], []
+        for inicio in range(0, len(registros), IMPORTAR_POR_PEDIDO):
+            nuevos, cambiados = self._llamar("importar_productos",
+                                             productos=registros[inicio:inicio + IMPORTAR_POR_PEDIDO])
+            agregados += [self.producto(codigo) for codigo in nuevos]
+            actualizados += [self.producto(codigo) for codigo in cambiados]
+        return agregados, actualizados
+
+    def eliminar_producto(self, codigo):
+        producto = self.producto(codigo)
+        self._llamar("eliminar_producto", codigo=codigo)
+        return producto
+
+    def ultimas_ventas(self, cantidad):
+        return self._llamar("ultimas_ventas", cantidad=cantidad)
+
+    def guardar(self):
+        """Lo guarda el servidor"""
+
+    def cerrar(self):
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+
+    def _llamar(self, operacion, **args):
+        identificador = next(self._ids)
+        espera = [threading.Event(), None]
+        self._esperando[identificador] = espera
+        pedido = json.dumps({"id": identificador, "op": operacion, "args": args}) + "\n"
+        try:
+            with self._bloqueo_envio:
+                self._socket.sendall(pedido.encode())
+        except OSError as error:
+            self._esperando.pop(identificador, None)
+            raise ConnectionError(f"Sin conexión con el servidor de stock: {error}") from error
+        if not espera[0].wait(self.espera):
+            self._esperando.pop(identificador, None)
+            raise ConnectionError("El servidor de stock no respondió")
+
+        respuesta = espera[1]
+        if respuesta is None:
+            raise ConnectionError("Se perdió la conexión con el servidor de stock")
+        if respuesta.get("conflicto"):
+            raise ConflictoVersion(respuesta["error"], respuesta["codigos"])
+        if not respuesta["ok"]:
+            raise (ValueError if respuesta.get("rechazo") else ErrorServidor)(respuesta["error"])
+        if "cambio" in respuesta:
+            self._aplicar(respuesta["cambio"])
+        return respuesta["resultado"]
+
+    def _leer(self):
+        try:
+            for linea in self._socket.makefile("rb"):
+                mensaje = json.loads(linea)
+                if "id" not in mensaje:
+                    self._listo.wait()
+                    self.despachar(lambda cambio=mensaje["cambio"]: self._avisar(cambio))
+                    continue
+                espera = self._esperando.pop(mensaje["id"], None)
+                if espera is not None:
+                    espera[1] = mensaje
+                    espera[0].set()
+        except (OSError, ValueError, RuntimeError):
+            pass  # Conexión cerrada, o la ventana que despachaba ya no existe
+        # Sin conexión: se liberan las llamadas que esperaban (sin respuesta)
+        for espera in list(self._esperando.values()):
+            espera[0].set()
+
+    def _leer_ventas(self, hasta, tamano_bloque):
+        desde = 0
+        while desde < hasta:
+            bloque = self._llamar("ventas", desde=desde, hasta=min(desde + tamano_bloque, hasta))
+            if not bloque:
+                return
+            desde += len(bloque)
+            yield bloque
+
+    def _avisar(self, cambio):
+        cambios = self._aplicar(cambio)
+        for oyente in self.oyentes:
+            oyente(*cambios)
+
+    def _aplicar(self, cambio):
+        """Lleva un cambio del servidor a la copia local; devuelve (agregados, actualizados, eliminados, ventas)"""
+        agregados, actualizados, eliminados = [], [], []
+        with self._bloqueo_catalogo:
+            for datos in cambio["productos"]:
+                producto = self.productos.buscar(datos["codigo"])
+                if producto is None:
+                    producto = Producto(**datos)
+                    self.productos.agregar(producto)
+                    agregados.append(producto)
+                    continue
+                # Sin `despachar` los avisos se aplican en el hilo lector y la respuesta propia en
+                # el que llamó: si la respuesta llega tarde, ya se aplicó un stock más nuevo
+                if datos["version"] < producto.version:
+                    continue
+                self.productos.actualizar(producto, datos)
+                actualizados.append(producto)
+            for codigo in cambio["eliminados"]:
+                producto = self.productos.buscar(codigo)
+                if producto is not None:
+                    self.productos.eliminar(producto)
+                    eliminados.append(producto)
+            for venta in cambio["ventas"]:
+                self.ventas.registrar(venta)
+        return agregados, actualizados, eliminados, cambio["ventas"]
@@ -0,0 +1,233 @@
+import json
+import os
+from collections import deque
+
+from .archivos import escribir_atomico, iterar_arreglo_json
+from .historial import ResumenVentas
+
+POLITICAS_FSYNC = ("siempre", "cada_n", "nunca")
+# Lo que un registro del diario agrega a la venta: el stock en que dejó al producto
+CAMPOS_STOCK = ("codigo", "stock", "version")
+
+
+class DiarioVentas:
+    """Diario de ventas de solo anexado: una venta JSON por línea.
+
+    El historial completo vive en un snapshot (ventas.json) y cada venta nueva
+    se anexa al diario en O(1). Al cargar se reproduce el diario sobre el
+    snapshot y `compactar` lo vuelca de nuevo en el snapshot. Junto al snapshot
+    se guarda un resumen (cantidad, total, mínimo y máximo) para no tener que
+    leerlo al arrancar, y las `ultimas` ventas del snapshot, para sugerir
+    productos sin recorrerlo. Un registro puede traer además CAMPOS_STOCK,
+    para rehacer el stock después de un corte; al snapshot solo pasa la venta.
+    """
+
+    def __init__(self, archivo_snapshot, archivo_diario, fsync="siempre", fsync_cada=100,
+                 archivo_resumen=None, ultimas=5000):
+        if fsync not in POLITICAS_FSYNC:
+            raise ValueError(f"Política de fsync inválida: {fsync}")
+        self.archivo_snapshot = archivo_snapshot
+        self.archivo_diario = archivo_diario
+        self.archivo_resumen = archivo_resumen or os.path.splitext(archivo_snapshot)[0] + ".resumen.json"
+        self.fsync = fsync
+        self.fsync_cada = max(1, int(fsync_cada))
+        self.ultimas = ultimas
+        self.pendientes = 0
+        self._sin_sincronizar = 0
+        self._archivo = None
+
+    def leer_diario(self, con_stock=False):
+        """Ventas anexadas desde la última compactación (acotadas por el umbral de compactación).
+
+        Con `con_stock` se devuelven los registros tal cual, con CAMPOS_STOCK.
+        """
+        ventas = []
+        self.pendientes = 0
+        valido = 0
+        corrupto = False
+        try:
+            with open(self.archivo_diario, "rb") as f:
+                for linea in f:
+                    # Cada venta se escribe junto con su salto de línea: sin él,
+                    # la línea quedó a medio escribir
+                    if not linea.endswith(b"\n"):
+                        corrupto = True
+                        break
+                    if linea.strip():
+                        try:
+                            venta = json.loads(linea)
+                        except json.JSONDecodeError:
+                            corrupto = True
+                            break
+                        if not con_stock:
+                            for campo in CAMPOS_STOCK:
+                                venta.pop(campo, None)
+                        ventas.append(venta)
+                        self.pendientes += 1
+                    valido += len(linea)
+        except FileNotFoundError:
+            return ventas
+
+        if corrupto:
+            # Última línea a medio escribir por un corte: se descarta para que
+            # las próximas ventas no queden pegadas a ella
+            with open(self.archivo_diario, "r+b") as f:
+                f.truncate(valido)
+        return ventas
+
+    def leer_snapshot(self, tamano_bloque):
+        """Recorre el snapshot en bloques de ventas, sin cargarlo entero"""
+        try:
+            bloque = []
+            for venta in iterar_arreglo_json(self.archivo_snapshot):
+                bloque.append(venta)
+                if len(bloque) >= tamano_bloque:
+                    yield bloque
+                    bloque = []
+            if bloque:
+                yield bloque
+        except FileNotFoundError:
+            return
+
+    def resumen_snapshot(self):
+        """Agregados del snapshot, leídos del archivo de resumen si está al día"""
+        datos = self._leer_resumen()
+        if datos is None:
+            return self._recalcular_resumen()[0]
+        return ResumenVentas.desde_dict(datos)
+
+    def ultimas_snapshot(self):
+        """Las últimas ventas del snapshot (hasta `ultimas`), de la más vieja a la más nueva"""
+        datos = self._leer_resumen()
+        if datos is None or "ultimas" not in datos:
+            return self._recalcular_resumen()[1]
+        return datos["ultimas"]
+
+    def registrar_lote(self, ventas):
+        """Anexa varias ventas con una sola escritura y, a lo sumo, un fsync"""
+        if not ventas:
+            return
+        if self._archivo is None:
+            self._archivo = open(self.archivo_diario, "a")
+        self._archivo.write("".join(json.dumps(venta) + "\n" for venta in ventas))
+        self._archivo.flush()
+        self.pendientes += len(ventas)
+        self._sin_sincronizar += len(ventas)
+
+        if self.fsync == "siempre" or (
+            self.fsync == "cada_n" and self._sin_sincronizar >= self.fsync_cada
+        ):
+            self.sincronizar()
+
+    def sincronizar(self):
+        """Fuerza a disco las ventas anexadas desde el último fsync"""
+        if self._archivo is not None and self._sin_sincronizar:
+            os.fsync(self._archivo.fileno())
+        self._sin_sincronizar = 0
+
+    def compactar(self):
+        """Agrega las ventas del diario al snapshot y vacía el diario.
+
+        El snapshot no se vuelve a interpretar: se copia tal cual hasta su `]`
+        final y se le anexan las ventas del diario, así compactar no depende
+        de tener el historial en memoria.
+        """
+        self.cerrar()
+        resumen = self.resumen_snapshot()
+        ultimas = self.ultimas_snapshot()
+        ventas = self.leer_diario()
+        for venta in ventas:
+            resumen.agregar(venta)
+        ultimas = (ultimas + ventas)[-self.ultimas:] if self.ultimas else []
+
+        temporal = self.archivo_snapshot + ".tmp"
+        with open(temporal, "wb") as destino:
+            hay_ventas = self._copiar_sin_cierre(destino)
+            for venta in ventas:
+                destino.write((", " if hay_ventas else "").encode() + json.dumps(venta).encode())
+                hay_ventas = True
+            destino.write(b"]")
+            destino.flush()
+            os.fsync(destino.fileno())
+        os.replace(temporal, self.archivo_snapshot)
+        # El snapshot ya contiene el diario: se trunca justo después del rename
+        # para que un corte no reproduzca dos veces las mismas ventas.
+        open(self.archivo_diario, "w").close()
+        self.pendientes = 0
+        self._guardar_resumen(resumen, self._tamano_snapshot(), ultimas)
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self.sincronizar()
+            self._archivo.close()
+            self._archivo = None
+
+    def _tamano_snapshot(self):
+        try:
+            return os.path.getsize(self.archivo_snapshot)
+        except FileNotFoundError:
+            return None
+
+    def _leer_resumen(self):
+        """Contenido del archivo de resumen si corresponde al snapshot actual, o None"""
+        try:
+            with open(self.archivo_resumen, "r") as f:
+                datos = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not isinstance(datos, dict) or datos.get("bytes") != self._tamano_snapshot():
+            return None
+        return datos
+
+    def _recalcular_resumen(self):
+        """Resumen ausente o de otro snapshot: se recalcula una vez y se guarda. Devuelve (resumen, últimas)"""
+        tamano = self._tamano_snapshot()
+        resumen = ResumenVentas()
+        ultimas = deque(maxlen=self.ultimas or 0)
+        for bloque in self.leer_snapshot(10000):
+            for venta in bloque:
+                resumen.agregar(venta)
+            ultimas.extend(bloque)
+        ultimas = list(ultimas)
+        self._guardar_resumen(resumen, tamano, ultimas)
+        return resumen, ultimas
+
+    def _guardar_resumen(self, resumen, tamano, ultimas):
+        escribir_atomico(self.archivo_resumen, json.dumps(dict(resumen.a_dict(), bytes=tamano, ultimas=ultimas)))
+
+    def _copiar_sin_cierre(self, destino):
+        """Copia el snapshot sin su `]` final. Devuelve True si el arreglo tenía elementos"""
+        try:
+            origen = open(self.archivo_snapshot, "rb")
+        except FileNotFoundError:
+            destino.write(b"[")
+            return False
+
+        with origen:
+            origen.seek(0, os.SEEK_END)
+            cierre = origen.tell()
+            while cierre > 0:
+                origen.seek(cierre - 1)
+                if origen.read(1) == b"]":
+                    cierre -= 1
+                    break
+                cierre -= 1
+            else:
+                destino.write(b"[")
+                return False
+
+            origen.seek(0)
+            restante = cierre
+            hay_ventas = False
+            inicio = True
+            while restante:
+                bloque = origen.read(min(restante, 1 << 20))
+                restante -= len(bloque)
+                if inicio:
+                    # Hay ventas si después del `[` inicial aparece algo más que espacios
+                    hay_ventas = bool(bloque.strip()[1:])
+                    inicio = False
+                elif not hay_ventas:
+                    hay_ventas = bool(bloque.strip())
+                destino.write(bloque)
+            return hay_ventas
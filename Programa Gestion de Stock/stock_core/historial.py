@@ -0,0 +1,96 @@
+class ResumenVentas:
+    """Agregados del historial (cantidad, total, ticket mínimo/máximo), al día en O(1) por venta"""
+
+    def __init__(self, cantidad=0, total=0.0, minimo=None, maximo=None):
+        self.cantidad = cantidad
+        self.total = total
+        self.minimo = minimo
+        self.maximo = maximo
+
+    @property
+    def promedio(self):
+        return self.total / self.cantidad if self.cantidad else 0
+
+    def agregar(self, venta):
+        total = float(venta["total"])
+        self.cantidad += 1
+        self.total += total
+        self.minimo = total if self.minimo is None else min(self.minimo, total)
+        self.maximo = total if self.maximo is None else max(self.maximo, total)
+
+    def combinar(self, otro):
+        self.cantidad += otro.cantidad
+        self.total += otro.total
+        extremos = [v for v in (self.minimo, otro.minimo) if v is not None]
+        self.minimo = min(extremos) if extremos else None
+        extremos = [v for v in (self.maximo, otro.maximo) if v is not None]
+        self.maximo = max(extremos) if extremos else None
+
+    def a_dict(self):
+        return {"cantidad": self.cantidad, "total": self.total,
+                "minimo": self.minimo, "maximo": self.maximo}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        return cls(datos["cantidad"], datos["total"], datos["minimo"], datos["maximo"])
+
+
+class HistorialVentas:
+    """Historial de ventas que se lee del almacenamiento recién cuando se recorre.
+
+    Al arrancar solo se conoce el resumen. La primera vez que alguien recorre
+    el historial (pestaña de historial, análisis) se lee en bloques y queda en
+    memoria; las ventas registradas mientras tanto se agregan al final.
+    """
+
+    def __init__(self, resumen, leer_bloques, tamano_bloque=5000):
+        self.resumen = resumen
+        self.tamano_bloque = tamano_bloque
+        self._leer_bloques = leer_bloques
+        self._ventas = []
+        self._nuevas = []
+        self.cargada = False
+
+    def __len__(self):
+        return self.resumen.cantidad
+
+    def registrar(self, venta):
+        self.resumen.agregar(venta)
+        (self._ventas if self.cargada else self._nuevas).append(venta)
+
+    def bloques(self):
+        """Recorre el historial en bloques de `tamano_bloque`, leyéndolo la primera vez.
+
+        Las ventas registradas mientras se recorre llegan, una sola vez, en los últimos bloques.
+        """
+        if self.cargada:
+            # Como con las nuevas de abajo: el largo se mide en cada vuelta
+            inicio = 0
+            while inicio < len(self._ventas):
+                bloque = self._ventas[inicio:inicio + self.tamano_bloque]
+                inicio += len(bloque)
+                yield bloque
+            return
+
+        leidas = []
+        for bloque in self._leer_bloques(self.tamano_bloque):
+            leidas.extend(bloque)
+            yield bloque
+        # Las registradas mientras se leía; se mide en cada vuelta porque
+        # pueden seguir llegando entre bloque y bloque
+        inicio = 0
+        while inicio < len(self._nuevas):
+            bloque = self._nuevas[inicio:inicio + self.tamano_bloque]
+            inicio += len(bloque)
+            yield bloque
+        # Solo se da por cargado si se recorrió entero
+        self._ventas = leidas + self._nuevas
+        self._nuevas = []
+        self.cargada = True
+
+    def todas(self):
+        """Lista completa de ventas (la lee si todavía no se leyó)"""
+        if not self.cargada:
+            for _ in self.bloques():
+                pass
+        return self._ventas
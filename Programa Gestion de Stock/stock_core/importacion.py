@@ -0,0 +1,172 @@
+"""Importación masiva de productos desde un CSV, por ejemplo la lista de precios de un proveedor.
+
+El archivo se lee en bloques, sin cargarlo entero. Los bloques se validan
+en un pool de procesos (`validar_archivo`, que la interfaz corre en otro
+hilo) y los válidos se dan de alta o se actualizan todos juntos, con un
+solo guardado. Las filas con errores no detienen la
+importación: quedan en el resultado, que puede escribirse como reporte CSV.
+
+Columnas (la primera fila es el encabezado, en cualquier orden):
+    codigo, nombre, categoria, costo, precio, stock y, opcional, stock_minimo
+Sin stock_minimo, un producto existente conserva el suyo y uno nuevo toma el predeterminado.
+Se acepta ";" o tabulador como separador y coma decimal ("1500,50").
+"""
+import csv
+import math
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+COLUMNAS_OBLIGATORIAS = ("codigo", "nombre", "categoria", "costo", "precio", "stock")
+TAMANO_BLOQUE = 2000  # Filas por bloque de validación
+
+
+class ResultadoImportacion:
+    """Productos agregados y actualizados, y las filas rechazadas: (línea, código, error)"""
+
+    def __init__(self, agregados=(), actualizados=(), errores=()):
+        self.agregados = list(agregados)
+        self.actualizados = list(actualizados)
+        self.errores = list(errores)
+
+    def resumen(self):
+        texto = f"{len(self.agregados)} productos agregados y {len(self.actualizados)} actualizados"
+        if self.errores:
+            texto += f"; {len(self.errores)} filas con errores"
+        return texto
+
+    def escribir_reporte(self, archivo):
+        """Escribe las filas rechazadas como CSV (linea, codigo, error)"""
+        with open(archivo, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["linea", "codigo", "error"])
+            escritor.writerows(self.errores)
+
+
+def _numero(texto, campo, entero=False):
+    texto = texto.strip()
+    if "," in texto and "." not in texto:
+        texto = texto.replace(",", ".")
+    try:
+        valor = int(texto) if entero else float(texto)
+    except ValueError:
+        raise ValueError(f"{campo} no es un número válido: {texto!r}") from None
+    if not math.isfinite(valor) or valor < 0:
+        raise ValueError(f"{campo} debe ser un número mayor o igual a 0: {texto!r}")
+    return valor
+
+
+def validar_filas(filas):
+    """Valida un bloque de filas [(línea, dict)]. Devuelve (válidos [(línea, producto como dict)], errores).
+
+    Si la fila no trae stock_minimo, el dict no tiene esa clave.
+    Va a nivel de módulo para que el pool de procesos pueda ejecutarla.
+    """
+    productos, errores = [], []
+    for linea, fila in filas:
+        codigo = (fila.get("codigo") or "").strip()
+        try:
+            if not codigo:
+                raise ValueError("falta el código")
+            nombre = " ".join((fila.get("nombre") or "").split())
+            if not nombre:
+                raise ValueError("falta el nombre")
+            minimo = (fila.get("stock_minimo") or "").strip()
+            producto = {
+                "codigo": codigo,
+                "nombre": nombre,
+                "categoria": (fila.get("categoria") or "").strip(),
+                "costo": _numero(fila.get("costo") or "", "costo"),
+                "precio": _numero(fila.get("precio") or "", "precio"),
+                "stock": _numero(fila.get("stock") or "", "stock", entero=True)
+            }
+            if minimo:
+                producto["stock_minimo"] = _numero(minimo, "stock_minimo", entero=True)
+            productos.append((linea, producto))
+        except ValueError as error:
+            errores.append((linea, codigo, str(error)))
+    return productos, errores
+
+
+def leer_bloques(archivo, tamano_bloque=TAMANO_BLOQUE):
+    """Recorre el CSV en bloques de [(línea, dict)]; ValueError si faltan columnas"""
+    with open(archivo, newline="", encoding="utf-8-sig") as f:
+        try:
+            dialecto = csv.Sniffer().sniff(f.read(1 << 14), delimiters=",;\t")
+        except csv.Error:
+            dialecto = csv.excel
+        f.seek(0)
+        lector = csv.reader(f, dialecto)
+        encabezado = [columna.strip().casefold() for columna in next(lector, [])]
+        faltan = [columna for columna in COLUMNAS_OBLIGATORIAS if columna not in encabezado]
+        if faltan:
+            raise ValueError(f"Al archivo le faltan las columnas: {', '.join(faltan)}")
+
+        bloque = []
+        for valores in lector:
+            if not any(valor.strip() for valor in valores):
+                continue
+            bloque.append((lector.line_num, dict(zip(encabezado, valores))))
+            if len(bloque) >= tamano_bloque:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+
+
+def validar_bloques(bloques, procesos=None):
+    """Valida los bloques en orden, en paralelo si hay más de uno y más de un procesador"""
+    procesos = procesos or os.cpu_count() or 1
+    bloques = iter(bloques)
+    primeros = list(islice(bloques, 2))
+    if procesos == 1 or len(primeros) < 2:
+        yield from map(validar_filas, chain(primeros, bloques))
+        return
+
+    # No fork: con los hilos de autoguardado o del cliente en marcha puede colgarse. Con forkserver
+    # los procesos salen de un servidor limpio que importa el programa una sola vez; spawn (Windows)
+    # lo importa de nuevo en cada proceso
+    metodos = multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+    with ProcessPoolExecutor(procesos, mp_context=contexto) as pool:
+        # Se acota lo que está en vuelo: el archivo no se lee más rápido de lo que se valida
+        pendientes = deque()
+        for bloque in chain(primeros, bloques):
+            pendientes.append(pool.submit(validar_filas, bloque))
+            if len(pendientes) >= 2 * procesos:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+def validar_archivo(archivo, procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """Lee y valida el CSV. Devuelve (productos válidos como dicts, errores ordenados por línea).
+
+    Un código repetido dentro del archivo es un error de la fila posterior.
+    Es la parte lenta de importar y no toca el catálogo: puede correr en otro hilo.
+    """
+    validos = {}  # código -> (línea, producto)
+    errores = []
+    for productos, rechazados in validar_bloques(leer_bloques(archivo, tamano_bloque), procesos):
+        errores += rechazados
+        for linea, producto in productos:
+            anterior = validos.get(producto["codigo"])
+            if anterior is not None:
+                errores.append((linea, producto["codigo"], f"código repetido (ya está en la línea {anterior[0]})"))
+                continue
+            validos[producto["codigo"]] = (linea, producto)
+    errores.sort()
+    return [producto for _, producto in validos.values()], errores
+
+
+def importar_productos(motor, archivo, procesos=None, tamano_bloque=TAMANO_BLOQUE):
+    """Da de alta o actualiza en `motor` los productos del CSV. Devuelve un ResultadoImportacion.
+
+    Un código que ya está en el catálogo actualiza ese producto con los
+    campos del archivo (el stock del archivo reemplaza al actual).
+    """
+    productos, errores = validar_archivo(archivo, procesos, tamano_bloque)
+    agregados, actualizados = motor.importar_productos(productos)
+    return ResultadoImportacion(agregados, actualizados, errores)
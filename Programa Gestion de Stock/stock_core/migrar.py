@@ -0,0 +1,56 @@
+"""Importa los archivos JSON de la aplicación a una base SQLite.
+
+Uso (desde la carpeta del programa):
+    python -m stock_core.migrar --destino gestion_stock.db
+"""
+import argparse
+
+from .persistencia import Persistencia, PersistenciaJSON
+from .persistencia_sqlite import PersistenciaSQLite
+
+
+def migrar_json_a_sqlite(origen, destino):
+    """Copia colecciones, ventas y movimientos de stock de `origen` a `destino`, una transacción por colección"""
+    if not destino.vacia():
+        raise ValueError(f"La base {destino.archivo} ya tiene datos")
+
+    resumen = {}
+    for coleccion in Persistencia.COLECCIONES:
+        resumen[coleccion] = destino.importar(coleccion, origen.cargar(coleccion) or [])
+    ventas = (venta for bloque in origen.leer_ventas(10000) for venta in bloque)
+    resumen["ventas"] = destino.importar("ventas", ventas)
+    resumen["movimientos_stock"] = destino.importar("movimientos_stock", origen.leer_movimientos())
+    return resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migra los datos JSON a SQLite")
+    parser.add_argument("--destino", default="gestion_stock.db")
+    parser.add_argument("--usuarios", default="usuarios.json")
+    parser.add_argument("--productos", default="productos.json")
+    parser.add_argument("--proveedores", default="proveedores.json")
+    parser.add_argument("--ventas", default="ventas.json")
+    parser.add_argument("--diario-ventas", default="ventas.jsonl")
+    parser.add_argument("--movimientos", default="movimientos_stock.jsonl")
+    args = parser.parse_args(argv)
+
+    origen = PersistenciaJSON({
+        "usuarios": args.usuarios,
+        "productos": args.productos,
+        "proveedores": args.proveedores
+    }, args.ventas, args.diario_ventas, compactar_cada=None, archivo_movimientos=args.movimientos)
+    destino = PersistenciaSQLite(args.destino)
+    try:
+        resumen = migrar_json_a_sqlite(origen, destino)
+    except ValueError as error:
+        parser.error(str(error))
+    finally:
+        destino.cerrar()
+        origen.diario.cerrar()
+
+    for coleccion, cantidad in resumen.items():
+        print(f"{coleccion}: {cantidad} registros")
+
+
+if __name__ == "__main__":
+    main()
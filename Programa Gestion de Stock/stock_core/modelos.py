@@ -0,0 +1,71 @@
+import hashlib
+
+
+class Usuario:
+    __slots__ = ("usuario", "contrasena", "clave_recuperacion", "rol")
+
+    def __init__(self, usuario, contrasena, clave_recuperacion, rol="normal"):
+        self.usuario = usuario
+        self.contrasena = self._hash_contrasena(contrasena)
+        self.clave_recuperacion = clave_recuperacion
+        self.rol = rol.lower()
+
+    @staticmethod
+    def _hash_contrasena(contrasena):
+        return hashlib.sha256(contrasena.encode()).hexdigest()
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Usuario guardado: la contraseña ya viene hasheada y no se vuelve a hashear"""
+        usuario = cls.__new__(cls)
+        for campo in cls.__slots__:
+            setattr(usuario, campo, datos[campo])
+        return usuario
+
+
+class ConflictoVersion(ValueError):
+    """El stock cambió desde que se leyó: la operación no se aplicó y puede reintentarse"""
+
+    def __init__(self, mensaje, codigos=()):
+        super().__init__(mensaje)
+        self.codigos = list(codigos)
+
+
+class Producto:
+    # Sin __dict__ por instancia: con catálogos grandes es la mayor parte de la memoria
+    __slots__ = ("codigo", "nombre", "categoria", "costo", "precio", "stock", "stock_minimo", "version")
+
+    def __init__(self, codigo, nombre, categoria, costo, precio, stock, stock_minimo=5, version=0):
+        self.codigo = codigo
+        self.nombre = nombre
+        self.categoria = categoria
+        self.costo = float(costo)
+        self.precio = float(precio)
+        self.stock = int(stock)
+        self.stock_minimo = int(stock_minimo)
+        # Sube con cada cambio de stock: quien lo modifica indica qué versión leyó
+        self.version = int(version)
+
+    @property
+    def margen_ganancia(self):
+        if self.precio == 0:
+            return 0
+        return ((self.precio - self.costo) / self.precio) * 100
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+
+class Proveedor:
+    __slots__ = ("nombre", "telefono", "direccion")
+
+    def __init__(self, nombre, telefono, direccion):
+        self.nombre = nombre
+        self.telefono = telefono
+        self.direccion = direccion
+
+    def a_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
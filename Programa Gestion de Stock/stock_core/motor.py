@@ -0,0 +1,244 @@
+import threading
+from datetime import datetime
+
+from .autoguardado import Autoguardado
+from .carrito import Carrito
+from .catalogo import CatalogoProductos
+from .modelos import ConflictoVersion, Producto
+
+
+def ahora():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class MotorStock:
+    """Catálogo e historial de ventas con las operaciones que los modifican, sin interfaz.
+
+    Carga los datos de un backend de Persistencia y guarda los cambios con un
+    Autoguardado (`serializadores` agrega otras colecciones a ese guardado).
+    Las operaciones se hacen de a una, bajo un mismo lock, así pueden llamarse
+    desde varios hilos o desde el servidor de stock. Las que rechazan un
+    pedido (código inexistente, stock insuficiente) lanzan ValueError sin
+    haber cambiado nada.
+
+    El stock se cambia por compare-and-swap sobre la versión de cada
+    producto. Quien pasa la versión que leyó recibe ConflictoVersion si ya
+    no es la actual. Si el conflicto viene del almacenamiento (otro proceso
+    con la misma base SQLite vendió antes), se releen esos productos y se
+    reintenta hasta `reintentos` veces, volviendo a controlar el stock.
+
+    Cada cambio se avisa a los `oyentes` con un dict {"productos": [dicts],
+    "eliminados": [códigos], "ventas": [ventas]}, por ejemplo para reenviarlo
+    a otras terminales.
+    """
+
+    def __init__(self, persistencia, serializadores=None, ventana=0.5, reintentos=5):
+        self.persistencia = persistencia
+        self.reintentos = reintentos
+        self.reintentados = 0  # Conflictos del almacenamiento resueltos releyendo
+        self.productos = CatalogoProductos(
+            Producto(**p) for p in persistencia.cargar("productos") or [])
+        # Solo el resumen: las ventas se leen la primera vez que se recorre el historial
+        self.ventas = persistencia.abrir_historial()
+        self.oyentes = []
+        self._bloqueo = threading.RLock()
+        todos = {"productos": self._serializar_productos}
+        todos.update(serializadores or {})
+        self.autoguardado = Autoguardado(persistencia, todos, ventana=ventana)
+
+    def producto(self, codigo):
+        producto = self.productos.buscar(codigo)
+        if producto is None:
+            raise ValueError(f"No existe el producto {codigo}")
+        return producto
+
+    def vender(self, lineas):
+        """Vende las líneas de un ticket, todas juntas o ninguna. Devuelve las ventas.
+
+        Cada línea es (código, cantidad) o (código, cantidad, versión leída).
+        """
+        with self._bloqueo:
+            for linea in lineas:
+                if len(linea) > 2:
+                    self._controlar_version(self.producto(linea[0]), linea[2])
+            ventas, vendidos = self._reintentar(lambda: self._confirmar_ticket(lineas))
+            # Se marca recién con el stock ya descontado: un guardado que llegue antes no se lleva la marca
+            for producto in vendidos:
+                self._marcar(producto, ["stock", "version"])
+            for venta in ventas:
+                self.ventas.registrar(venta)
+            self._avisar(productos=vendidos, ventas=ventas)
+            return ventas
+
+    def ajustar_stock(self, codigo, incremento, motivo="ajuste", usuario=None, version=None):
+        """Suma `incremento` al stock y deja el movimiento. Devuelve el movimiento"""
+        with self._bloqueo:
+            if version is not None:
+                self._controlar_version(self.producto(codigo), version)
+            movimiento = self._reintentar(lambda: self._confirmar_ajuste(codigo, incremento, motivo, usuario))
+            self._avisar(productos=[self.producto(codigo)])
+            return movimiento
+
+    def fijar_stock_minimo(self, codigo, minimo):
+        minimo = int(minimo)
+        if minimo < 0:
+            raise ValueError("El stock mínimo no puede ser negativo")
+        with self._bloqueo:
+            producto = self.producto(codigo)
+            producto.stock_minimo = minimo
+            self._marcar(producto, ["stock_minimo"])
+            self._avisar(productos=[producto])
+            return producto
+
+    def agregar_producto(self, producto):
+        """Da de alta un Producto; ValueError si el código ya existe. Devuelve el producto guardado"""
+        with self._bloqueo:
+            self._reintentar(lambda: self._confirmar_alta(producto))
+            self._avisar(productos=[producto])
+            return producto
+
+    def importar_productos(self, registros):
+        """Alta o actualización de muchos productos (dicts) con un solo guardado.
+
+        Los códigos que ya están en el catálogo actualizan ese producto solo
+        en los campos que trae el registro (el stock incluido). Altas y actualizaciones se guardan en el momento,
+        juntas y con el mismo control de versión que una venta. Devuelve
+        (agregados, actualizados).
+        """
+        with self._bloqueo:
+            agregados, actualizados = self._reintentar(lambda: self._confirmar_importacion(registros))
+            if agregados or actualizados:
+                self.guardar()
+                self._avisar(productos=agregados + actualizados)
+            return agregados, actualizados
+
+    def eliminar_producto(self, codigo):
+        with self._bloqueo:
+            producto = self.producto(codigo)
+            self.productos.eliminar(producto)
+            self._marcar(producto)
+            self._avisar(eliminados=[codigo])
+            return producto
+
+    def ultimas_ventas(self, cantidad):
+        return self.persistencia.ultimas_ventas(cantidad)
+
+    def guardar(self):
+        """Escribe ya lo modificado, sin esperar al autoguardado"""
+        return self.autoguardado.vaciar()
+
+    def cerrar(self):
+        self.autoguardado.detener()
+        self.persistencia.cerrar()
+
+    def _confirmar_ticket(self, lineas):
+        carrito = Carrito(self.productos)
+        for codigo, cantidad, *_ in lineas:
+            carrito.agregar(self.producto(codigo), cantidad)
+        return carrito.confirmar(self.persistencia.registrar_ticket, ahora())
+
+    def _confirmar_alta(self, producto):
+        if producto.codigo in self.productos:
+            raise ValueError(f"El código {producto.codigo} ya existe")
+        producto.version = max(producto.version, self.persistencia.version_inicial(producto.codigo))
+        self.persistencia.registrar_productos({producto.codigo: (producto.a_dict(), None)})
+        self.productos.agregar(producto)
+        self._marcar(producto)
+
+    def _confirmar_importacion(self, registros):
+        nuevos = [Producto(**datos) for datos in registros if datos["codigo"] not in self.productos]
+        for producto in nuevos:
+            producto.version = max(producto.version, self.persistencia.version_inicial(producto.codigo))
+        existentes = [(datos, self.producto(datos["codigo"])) for datos in registros
+                      if datos["codigo"] in self.productos]
+        cambios = {producto.codigo: (producto.a_dict(), None) for producto in nuevos}
+        for datos, producto in existentes:
+            registro = Producto(**dict(producto.a_dict(), **datos)).a_dict()
+            cambios[producto.codigo] = (dict(registro, version=producto.version + 1), producto.version)
+        if cambios:
+            self.persistencia.registrar_productos(cambios)
+        for producto in nuevos:
+            self.productos.agregar(producto)
+        actualizados = [producto for _, producto in existentes]
+        for producto in actualizados:
+            self.productos.actualizar(producto, cambios[producto.codigo][0])
+        # Se marcan ya aplicados en memoria: un guardado que llegue antes no escribe los datos viejos
+        for producto in nuevos + actualizados:
+            self.persistencia.marcar("productos", producto.codigo)
+        return nuevos, actualizados
+
+    def _confirmar_ajuste(self, codigo, incremento, motivo, usuario):
+        producto = self.producto(codigo)
+        if producto.stock + incremento < 0:
+            raise ValueError(f"El stock de {producto.nombre} no puede quedar negativo")
+        movimiento = {
+            "fecha": ahora(),
+            "codigo": producto.codigo,
+            "producto": producto.nombre,
+            "cantidad": incremento,
+            "stock": producto.stock + incremento,
+            "usuario": usuario,
+            "motivo": motivo
+        }
+        self.persistencia.registrar_ajuste(movimiento, producto.version)
+        producto.stock += incremento
+        producto.version += 1
+        self._marcar(producto, ["stock", "version"])
+        return movimiento
+
+    def _controlar_version(self, producto, version):
+        if producto.version != version:
+            raise ConflictoVersion(f"El stock de {producto.nombre} cambió (versión {producto.version}, "
+                                   f"se esperaba {version})", [producto.codigo])
+
+    def _reintentar(self, operacion):
+        """Corre `operacion`; ante un conflicto del almacenamiento relee esos productos y la repite"""
+        for _ in range(self.reintentos):
+            try:
+                return operacion()
+            except ConflictoVersion as conflicto:
+                self.reintentados += 1
+                self._releer(conflicto.codigos)
+        return operacion()
+
+    def _releer(self, codigos):
+        """Trae de lo guardado el stock y la versión actuales de esos productos (o las altas de otro proceso)"""
+        actualizados, eliminados = [], []
+        for codigo in codigos:
+            producto = self.productos.buscar(codigo)
+            datos = self.persistencia.buscar_producto(codigo)
+            if producto is None:
+                if datos is not None:
+                    producto = Producto(**datos)
+                    self.productos.agregar(producto)
+                    actualizados.append(producto)
+                continue
+            if datos is None:
+                self.productos.eliminar(producto)
+                eliminados.append(codigo)
+                continue
+            producto.stock, producto.version = datos["stock"], datos["version"]
+            actualizados.append(producto)
+        if actualizados or eliminados:
+            self._avisar(productos=actualizados, eliminados=eliminados)
+
+    def _marcar(self, producto, campos=None):
+        self.persistencia.marcar("productos", producto.codigo, campos)
+        self.autoguardado.programar()
+
+    def _avisar(self, productos=(), eliminados=(), ventas=()):
+        if not self.oyentes:
+            return
+        cambio = {
+            "productos": [p.a_dict() for p in productos],
+            "eliminados": list(eliminados),
+            "ventas": list(ventas)
+        }
+        for oyente in self.oyentes:
+            oyente(cambio)
+
+    def _serializar_productos(self, claves=None):
+        # list() copia el catálogo de una vez: el autoguardado serializa en otro hilo
+        if claves is None:
+            return [p.a_dict() for p in list(self.productos)]
+        return [self.productos.buscar(c).a_dict() for c in claves if c in self.productos]
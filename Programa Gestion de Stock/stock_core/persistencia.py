@@ -0,0 +1,322 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from itertools import chain
+
+from .archivos import Bitacora, escribir_atomico
+from .diario import DiarioVentas
+from .historial import HistorialVentas
+
+
+class Persistencia:
+    """Base de los backends de almacenamiento: lleva la cuenta de lo modificado.
+
+    Se anotan las colecciones sucias y, cuando se conoce, la clave del registro
+    y los campos cambiados. Cada guardado deja un resumen con bytes escritos y
+    tiempo empleado. Las ventas y los movimientos de stock no pasan por aquí:
+    se registran en el momento, por ticket (registrar_ticket) o por ajuste.
+
+    `marcar` y `guardar` pueden llamarse desde hilos distintos (la interfaz
+    marca, el autoguardado escribe).
+    """
+
+    COLECCIONES = ("usuarios", "productos", "proveedores")
+
+    def __init__(self):
+        self.sucias = set()
+        self.completas = set()
+        self.registros_sucios = {nombre: {} for nombre in self.COLECCIONES}
+        self.ultimo_guardado = None
+        self._bloqueo = threading.Lock()
+
+    def marcar(self, coleccion, clave=None, campos=None):
+        """Marca como modificada una colección, uno de sus registros o algunos campos de él"""
+        if coleccion not in self.registros_sucios:
+            raise KeyError(f"Colección desconocida: {coleccion}")
+        with self._bloqueo:
+            self.sucias.add(coleccion)
+            if clave is None:
+                self.completas.add(coleccion)
+                return
+
+            registros = self.registros_sucios[coleccion]
+            if campos is None or (clave in registros and registros[clave] is None):
+                registros[clave] = None
+            else:
+                registros[clave] = registros.get(clave, set()) | set(campos)
+
+    @property
+    def pendiente(self):
+        """True si hay cambios marcados sin guardar"""
+        return bool(self.sucias)
+
+    def guardar(self, serializadores):
+        """Escribe lo que esté sucio.
+
+        `serializadores` asocia cada colección a una función `serializar(claves=None)`
+        que devuelve sus registros como dicts (solo los de `claves` si se indican).
+        Solo se invocan las de las colecciones sucias.
+        """
+        # Se toma lo sucio de una vez: lo que se marque mientras tanto queda
+        # para el próximo guardado
+        with self._bloqueo:
+            sucias, completas, registros = self.sucias, self.completas, self.registros_sucios
+            self.sucias, self.completas = set(), set()
+            self.registros_sucios = {nombre: {} for nombre in self.COLECCIONES}
+
+        inicio = time.perf_counter()
+        escritos = {}
+        try:
+            for coleccion in sorted(sucias):
+                cambios = None if coleccion in completas else registros[coleccion]
+                escritos[coleccion] = self._escribir(coleccion, serializadores[coleccion], cambios)
+        except Exception:
+            # Lo no escrito vuelve a quedar marcado como estaba, sin convertirse en una reescritura entera
+            with self._bloqueo:
+                for coleccion in sucias - set(escritos):
+                    self.sucias.add(coleccion)
+                    if coleccion in completas:
+                        self.completas.add(coleccion)
+                        continue
+                    pendientes = self.registros_sucios[coleccion]
+                    for clave, campos in registros[coleccion].items():
+                        if campos is None or (clave in pendientes and pendientes[clave] is None):
+                            pendientes[clave] = None
+                        else:
+                            pendientes[clave] = pendientes.get(clave, set()) | campos
+            raise
+
+        self.ultimo_guardado = {
+            "colecciones": escritos,
+            "bytes": sum(escritos.values()),
+            "segundos": time.perf_counter() - inicio
+        }
+        return self.ultimo_guardado
+
+    def cargar(self, coleccion):
+        """Devuelve los registros (dicts) de una colección, o None si no hay datos guardados"""
+        raise NotImplementedError
+
+    def abrir_historial(self, tamano_bloque=5000):
+        """Historial de ventas con su resumen; las ventas se leen recién al recorrerlo"""
+        return HistorialVentas(self.resumen_ventas(), self.leer_ventas, tamano_bloque)
+
+    def resumen_ventas(self):
+        """Agregados del historial guardado, sin leerlo entero"""
+        raise NotImplementedError
+
+    def leer_ventas(self, tamano_bloque):
+        """Recorre en bloques las ventas que había al tomar el resumen"""
+        raise NotImplementedError
+
+    def ultimas_ventas(self, cantidad):
+        """Hasta `cantidad` de las ventas más recientes, de la más vieja a la más nueva"""
+        raise NotImplementedError
+
+    def registrar_ticket(self, ventas, stocks):
+        """Guarda juntas las ventas de un ticket y el stock final de cada producto.
+
+        `stocks` es código -> (stock final, versión leída). Si lo guardado ya no
+        está en esa versión (lo cambió otro proceso) lanza ConflictoVersion sin
+        guardar nada.
+        """
+        raise NotImplementedError
+
+    def registrar_ajuste(self, movimiento, version):
+        """Guarda el stock final de un movimiento, con el mismo control de versión, y lo anota"""
+        raise NotImplementedError
+
+    def registrar_productos(self, productos):
+        """Guarda enteros productos, en el momento y con el mismo control de versión que el stock.
+
+        `productos` es código -> (registro, versión leída), con versión None
+        para un alta. Si alguno ya no está en esa versión (o, en un alta, otro
+        proceso ya lo dio de alta) lanza ConflictoVersion sin guardar nada.
+        """
+        raise NotImplementedError
+
+    def version_inicial(self, codigo):
+        """Versión con que se da de alta un producto con ese código"""
+        return 0
+
+    def registrar_movimiento(self, movimiento):
+        """Anota un movimiento de stock (fecha, codigo, producto, cantidad, stock, usuario, motivo)"""
+        raise NotImplementedError
+
+    def buscar_producto(self, codigo):
+        """Registro guardado de un producto (dict), o None"""
+        raise NotImplementedError
+
+    def leer_movimientos(self):
+        raise NotImplementedError
+
+    def cerrar(self):
+        pass
+
+    def _escribir(self, coleccion, serializar, cambios):
+        """Escribe una colección; `cambios` es None si hay que reescribirla entera. Devuelve bytes"""
+        raise NotImplementedError
+
+
+class PersistenciaJSON(Persistencia):
+    """Backend de archivos JSON (uno por colección) con diario de ventas y bitácora
+    de movimientos de stock, ambos de solo anexado.
+
+    Un archivo JSON no admite escrituras parciales: se reescribe la colección
+    entera, pero solo si algo en ella cambió.
+
+    El stock que deja una venta o un ajuste se anota con su versión en el
+    diario o en la bitácora, que se escriben en el momento; productos.json
+    lo recibe con el autoguardado. Si la aplicación se corta antes,
+    `cargar("productos")` lo rehace desde lo anotado. El diario se vacía al
+    compactar; de la bitácora, un archivo aparte recuerda hasta dónde ya se
+    aplicó, para no releerla entera en cada arranque.
+    """
+
+    def __init__(self, archivos, archivo_ventas, archivo_diario, fsync="siempre",
+                 compactar_cada=1000, indentar=(), archivo_movimientos="movimientos_stock.jsonl"):
+        super().__init__()
+        self.archivos = dict(archivos)
+        self.indentar = set(indentar)
+        self.compactar_cada = compactar_cada
+        self.diario = DiarioVentas(archivo_ventas, archivo_diario, fsync=fsync)
+        self.movimientos = Bitacora(archivo_movimientos, fsync=fsync != "nunca")
+        self.archivo_aplicados = os.path.splitext(archivo_movimientos)[0] + ".aplicados.json"
+        self._diario_inicial = None
+        self._registradas = deque(maxlen=self.diario.ultimas)  # Las de esta sesión, para ultimas_ventas
+        self._versiones = {}  # código -> versión más alta anotada en lo que puede rehacerse tras un corte
+
+    def cargar(self, coleccion):
+        registros = self._leer(coleccion)
+        if coleccion == "productos":
+            # Sin productos.json igual se recorre lo anotado, para conocer las versiones usadas
+            self._recuperar_stock(registros or [])
+        return registros
+
+    def resumen_ventas(self):
+        """Resumen guardado del snapshot más las ventas del diario (acotado por `compactar_cada`)"""
+        self._diario_inicial = self.diario.leer_diario()
+        if self.compactar_cada and self.diario.pendientes >= self.compactar_cada:
+            self.diario.compactar()
+            self._diario_inicial = []
+        resumen = self.diario.resumen_snapshot()
+        for venta in self._diario_inicial:
+            resumen.agregar(venta)
+        return resumen
+
+    def leer_ventas(self, tamano_bloque):
+        """Snapshot en bloques y después las ventas que ya estaban en el diario"""
+        if self._diario_inicial is None:
+            self._diario_inicial = self.diario.leer_diario()
+        yield from self.diario.leer_snapshot(tamano_bloque)
+        for inicio in range(0, len(self._diario_inicial), tamano_bloque):
+            yield self._diario_inicial[inicio:inicio + tamano_bloque]
+
+    def ultimas_ventas(self, cantidad):
+        """Las últimas del snapshot (guardadas con su resumen al compactar), las del diario leídas al
+        arrancar y las de esta sesión: recorrer el snapshot costaría lo que el resumen evita.
+        Alcanzan hasta `diario.ultimas`"""
+        if self._diario_inicial is None:
+            self._diario_inicial = self.diario.leer_diario()
+        ventas = self.diario.ultimas_snapshot() + self._diario_inicial + list(self._registradas)
+        return ventas[-cantidad:] if cantidad else []
+
+    def registrar_ticket(self, ventas, stocks):
+        """Las ventas van al diario en una sola escritura, cada una con el stock y la versión en
+        que deja a su producto. productos.json lo recibe con el autoguardado: el motor marca
+        los productos después de descontar el stock en memoria.
+
+        Los archivos tienen un solo dueño (la aplicación o el servidor de stock):
+        la versión se controla en memoria y aquí no hay conflictos posibles.
+        """
+        # El carrito arma ventas y stocks en el mismo orden, una por producto
+        self.diario.registrar_lote([dict(venta, codigo=codigo, stock=stock, version=version + 1)
+                                    for venta, (codigo, (stock, version)) in zip(ventas, stocks.items())])
+        self._registradas.extend(ventas)
+        for codigo, (_, version) in stocks.items():
+            self._anotar_version(codigo, version + 1)
+
+    def registrar_ajuste(self, movimiento, version):
+        """El movimiento se anota con la versión en que deja al producto: así se rehace tras un corte.
+        Como en una venta, el motor marca el producto después de cambiar el stock en memoria"""
+        self.movimientos.registrar(dict(movimiento, version=version + 1))
+        self._anotar_version(movimiento["codigo"], version + 1)
+
+    def registrar_productos(self, productos):
+        """Nada que escribir en el momento (un solo dueño: sin conflictos). Van a productos.json con
+        el autoguardado: el motor los marca enteros después de aplicarlos en memoria"""
+
+    def version_inicial(self, codigo):
+        """Más alta que cualquiera anotada para un producto anterior con el mismo código: si no,
+        tras un corte lo anotado para el producto eliminado pisaría el stock del nuevo"""
+        return self._versiones.get(codigo, -1) + 1
+
+    def registrar_movimiento(self, movimiento):
+        self.movimientos.registrar(movimiento)
+
+    def buscar_producto(self, codigo):
+        return next((p for p in self._leer("productos") or [] if p["codigo"] == codigo), None)
+
+    def leer_movimientos(self):
+        return self.movimientos.leer()
+
+    def cerrar(self):
+        if self.diario.pendientes:
+            self.diario.compactar()
+        self.diario.cerrar()
+        self.movimientos.cerrar()
+
+    def _escribir(self, coleccion, serializar, cambios):
+        sangria = 4 if coleccion in self.indentar else None
+        contenido = json.dumps(serializar(), indent=sangria)
+        escribir_atomico(self.archivos[coleccion], contenido)
+        return len(contenido.encode())
+
+    def _anotar_version(self, codigo, version):
+        self._versiones[codigo] = max(self._versiones.get(codigo, 0), version)
+
+    def _leer(self, coleccion):
+        try:
+            with open(self.archivos[coleccion], "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _recuperar_stock(self, productos):
+        """Aplica a `productos` el stock anotado con una versión más nueva que la guardada.
+
+        Cada registro lleva el stock y la versión en que dejó al producto: gana
+        el de versión más alta. Si algo cambió, productos.json se reescribe
+        antes de dar por aplicada la bitácora hasta su final. Las versiones
+        anotadas quedan para `version_inicial`.
+        """
+        try:
+            with open(self.archivo_aplicados, "r") as f:
+                desde = json.load(f)["bytes"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            desde = 0
+        hasta = self.movimientos.tamano()
+        if desde > hasta:
+            desde = 0  # La bitácora es otra (se borró o se reemplazó)
+
+        anotados = {}  # código -> (versión, stock)
+        for registro in chain(self.diario.leer_diario(con_stock=True), self.movimientos.leer(desde)):
+            if "version" in registro and registro["version"] > anotados.get(registro["codigo"], (-1,))[0]:
+                anotados[registro["codigo"]] = (registro["version"], registro["stock"])
+
+        for codigo, (version, _) in anotados.items():
+            self._anotar_version(codigo, version)
+
+        recuperados = 0
+        for producto in productos:
+            anotado = anotados.get(producto["codigo"])
+            if anotado is not None and anotado[0] > producto.get("version", 0):
+                producto["version"], producto["stock"] = anotado
+                recuperados += 1
+        if recuperados:
+            self._escribir("productos", lambda: productos, None)
+        if hasta != desde:
+            escribir_atomico(self.archivo_aplicados, json.dumps({"bytes": hasta}))
+        return recuperados
@@ -0,0 +1,323 @@
+import json
+import sqlite3
+import threading
+
+from .catalogo import normalizar_nombre
+from .historial import ResumenVentas
+from .modelos import ConflictoVersion
+from .persistencia import Persistencia
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    usuario TEXT PRIMARY KEY,
+    contrasena TEXT NOT NULL,
+    clave_recuperacion TEXT,
+    rol TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS productos (
+    codigo TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nombre_clave TEXT NOT NULL,
+    categoria TEXT,
+    costo REAL NOT NULL,
+    precio REAL NOT NULL,
+    stock INTEGER NOT NULL,
+    stock_minimo INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_productos_nombre_clave ON productos (nombre_clave);
+CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos (categoria);
+CREATE TABLE IF NOT EXISTS proveedores (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    telefono TEXT,
+    direccion TEXT
+);
+CREATE TABLE IF NOT EXISTS ventas (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    producto TEXT NOT NULL,
+    cantidad INTEGER NOT NULL,
+    total REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha);
+CREATE TABLE IF NOT EXISTS movimientos_stock (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    codigo TEXT NOT NULL,
+    producto TEXT,
+    cantidad INTEGER NOT NULL,
+    stock INTEGER NOT NULL,
+    usuario TEXT,
+    motivo TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_movimientos_codigo ON movimientos_stock (codigo);
+CREATE TABLE IF NOT EXISTS resumen_ventas (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    cantidad INTEGER NOT NULL,
+    total REAL NOT NULL,
+    minimo REAL,
+    maximo REAL
+);
+CREATE TRIGGER IF NOT EXISTS ventas_al_resumen AFTER INSERT ON ventas BEGIN
+    UPDATE resumen_ventas SET
+        cantidad = cantidad + 1,
+        total = total + NEW.total,
+        minimo = CASE WHEN minimo IS NULL OR NEW.total < minimo THEN NEW.total ELSE minimo END,
+        maximo = CASE WHEN maximo IS NULL OR NEW.total > maximo THEN NEW.total ELSE maximo END
+    WHERE id = 1;
+END;
+"""
+
+# Columnas de cada colección tal como aparecen en los dicts de los modelos
+COLUMNAS = {
+    "usuarios": ("usuario", "contrasena", "clave_recuperacion", "rol"),
+    "productos": ("codigo", "nombre", "categoria", "costo", "precio", "stock", "stock_minimo", "version"),
+    "proveedores": ("nombre", "telefono", "direccion"),
+    "ventas": ("fecha", "producto", "cantidad", "total"),
+    "movimientos_stock": ("fecha", "codigo", "producto", "cantidad", "stock", "usuario", "motivo")
+}
+CLAVES = {"usuarios": "usuario", "productos": "codigo", "proveedores": None}
+# Tablas de solo anexado: cada registro es una fila nueva con id autoincremental
+ANEXADAS = ("ventas", "movimientos_stock")
+# Compare-and-swap del stock: solo se escribe si nadie lo cambió desde que se leyó
+ACTUALIZAR_STOCK = "UPDATE productos SET stock = ?, version = version + 1 WHERE codigo = ? AND version = ?"
+# Lo mismo para el registro entero (por ejemplo, al importar una lista de precios)
+ACTUALIZAR_PRODUCTO = ("UPDATE productos SET nombre = ?, nombre_clave = ?, categoria = ?, costo = ?, precio = ?, "
+                       "stock = ?, stock_minimo = ?, version = version + 1 WHERE codigo = ? AND version = ?")
+# Campos de un producto que escribe el autoguardado: el stock y la versión solo cambian por compare-and-swap
+DATOS_PRODUCTO = ("nombre", "nombre_clave", "categoria", "costo", "precio", "stock_minimo")
+
+
+class PersistenciaSQLite(Persistencia):
+    """Backend sqlite3 con índices por código, nombre normalizado, categoría y fecha de venta.
+
+    Los cambios marcados por registro se escriben fila a fila. El stock no
+    espera al autoguardado: ventas y ajustes lo escriben en el momento con
+    ACTUALIZAR_STOCK, que falla si otro proceso con la misma base lo cambió
+    antes; las altas y los registros enteros, con `registrar_productos`. Por
+    eso el autoguardado nunca escribe el stock ni la versión de un producto
+    que ya está en la base. La conexión se comparte entre la interfaz y el hilo de
+    autoguardado, así que todo acceso pasa por un bloqueo.
+    """
+
+    def __init__(self, archivo):
+        super().__init__()
+        self.archivo = archivo
+        self.conexion = sqlite3.connect(archivo, check_same_thread=False)
+        self._bloqueo_conexion = threading.RLock()
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        columnas_resumen = [fila[1] for fila in self.conexion.execute("PRAGMA table_info(resumen_ventas)")]
+        if columnas_resumen and "minimo" not in columnas_resumen:
+            # Base de antes de guardar mínimo/máximo: el resumen se rehace desde las ventas
+            self.conexion.executescript(
+                "DROP TRIGGER IF EXISTS ventas_al_resumen; DROP TABLE resumen_ventas;")
+        columnas_productos = [fila[1] for fila in self.conexion.execute("PRAGMA table_info(productos)")]
+        if columnas_productos and "version" not in columnas_productos:
+            self.conexion.execute("ALTER TABLE productos ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self.conexion.executescript(ESQUEMA)
+        self._ultima_venta = 0
+        with self.conexion:
+            if not self.conexion.execute("SELECT 1 FROM resumen_ventas").fetchone():
+                self.conexion.execute(
+                    "INSERT INTO resumen_ventas "
+                    "SELECT 1, COUNT(*), COALESCE(SUM(total), 0), MIN(total), MAX(total) FROM ventas")
+
+    def cargar(self, coleccion):
+        with self._bloqueo_conexion:
+            columnas = COLUMNAS[coleccion]
+            orden = "id" if coleccion == "proveedores" else "rowid"
+            filas = self.conexion.execute(
+                f"SELECT {', '.join(columnas)} FROM {coleccion} ORDER BY {orden}").fetchall()
+            return [dict(fila) for fila in filas] or None
+
+    def resumen_ventas(self):
+        """Resumen mantenido por trigger en cada INSERT: no recorre la tabla de ventas"""
+        with self._bloqueo_conexion:
+            fila = self.conexion.execute(
+                "SELECT cantidad, total, minimo, maximo FROM resumen_ventas WHERE id = 1").fetchone()
+            self._ultima_venta = self.conexion.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM ventas").fetchone()[0]
+        return ResumenVentas(*fila)
+
+    def leer_ventas(self, tamano_bloque):
+        desde = 0
+        hasta = self._ultima_venta
+        while True:
+            with self._bloqueo_conexion:
+                filas = self.conexion.execute(
+                    f"SELECT id, {', '.join(COLUMNAS['ventas'])} FROM ventas "
+                    "WHERE id > ? AND id <= ? ORDER BY id LIMIT ?", (desde, hasta, tamano_bloque)).fetchall()
+            if not filas:
+                return
+            desde = filas[-1]["id"]
+            yield [{c: fila[c] for c in COLUMNAS["ventas"]} for fila in filas]
+
+    def ultimas_ventas(self, cantidad):
+        columnas = ", ".join(COLUMNAS["ventas"])
+        with self._bloqueo_conexion:
+            filas = self.conexion.execute(
+                f"SELECT {columnas} FROM ventas ORDER BY id DESC LIMIT ?", (cantidad,)).fetchall()
+        return [{c: fila[c] for c in COLUMNAS["ventas"]} for fila in reversed(filas)]
+
+    def registrar_ticket(self, ventas, stocks):
+        """Ventas y stock final en una sola transacción: se guarda el ticket entero o nada"""
+        with self._bloqueo_conexion, self.conexion:
+            self._actualizar_stocks(stocks)
+            self.conexion.executemany(self._anexado("ventas"),
+                                      ([v[c] for c in COLUMNAS["ventas"]] for v in ventas))
+
+    def registrar_ajuste(self, movimiento, version):
+        with self._bloqueo_conexion, self.conexion:
+            self._actualizar_stocks({movimiento["codigo"]: (movimiento["stock"], version)})
+            self.conexion.execute(self._anexado("movimientos_stock"),
+                                  [movimiento.get(c) for c in COLUMNAS["movimientos_stock"]])
+
+    def registrar_productos(self, productos):
+        """Registros enteros con compare-and-swap de la versión, en una sola transacción"""
+        alta, columnas = self._insercion("productos", "ON CONFLICT (codigo) DO NOTHING")
+        with self._bloqueo_conexion, self.conexion:
+            conflictos = []
+            for codigo, (p, version) in productos.items():
+                if version is None:
+                    cursor = self.conexion.execute(alta, self._fila("productos", p, columnas))
+                else:
+                    cursor = self.conexion.execute(ACTUALIZAR_PRODUCTO, (
+                        p["nombre"], normalizar_nombre(p["nombre"]), p["categoria"], p["costo"], p["precio"],
+                        p["stock"], p["stock_minimo"], codigo, version))
+                if cursor.rowcount == 0:
+                    conflictos.append(codigo)
+            if conflictos:
+                raise ConflictoVersion(f"Otro proceso cambió {', '.join(conflictos)}", conflictos)
+
+    def registrar_movimiento(self, movimiento):
+        with self._bloqueo_conexion, self.conexion:
+            self.conexion.execute(self._anexado("movimientos_stock"),
+                                  [movimiento.get(c) for c in COLUMNAS["movimientos_stock"]])
+
+    def leer_movimientos(self):
+        with self._bloqueo_conexion:
+            filas = self.conexion.execute(
+                f"SELECT {', '.join(COLUMNAS['movimientos_stock'])} FROM movimientos_stock ORDER BY id").fetchall()
+        return [dict(fila) for fila in filas]
+
+    def buscar_producto(self, codigo):
+        with self._bloqueo_conexion:
+            fila = self.conexion.execute(
+                "SELECT * FROM productos WHERE codigo = ?", (codigo,)).fetchone()
+            return self._producto(fila)
+
+    def ventas_entre(self, desde=None, hasta=None):
+        """Ventas con `desde <= fecha <= hasta` por el índice de fecha (fechas comparables como texto)"""
+        with self._bloqueo_conexion:
+            filas = self.conexion.execute(
+                f"SELECT {', '.join(COLUMNAS['ventas'])} FROM ventas "
+                "WHERE fecha BETWEEN ? AND ? ORDER BY fecha, id", (desde or "", hasta or "~")).fetchall()
+            return [dict(fila) for fila in filas]
+
+    def vacia(self):
+        """True si la base no tiene datos en ninguna tabla"""
+        with self._bloqueo_conexion:
+            return not any(
+                self.conexion.execute(f"SELECT 1 FROM {tabla} LIMIT 1").fetchone()
+                for tabla in COLUMNAS)
+
+    def importar(self, coleccion, registros):
+        """Inserta registros en bloque dentro de una sola transacción. Devuelve cuántos se insertaron"""
+        if coleccion in ANEXADAS:
+            sql = self._anexado(coleccion)
+            filas = ([r.get(c) for c in COLUMNAS[coleccion]] for r in registros)
+        else:
+            sql, columnas = self._insercion(coleccion)
+            filas = (self._fila(coleccion, r, columnas) for r in registros)
+        with self._bloqueo_conexion, self.conexion:
+            cursor = self.conexion.executemany(sql, filas)
+        return cursor.rowcount
+
+    def cerrar(self):
+        with self._bloqueo_conexion:
+            self.conexion.close()
+
+    def _actualizar_stocks(self, stocks):
+        """Dentro de una transacción: si algún producto cambió de versión, la excepción la deshace"""
+        conflictos = [codigo for codigo, (stock, version) in stocks.items()
+                      if self.conexion.execute(ACTUALIZAR_STOCK, (stock, codigo, version)).rowcount == 0]
+        if conflictos:
+            raise ConflictoVersion(f"Otro proceso cambió el stock de {', '.join(conflictos)}", conflictos)
+
+    def _producto(self, fila):
+        if fila is None:
+            return None
+        producto = dict(fila)
+        del producto["nombre_clave"]
+        return producto
+
+    def _anexado(self, tabla):
+        columnas = COLUMNAS[tabla]
+        return f"INSERT INTO {tabla} ({', '.join(columnas)}) VALUES ({', '.join('?' for _ in columnas)})"
+
+    def _insercion(self, coleccion, si_existe=None):
+        """INSERT de registros enteros; si no se indica `si_existe`, reemplaza el registro"""
+        columnas = COLUMNAS[coleccion] + (("nombre_clave",) if coleccion == "productos" else ())
+        marcas = ", ".join("?" for _ in columnas)
+        if si_existe is None:
+            return f"INSERT OR REPLACE INTO {coleccion} ({', '.join(columnas)}) VALUES ({marcas})", columnas
+        return f"INSERT INTO {coleccion} ({', '.join(columnas)}) VALUES ({marcas}) {si_existe}", columnas
+
+    def _fila(self, coleccion, registro, columnas):
+        if coleccion == "productos":
+            registro = dict(registro, nombre_clave=normalizar_nombre(registro["nombre"]),
+                            version=registro.get("version", 0))
+        return [registro.get(c) for c in columnas]
+
+    def _escribir(self, coleccion, serializar, cambios):
+        clave = CLAVES[coleccion]
+        if coleccion == "productos":
+            # Un producto que ya está se actualiza sin tocar stock ni versión: guardar lo que hay
+            # en memoria podría pisar una venta de otro proceso o volver atrás su versión
+            sql, columnas = self._insercion(coleccion, "ON CONFLICT (codigo) DO UPDATE SET " + ", ".join(
+                f"{c} = excluded.{c}" for c in DATOS_PRODUCTO))
+        else:
+            sql, columnas = self._insercion(coleccion)
+        escritos = 0
+        with self._bloqueo_conexion, self.conexion:
+            if cambios is None or clave is None:
+                registros = serializar()
+                if coleccion == "productos":
+                    codigos = {r["codigo"] for r in registros}
+                    self.conexion.executemany("DELETE FROM productos WHERE codigo = ?", (
+                        (c,) for (c,) in self.conexion.execute("SELECT codigo FROM productos").fetchall()
+                        if c not in codigos))
+                else:
+                    self.conexion.execute(f"DELETE FROM {coleccion}")
+                self.conexion.executemany(sql, (self._fila(coleccion, r, columnas) for r in registros))
+                return sum(len(json.dumps(r)) for r in registros)
+
+            registros = {r[clave]: r for r in serializar(cambios.keys())}
+            completos = []  # Altas y registros enteros: van juntos en un executemany
+            for valor_clave, campos in cambios.items():
+                registro = registros.get(valor_clave)
+                if registro is None:
+                    self.conexion.execute(f"DELETE FROM {coleccion} WHERE {clave} = ?", (valor_clave,))
+                    continue
+                if campos is None:
+                    completos.append(self._fila(coleccion, registro, columnas))
+                    escritos += len(json.dumps(registro))
+                    continue
+
+                campos = sorted(campos)
+                if coleccion == "productos":
+                    campos = [c for c in campos if c in DATOS_PRODUCTO]  # El stock ya se escribió
+                    if not campos:
+                        continue
+                valores = [registro[c] for c in campos]
+                if coleccion == "productos" and "nombre" in campos:
+                    campos.append("nombre_clave")
+                    valores.append(normalizar_nombre(registro["nombre"]))
+                asignaciones = ", ".join(f"{c} = ?" for c in campos)
+                self.conexion.execute(
+                    f"UPDATE {coleccion} SET {asignaciones} WHERE {clave} = ?", valores + [valor_clave])
+                escritos += len(json.dumps(valores))
+            self.conexion.executemany(sql, completos)
+        return escritos
@@ -0,0 +1,161 @@
+"""Servidor de stock: varias terminales (cajas) sobre un mismo catálogo e historial.
+
+Un solo proceso es dueño de los datos y del almacenamiento; las terminales
+se conectan por TCP local o por socket Unix y le piden las operaciones de
+MotorStock. El bucle de asyncio atiende los pedidos de a uno, de principio a
+fin, así dos cajas no pueden pisarse el stock. Cada cambio se reenvía a las
+demás terminales para que mantengan su copia del catálogo al día.
+
+Protocolo: un mensaje JSON por línea.
+    pedido:    {"id": 1, "op": "vender", "args": {"lineas": [["A1", 2]]}}
+    respuesta: {"id": 1, "ok": true, "resultado": ..., "cambio": {...}}
+               {"id": 1, "ok": false, "rechazo": true, "error": "No hay suficiente stock..."}
+               {"id": 1, "ok": false, "rechazo": true, "conflicto": true, "error": "El stock de ... cambió"}
+    aviso:     {"cambio": {"productos": [...], "eliminados": [...], "ventas": [...]}}
+
+Uso (desde la carpeta del programa):
+    python -m stock_core.servidor --puerto 8765
+    python -m stock_core.servidor --unix /tmp/gestion_stock.sock --sqlite gestion_stock.db
+"""
+import argparse
+import asyncio
+import json
+import signal
+import sys
+
+from .modelos import ConflictoVersion, Producto
+from .motor import MotorStock
+from .tienda import abrir_persistencia, agregar_argumentos_almacenamiento
+
+LIMITE_LINEA = 2 ** 20  # Bytes máximos de un pedido
+
+
+def _estado(motor):
+    return {"productos": [p.a_dict() for p in motor.productos],
+            "resumen": motor.ventas.resumen.a_dict()}
+
+
+OPERACIONES = {
+    "estado": _estado,
+    "ventas": lambda motor, desde, hasta: motor.ventas.todas()[desde:hasta],
+    "ultimas_ventas": lambda motor, cantidad: motor.ultimas_ventas(cantidad),
+    "vender": lambda motor, lineas: motor.vender(lineas),
+    "ajustar_stock": lambda motor, codigo, incremento, motivo="ajuste", usuario=None, version=None:
+        motor.ajustar_stock(codigo, incremento, motivo, usuario, version),
+    "fijar_stock_minimo": lambda motor, codigo, minimo: motor.fijar_stock_minimo(codigo, minimo).a_dict(),
+    "agregar_producto": lambda motor, producto: motor.agregar_producto(Producto(**producto)).a_dict(),
+    "eliminar_producto": lambda motor, codigo: motor.eliminar_producto(codigo).codigo,
+    "importar_productos": lambda motor, productos:
+        [[p.codigo for p in importados] for importados in motor.importar_productos(productos)],
+}
+
+
+class ServidorStock:
+    """Atiende las conexiones de las terminales sobre un MotorStock"""
+
+    def __init__(self, motor):
+        self.motor = motor
+        self.terminales = set()
+        self.atendidos = 0
+        self._origen = None
+        self._cambio_propio = None
+        motor.oyentes.append(self._difundir)
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                writer.write(self.responder(linea, writer))
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.terminales.discard(writer)
+            writer.close()
+
+    def responder(self, linea, writer):
+        """Ejecuta un pedido completo, sin ceder el bucle a otra terminal en el medio"""
+        try:
+            pedido = json.loads(linea)
+            identificador = pedido["id"]
+            operacion = OPERACIONES[pedido["op"]]
+        except (ValueError, KeyError, TypeError):
+            return _linea({"id": None, "ok": False, "rechazo": True, "error": "Pedido inválido"})
+
+        self._origen, self._cambio_propio = writer, None
+        try:
+            resultado = operacion(self.motor, **pedido.get("args", {}))
+            respuesta = {"id": identificador, "ok": True, "resultado": resultado}
+            if self._cambio_propio is not None:
+                respuesta["cambio"] = self._cambio_propio
+        except (ValueError, TypeError) as error:
+            respuesta = {"id": identificador, "ok": False, "rechazo": True, "error": str(error)}
+            if isinstance(error, ConflictoVersion):
+                respuesta.update(conflicto=True, codigos=error.codigos)
+        except Exception as error:
+            respuesta = {"id": identificador, "ok": False, "error": f"{type(error).__name__}: {error}"}
+        finally:
+            self._origen = None
+        self.atendidos += 1
+        if pedido["op"] == "estado":
+            # Recién ahora recibe avisos: todo lo anterior ya viene en el estado
+            self.terminales.add(writer)
+        return _linea(respuesta)
+
+    def _difundir(self, cambio):
+        """Oyente del motor: el cambio va en la respuesta a quien lo pidió y como aviso a las demás"""
+        if self._cambio_propio is None:
+            self._cambio_propio = cambio
+        else:  # Un pedido que releyó productos antes de reintentar avisa más de una vez
+            self._cambio_propio = {clave: valores + cambio[clave] for clave, valores in self._cambio_propio.items()}
+        aviso = _linea({"cambio": cambio})
+        for terminal in self.terminales:
+            if terminal is not self._origen and not terminal.is_closing():
+                terminal.write(aviso)
+
+
+def _linea(mensaje):
+    return (json.dumps(mensaje) + "\n").encode()
+
+
+async def servir(servidor, host="127.0.0.1", puerto=8765, unix=None, al_iniciar=None):
+    if unix:
+        escucha = await asyncio.start_unix_server(servidor.atender, path=unix, limit=LIMITE_LINEA)
+    else:
+        escucha = await asyncio.start_server(servidor.atender, host, puerto, limit=LIMITE_LINEA)
+    if al_iniciar is not None:
+        al_iniciar(escucha)
+    async with escucha:
+        await escucha.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de stock para varias terminales")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--unix", help="Escuchar en un socket Unix en lugar de TCP")
+    agregar_argumentos_almacenamiento(parser)
+    args = parser.parse_args(argv)
+
+    motor = MotorStock(abrir_persistencia(args))
+    motor.autoguardado.al_fallar = lambda error: print(f"No se pudo guardar: {error}", file=sys.stderr)
+    servidor = ServidorStock(motor)
+
+    def al_iniciar(escucha):
+        direcciones = ", ".join(str(s.getsockname()) for s in escucha.sockets)
+        print(f"Servidor de stock en {direcciones} ({len(motor.productos)} productos)")
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # Detenerlo con kill también guarda
+    try:
+        asyncio.run(servir(servidor, args.host, args.puerto, args.unix, al_iniciar))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        motor.cerrar()
+        print(f"Servidor detenido; {servidor.atendidos} pedidos atendidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from array import array
+
+from .modelos import Producto
+
+
+class TablaProductos:
+    """Catálogo en columnas: textos en listas y números en arrays compactos.
+
+    Ocupa una fracción de lo que ocupan los objetos Producto (un float de un
+    array('d') son 8 bytes, no un objeto de 24 más el puntero). Pensada para
+    catálogos muy grandes que se recorren por columna (análisis, reportes).
+    Las bajas mueven la última fila al hueco, así que el orden no se conserva.
+    """
+
+    def __init__(self, productos=()):
+        self.codigos = []
+        self.nombres = []
+        self.categorias = []
+        self.costos = array("d")
+        self.precios = array("d")
+        self.stocks = array("l")
+        self.stocks_minimos = array("l")
+        self.versiones = array("l")
+        self._filas = {}
+        for producto in productos:
+            self.agregar(producto)
+
+    @classmethod
+    def desde_registros(cls, registros):
+        """Arma la tabla directamente desde los dicts del JSON, sin crear objetos Producto"""
+        tabla = cls()
+        for r in registros:
+            tabla._agregar_fila(r["codigo"], r["nombre"], r["categoria"], r["costo"],
+                                r["precio"], r["stock"], r.get("stock_minimo", 5), r.get("version", 0))
+        return tabla
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __contains__(self, codigo):
+        return codigo in self._filas
+
+    def agregar(self, producto):
+        self._agregar_fila(producto.codigo, producto.nombre, producto.categoria, producto.costo,
+                           producto.precio, producto.stock, producto.stock_minimo, producto.version)
+
+    def eliminar(self, codigo):
+        fila = self._filas.pop(codigo)
+        ultima = len(self.codigos) - 1
+        for columna in self._columnas():
+            columna[fila] = columna[ultima]
+            columna.pop()
+        if fila != ultima:
+            self._filas[self.codigos[fila]] = fila
+
+    def fila(self, codigo):
+        """Índice de fila de un código, o None"""
+        return self._filas.get(codigo)
+
+    def producto(self, fila):
+        """Materializa una fila como Producto (copia: modificarlo no cambia la tabla)"""
+        return Producto(self.codigos[fila], self.nombres[fila], self.categorias[fila],
+                        self.costos[fila], self.precios[fila], self.stocks[fila],
+                        self.stocks_minimos[fila], self.versiones[fila])
+
+    def margen_ganancia(self, fila):
+        precio = self.precios[fila]
+        if precio == 0:
+            return 0
+        return ((precio - self.costos[fila]) / precio) * 100
+
+    def margenes(self):
+        return [0 if precio == 0 else ((precio - costo) / precio) * 100
+                for costo, precio in zip(self.costos, self.precios)]
+
+    def ajustar_stock(self, fila, incremento):
+        nuevo_stock = self.stocks[fila] + incremento
+        if nuevo_stock < 0:
+            return False
+        self.stocks[fila] = nuevo_stock
+        self.versiones[fila] += 1
+        return True
+
+    def a_registros(self):
+        return [self.producto(fila).a_dict() for fila in range(len(self))]
+
+    def _agregar_fila(self, codigo, nombre, categoria, costo, precio, stock, stock_minimo, version=0):
+        if codigo in self._filas:
+            raise ValueError(f"El código {codigo} ya existe")
+        self._filas[codigo] = len(self.codigos)
+        self.codigos.append(codigo)
+        self.nombres.append(nombre)
+        self.categorias.append(categoria)
+        self.costos.append(float(costo))
+        self.precios.append(float(precio))
+        self.stocks.append(int(stock))
+        self.stocks_minimos.append(int(stock_minimo))
+        self.versiones.append(int(version))
+
+    def _columnas(self):
+        return (self.codigos, self.nombres, self.categorias, self.costos,
+                self.precios, self.stocks, self.stocks_minimos, self.versiones)
@@ -0,0 +1,156 @@
+from .analisis import analizar_margenes
+from .autoguardado import Autoguardado
+from .cliente import ClienteStock
+from .diario import POLITICAS_FSYNC
+from .importacion import importar_productos
+from .modelos import Proveedor, Usuario
+from .motor import MotorStock
+from .persistencia import PersistenciaJSON
+from .persistencia_sqlite import PersistenciaSQLite
+
+ROLES = ("normal", "admin", "super")
+
+
+def usuarios_predeterminados():
+    return [
+        Usuario("super", "admin123", "clave_super", "super"),
+        Usuario("admin", "admin123", "clave_admin", "admin"),
+        Usuario("usuario", "user123", "clave_usuario", "normal")
+    ]
+
+
+def agregar_argumentos_almacenamiento(parser, fsync="siempre"):
+    """Opciones de línea de comandos para elegir los archivos JSON o la base SQLite"""
+    parser.add_argument("--sqlite", help="Base SQLite; si no se indica se usan los archivos JSON")
+    parser.add_argument("--usuarios", default="usuarios.json")
+    parser.add_argument("--productos", default="productos.json")
+    parser.add_argument("--proveedores", default="proveedores.json")
+    parser.add_argument("--ventas", default="ventas.json")
+    parser.add_argument("--diario-ventas", default="ventas.jsonl")
+    parser.add_argument("--movimientos", default="movimientos_stock.jsonl")
+    parser.add_argument("--fsync", choices=POLITICAS_FSYNC, default=fsync,
+                        help="Política de fsync del diario de ventas (JSON)")
+
+
+def abrir_persistencia(args):
+    """Backend de almacenamiento según las opciones de agregar_argumentos_almacenamiento"""
+    if args.sqlite:
+        return PersistenciaSQLite(args.sqlite)
+    return PersistenciaJSON({
+        "usuarios": args.usuarios,
+        "productos": args.productos,
+        "proveedores": args.proveedores
+    }, args.ventas, args.diario_ventas, fsync=args.fsync, indentar=["usuarios"],
+        archivo_movimientos=args.movimientos)
+
+
+class Tienda:
+    """Una terminal sin interfaz: catálogo, ventas, usuarios y proveedores.
+
+    El catálogo y las ventas son de un MotorStock propio o, con `servidor`,
+    de un ClienteStock conectado al servidor de stock compartido (`despachar`
+    se le pasa al cliente). Usuarios y proveedores siempre son de esta
+    terminal y se guardan con el autoguardado. Las operaciones que rechazan
+    un pedido lanzan ValueError; la interfaz y la línea de comandos solo
+    muestran el mensaje.
+    """
+
+    def __init__(self, persistencia, servidor=None, despachar=None, ventana=0.5):
+        self.persistencia = persistencia
+        self.usuarios = [Usuario.desde_dict(u) for u in persistencia.cargar("usuarios") or []]
+        self.proveedores = [Proveedor(**p) for p in persistencia.cargar("proveedores") or []]
+        serializadores = {
+            "usuarios": lambda claves=None: [u.a_dict() for u in self.usuarios
+                                             if claves is None or u.usuario in claves],
+            "proveedores": lambda claves=None: [p.a_dict() for p in self.proveedores]
+        }
+        if servidor:
+            self.motor = ClienteStock(servidor, despachar)
+            self.autoguardado = Autoguardado(persistencia, serializadores, ventana=ventana)
+        else:
+            self.motor = MotorStock(persistencia, serializadores, ventana=ventana)
+            self.autoguardado = self.motor.autoguardado
+        if not self.usuarios:
+            self.usuarios = usuarios_predeterminados()
+            self._marcar("usuarios")
+            self.guardar()
+
+    @property
+    def productos(self):
+        return self.motor.productos
+
+    @property
+    def ventas(self):
+        return self.motor.ventas
+
+    def autenticar(self, usuario, contrasena):
+        """El Usuario con ese nombre y contraseña, o None"""
+        clave = Usuario._hash_contrasena(contrasena)
+        return next((u for u in self.usuarios if u.usuario == usuario and u.contrasena == clave), None)
+
+    def registrar_usuario(self, creador, usuario, contrasena, rol="normal", clave_recuperacion="clave_temp"):
+        """Alta de un usuario. Un admin crea usuarios normales; el superusuario, de cualquier rol"""
+        rol = rol.lower()
+        if not usuario or not contrasena:
+            raise ValueError("Usuario y contraseña son obligatorios")
+        if rol not in ROLES:
+            raise ValueError(f"Rol desconocido: {rol}")
+        if creador is None or creador.rol == "normal":
+            raise ValueError("Solo un admin o el superusuario pueden crear usuarios")
+        if rol != "normal" and creador.rol != "super":
+            raise ValueError("Solo superusuarios pueden crear admins")
+        if any(u.usuario == usuario for u in self.usuarios):
+            raise ValueError("El usuario ya existe")
+        nuevo = Usuario(usuario, contrasena, clave_recuperacion, rol)
+        self.usuarios.append(nuevo)
+        self._marcar("usuarios", usuario)
+        return nuevo
+
+    def registrar_proveedor(self, nombre, telefono, direccion):
+        if not (nombre and telefono and direccion):
+            raise ValueError("Todos los campos son obligatorios")
+        proveedor = Proveedor(nombre, telefono, direccion)
+        self.proveedores.append(proveedor)
+        self._marcar("proveedores")
+        return proveedor
+
+    def importar_productos(self, archivo, procesos=None):
+        """Alta o actualización de los productos de un CSV. Devuelve un ResultadoImportacion"""
+        return importar_productos(self.motor, archivo, procesos)
+
+    def analizar_margenes(self, margen_minimo):
+        return analizar_margenes(self.productos, margen_minimo)
+
+    def ventas_entre(self, desde=None, hasta=None, texto=None):
+        """Recorre las ventas con `desde <= fecha <= hasta` cuyo producto contiene `texto`.
+
+        Las fechas se comparan como texto ("%Y-%m-%d %H:%M:%S"), así "2024-05"
+        sirve de desde y "2024-05~" de hasta para todo mayo.
+        """
+        texto = texto.casefold() if texto else None
+        if (desde or hasta) and isinstance(self.persistencia, PersistenciaSQLite) \
+                and not isinstance(self.motor, ClienteStock):
+            # Con SQLite el rango sale del índice de fecha, sin recorrer todo el historial
+            ventas = self.persistencia.ventas_entre(desde, hasta)
+        else:
+            ventas = (venta for bloque in self.ventas.bloques() for venta in bloque)
+        for venta in ventas:
+            if desde and venta["fecha"] < desde or hasta and venta["fecha"] > hasta:
+                continue
+            if texto and texto not in venta["producto"].casefold():
+                continue
+            yield venta
+
+    def guardar(self):
+        """Escribe ya lo modificado, sin esperar al autoguardado"""
+        return self.autoguardado.vaciar()
+
+    def cerrar(self):
+        if isinstance(self.motor, ClienteStock):
+            self.autoguardado.detener()
+            self.persistencia.cerrar()
+        self.motor.cerrar()
+
+    def _marcar(self, coleccion, clave=None):
+        self.persistencia.marcar(coleccion, clave)
+        self.autoguardado.programar()
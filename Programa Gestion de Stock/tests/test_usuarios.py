@@ -0,0 +1,39 @@
+"""Ingreso con los usuarios que trae el programa (usuarios.json).
+
+Correr desde la carpeta del programa: python -m unittest
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from stock_core import PersistenciaJSON, Tienda
+
+CARPETA_PROGRAMA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class UsuariosIncluidos(unittest.TestCase):
+
+    def setUp(self):
+        # Una copia: abrir la tienda puede escribir los archivos de datos
+        self.carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.carpeta)
+        shutil.copy(os.path.join(CARPETA_PROGRAMA, "usuarios.json"), self.carpeta)
+        ruta = lambda archivo: os.path.join(self.carpeta, archivo)
+        self.tienda = Tienda(PersistenciaJSON({coleccion: ruta(f"{coleccion}.json") for coleccion in
+                                               ("usuarios", "productos", "proveedores")},
+                                              ruta("ventas.json"), ruta("ventas.jsonl"),
+                                              archivo_movimientos=ruta("movimientos_stock.jsonl")))
+        self.addCleanup(self.tienda.cerrar)
+
+    def test_superusuario_del_readme(self):
+        usuario = self.tienda.autenticar("super", "admin123")
+        self.assertIsNotNone(usuario)
+        self.assertEqual(usuario.rol, "super")
+
+    def test_contrasena_incorrecta(self):
+        self.assertIsNone(self.tienda.autenticar("super", "otra"))
+
+
+if __name__ == "__main__":
+    unittest.main()